@@ -0,0 +1,8 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The utilities import each other as utils.*, the way `python -m utils.<tool>` runs them
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,69 @@
+import pytest
+
+from utils.asset_index import check_guide_folder, index_asset_references
+
+
+@pytest.mark.parametrize("md", [
+    "Run `assets/foo.png` first",
+    "*assets/foo.png*",
+    "**assets/foo.png**",
+    "~~assets/foo.png~~",
+    "_assets/foo.png_",
+    "(see assets/foo.png).",
+])
+def test_markdown_delimiters_stay_outside_the_reference(md):
+    index = index_asset_references(md, ["foo.png"])
+    assert index["markdown"] == md
+    assert index["missing"] == []
+    assert index["orphans"] == []
+
+
+def test_rewrite_keeps_surrounding_delimiters():
+    index = index_asset_references("Open `assets/My_Shot.PNG` and *assets/My_Shot.PNG*", ["my-shot.png"])
+    assert index["markdown"] == "Open `assets/my-shot.png` and *assets/my-shot.png*"
+    assert index["rewritten"] == {"My_Shot.PNG": "my-shot.png"}
+
+
+def test_missing_names_exclude_delimiters():
+    index = index_asset_references("see `a/b` and `assets/c.png`.", [])
+    assert index["missing"] == ["c.png"]
+
+
+def test_balanced_parentheses_belong_to_the_path():
+    index = index_asset_references("![diagram](assets/Foo(1).png)", ["foo1.png"])
+    assert index["markdown"] == "![diagram](assets/foo1.png)"
+    assert index["rewritten"] == {"Foo(1).png": "foo1.png"}
+
+
+def test_image_link_html_and_quoted_paths():
+    md = '![a](assets/a.png)\n<img src="assets/My B.png">\n[c](<assets/c file.sql>)'
+    index = index_asset_references(md, ["a.png", "myb.png", "c file.sql", "unused.csv"])
+    assert index["markdown"] == '![a](assets/a.png)\n<img src="assets/myb.png">\n[c](<assets/c file.sql>)'
+    assert index["missing"] == []
+    assert index["orphans"] == ["unused.csv"]
+
+
+def test_absolute_urls_are_ignored():
+    md = "![x](https://github.com/org/repo/raw/main/assets/x.png)"
+    assert index_asset_references(md, [])["missing"] == []
+
+
+def test_percent_encoded_reference_matches_saved_name():
+    index = index_asset_references("![x](assets/c%20file.sql)", ["c file.sql"])
+    assert index["missing"] == [] and index["rewritten"] == {}
+
+
+def test_check_guide_folder_fix_and_prune(tmp_path):
+    guide = tmp_path / "my-guide"
+    (guide / "assets").mkdir(parents=True)
+    (guide / "assets" / "shot.png").write_bytes(b"png")
+    (guide / "assets" / "old.png").write_bytes(b"png")
+    (guide / "my-guide.md").write_text("![s](assets/Shot.png) and `assets/gone.png`\n", encoding="utf-8")
+
+    report = check_guide_folder(str(guide), fix=True, prune=True)
+
+    assert report["rewritten"] == {"Shot.png": "shot.png"}
+    assert report["missing"] == ["gone.png"]
+    assert report["pruned"] == ["old.png"]
+    assert (guide / "my-guide.md").read_text(encoding="utf-8") == "![s](assets/shot.png) and `assets/gone.png`\n"
+    assert not (guide / "assets" / "old.png").exists()
@@ -0,0 +1,204 @@
+import sqlite3
+
+import pytest
+
+from utils import draft_store
+from utils.draft_store import DraftStore
+from utils.guide_common import MemoryUpload
+
+DAY = 24 * 3600
+
+
+class Clock:
+    def __init__(self, now=1_000_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(draft_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "drafts.sqlite3")
+
+
+@pytest.fixture
+def store(db_path, clock):
+    store = DraftStore(db_path, debounce_s=60, max_age_s=30 * DAY)
+    yield store
+    store.close()
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _upload(name, data):
+    return MemoryUpload(name, data, "image/png")
+
+
+def test_only_changed_fields_are_written(store):
+    assert store.stage("d1", {"meta_author": "Ann", "content_title": "T"}) == 2
+    assert store.stage("d1", {"meta_author": "Ann", "content_title": "T2"}) == 1
+    assert store.flush() == 2
+    assert store.stage("d1", {"meta_author": "Ann", "content_title": "T2"}) == 0
+    assert store.load("d1")[0] == {"meta_author": "Ann", "content_title": "T2"}
+
+
+def test_stale_keys_are_removed(store, db_path):
+    store.stage("d1", {"steps_order": ["a", "b"], "steps_title_a": "A", "steps_title_b": "B", "steps_content_b": "b"})
+    store.flush()
+
+    order = ["a"]
+    stale = lambda key: key.startswith("steps_") and key != "steps_order" and key.rsplit("_", 1)[1] not in order
+    assert store.stage("d1", {"steps_order": order, "steps_title_a": "A"}, stale=stale) == 3
+    store.flush()
+
+    fields, _ = DraftStore(db_path).load("d1")
+    assert fields == {"steps_order": ["a"], "steps_title_a": "A"}
+
+
+def test_identical_assets_share_one_blob(store, db_path):
+    store.save_assets("d1", "images", [_upload("a.png", b"same")])
+    store.save_assets("d2", "images", [_upload("b.png", b"same")])
+    assert _count(db_path, "blobs") == 1
+    assert store.load("d2")[1]["images"][0].getvalue() == b"same"
+
+
+def test_replaced_assets_do_not_leave_blobs_behind(store, db_path):
+    store.save_assets("d1", "images", [_upload("a.png", b"one")])
+    store.save_assets("d2", "images", [_upload("a.png", b"one")])
+    store.save_assets("d1", "images", [_upload("a.png", b"second")])
+    assert _count(db_path, "blobs") == 2  # "one" is still used by d2
+    store.save_assets("d2", "images", [])
+    assert _count(db_path, "blobs") == 1
+
+
+def test_untouched_drafts_expire_with_their_blobs(store, clock, db_path):
+    store.stage("old", {"meta_author": "A"})
+    store.save_assets("old", "images", [_upload("a.png", b"old")])
+    store.save_assets("old", "other", [_upload("shared.csv", b"shared")])
+    store.flush()
+
+    clock.now += 20 * DAY
+    store.stage("new", {"meta_author": "B"})
+    store.save_assets("new", "other", [_upload("shared.csv", b"shared")])
+    store.flush()
+
+    clock.now += 15 * DAY
+    assert store.expire() == ["old"]
+    assert store.load("old") == ({}, {})
+    assert store.load("new")[0] == {"meta_author": "B"}
+    assert _count(db_path, "blobs") == 1  # only the blob "new" still references
+
+
+def test_reopening_a_draft_keeps_it_alive(store, clock):
+    store.stage("d1", {"meta_author": "A"})
+    store.flush()
+    clock.now += 25 * DAY
+    store.load("d1")
+    clock.now += 25 * DAY
+    assert store.expire() == []
+
+
+def test_pending_drafts_are_never_expired(store, clock):
+    store.stage("d1", {"meta_author": "A"})
+    store.flush()
+    clock.now += 40 * DAY
+    store.stage("d1", {"meta_author": "B"})
+    assert store.expire() == []
+    store.flush()
+    assert store.load("d1")[0] == {"meta_author": "B"}
+
+
+def test_expiry_runs_on_open_and_periodically(db_path, clock):
+    store = DraftStore(db_path, debounce_s=60, max_age_s=DAY)
+    store.stage("stale", {"meta_author": "A"})
+    store.flush()
+    store.close()
+
+    clock.now += 2 * DAY
+    reopened = DraftStore(db_path, debounce_s=60, max_age_s=DAY)
+    assert _count(db_path, "draft_fields") == 0
+
+    reopened.stage("d1", {"meta_author": "A"})
+    reopened.flush()
+    clock.now += 2 * DAY
+    reopened.stage("d2", {"meta_author": "B"})
+    reopened.flush()  # over an hour since the last expiry: d1 goes
+    assert reopened.load("d1") == ({}, {})
+    reopened.close()
+
+
+def test_drafts_saved_before_touch_tracking_expire_by_field_age(db_path, clock):
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(draft_store.SCHEMA)
+        conn.execute("INSERT INTO draft_fields VALUES ('legacy', 'meta_author', '\"A\"', ?)", (clock.now - 60 * DAY,))
+    store = DraftStore(db_path, debounce_s=60, max_age_s=30 * DAY)
+    assert store.load("legacy") == ({}, {})
+    store.close()
+
+
+def test_max_age_none_disables_expiry(db_path, clock):
+    store = DraftStore(db_path, debounce_s=60, max_age_s=None)
+    store.stage("d1", {"meta_author": "A"})
+    store.flush()
+    clock.now += 365 * DAY
+    assert store.expire() == []
+    store.close()
+
+
+class WritingUpload(MemoryUpload):
+    """An upload whose read lets another connection write mid-transaction, like a concurrent session."""
+
+    def __init__(self, name, data, db_path):
+        super().__init__(name, data, "image/png")
+        self.db_path = db_path
+        self.other_writer_blocked = None
+
+    def getvalue(self):
+        conn = sqlite3.connect(self.db_path, timeout=0.1)
+        try:
+            conn.execute("INSERT INTO drafts VALUES ('other', 0)")
+            conn.commit()
+            self.other_writer_blocked = False
+        except sqlite3.OperationalError:
+            self.other_writer_blocked = True
+        finally:
+            conn.close()
+        return super().getvalue()
+
+
+def test_asset_writes_hold_the_write_lock_from_the_start(store, db_path):
+    store.save_assets("d1", "images", [_upload("a.png", b"a")])
+    up = WritingUpload("b.png", b"b", db_path)
+    assert store.save_assets("d1", "images", [up]) is True
+    assert up.other_writer_blocked is True
+    assert store.load("d1")[1]["images"][0].getvalue() == b"b"
+
+
+def test_failed_writes_are_logged_and_retried(store, db_path, caplog):
+    store._conn.execute("PRAGMA busy_timeout = 50")
+    store.stage("d1", {"meta_author": "Ann"})
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        assert store.save_assets("d1", "images", [_upload("a.png", b"a")]) is False
+        assert store.flush() == 0
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert "could not save images assets of draft d1" in caplog.text
+    assert "could not save 1 draft(s)" in caplog.text
+
+    assert store.save_assets("d1", "images", [_upload("a.png", b"a")]) is True
+    assert store.flush() == 1
+    assert _count(db_path, "draft_fields") == 1
@@ -0,0 +1,115 @@
+import json
+import zipfile
+
+import pytest
+
+from utils.guide_common import validate_markdown
+from utils.guide_fanout import fan_out, load_overrides, overrides_from_files
+
+BASE_MD = """author: Jane Doe
+id: fan-guide
+language: "en"
+summary: Fan-out fixture
+categories: snowflake-site:taxonomy/solution-center/certification/quickstart
+environments: web
+status: Published
+
+# Fan Guide
+## Overview
+![Architecture](assets/Architecture.png)
+
+Numbered exports look like ![copy](assets/export(1).png) and **assets/setup.sql**.
+
+## Load Data
+Run `assets/setup.sql` first.
+
+## Query Data
+Query it.
+
+## Conclusion And Resources
+### Conclusion
+Done.
+"""
+
+ASSETS = [
+    ("architecture.png", b"\x89PNG" * 64),
+    ("export(1).png", b"png"),
+    ("setup.sql", b"SELECT 1;\n" * 100),
+]
+
+ES = {"title": "Guía", "summary": "Resumen", "steps": [None, {"title": "Consultar", "content": "Consulta los datos.\n"}]}
+
+
+def _zip(buf):
+    archive = zipfile.ZipFile(buf)
+    assert archive.testzip() is None
+    return archive
+
+
+def test_fan_out_writes_a_valid_zip_with_one_folder_per_language():
+    buf, variants = fan_out(BASE_MD, ASSETS, {"es": ES}, ["en", "es", "pt_br"])
+    archive = _zip(buf)
+    assert [(v["lang"], v["id"]) for v in variants] == [("en", "fan-guide"), ("es", "fan-guide-es"), ("pt_br", "fan-guide-pt-br")]
+    for v in variants:
+        names = [n for n in archive.namelist() if n.startswith(v["id"] + "/")]
+        assert sorted(names) == sorted([f"{v['id']}/{v['id']}.md"] + [f"{v['id']}/assets/{n}" for n, _ in ASSETS])
+        for name, data in ASSETS:
+            assert archive.read(f"{v['id']}/assets/{name}") == data
+        md = archive.read(f"{v['id']}/{v['id']}.md").decode("utf-8")
+        assert v["issues"] == validate_markdown(md, v["id"]) == []
+        assert "](assets/architecture.png)" in md and "assets/export(1).png)" in md and "**assets/setup.sql**" in md
+
+
+def test_overrides_replace_only_the_sections_they_fill():
+    buf, _ = fan_out(BASE_MD, ASSETS, {"es": ES}, ["es"])
+    es = _zip(buf).read("fan-guide-es/fan-guide-es.md").decode("utf-8")
+    assert "# Guía\n" in es
+    assert "summary: Resumen\n" in es and "language: es\n" in es
+    assert "## Load Data\nRun `assets/setup.sql` first.\n" in es
+    assert "## Consultar\n" in es and "Consulta los datos." in es and "Query it." not in es
+    assert es.endswith("## Conclusion And Resources\n### Conclusion\nDone.\n")
+
+
+def test_prune_leaves_out_unreferenced_assets():
+    assets = ASSETS + [("unused.png", b"png")]
+    buf, variants = fan_out(BASE_MD, assets, {}, ["en", "fr"], prune_unreferenced=True)
+    names = _zip(buf).namelist()
+    assert all(v["pruned"] == ["unused.png"] for v in variants)
+    assert not any(n.endswith("unused.png") for n in names)
+
+
+def test_overrides_from_files(tmp_path):
+    (tmp_path / "es.json").write_text(json.dumps(ES), encoding="utf-8")
+    (tmp_path / "more.json").write_text(json.dumps({"fr": {"title": "Guide"}}), encoding="utf-8")
+    (tmp_path / "ja.md").write_text(BASE_MD.replace("# Fan Guide", "# ガイド"), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    overrides = load_overrides(str(tmp_path))
+    assert overrides["es"] == ES and overrides["fr"] == {"title": "Guide"}
+    assert overrides["ja"]["title"] == "ガイド"
+    assert overrides_from_files([("es.json", json.dumps(ES).encode("utf-8"))]) == {"es": ES}
+
+
+@pytest.mark.parametrize("filename, text, message", [
+    ("all.json", "[1, 2]", "all.json: expected an object keyed by language, found list"),
+    ("all.json", '{"es": "hola"}', "all.json: es: expected an object of sections, found str"),
+    ("es.json", '["hola"]', "es.json: expected an object of sections, found list"),
+    ("es.json", '{"steps": ["hola"]}', "es.json: step 1 must be null or an object with title and content text"),
+    ("es.json", '{"steps": [{"title": 3}]}', "es.json: step 1 must be null or an object with title and content text"),
+    ("es.json", '{"steps": {"title": "x"}}', "es.json: steps must be a list"),
+    ("es.json", '{"title": ["x"]}', "es.json: title must be text"),
+    ("es.json", '{"learn": 5}', "es.json: learn must be text or a list of lines"),
+    ("es.json", '{"intro": "x"}', "es.json: unknown override section(s) intro"),
+    ("es.json", '{"title": ', "es.json: Expecting value"),
+    ("es.json", b'{"title": "\xff"}', "es.json: 'utf-8' codec can't decode"),
+])
+def test_bad_override_files_raise_value_error_naming_the_file(filename, text, message):
+    with pytest.raises(ValueError) as e:
+        overrides_from_files([(filename, text)])
+    assert str(e.value).startswith(message)
+
+
+def test_fan_out_rejects_bad_overrides_and_languages():
+    with pytest.raises(ValueError, match="es: step 1 must be null"):
+        fan_out(BASE_MD, ASSETS, {"es": {"steps": ["hola"]}})
+    with pytest.raises(ValueError, match="unknown language"):
+        fan_out(BASE_MD, ASSETS, {}, ["xx"])
@@ -0,0 +1,171 @@
+import glob
+import os
+
+import pytest
+
+from utils.guide_model import (
+    Resource, Step, apply_sections, guide_to_sections, load_guide, parse_guide, serialize,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(REPO_ROOT, "templates", "markdown-template.md")
+SEPARATOR = "<!-- ------------------------ -->\n"
+
+GENERATED = """author: Jane Doe
+id: numbered-guide
+language: en
+
+# Numbered Guide
+## Overview
+Intro.
+### What You’ll Learn
+- One thing
+
+## Process
+## Step 1: Load Data
+
+Load it.
+
+## Step 2: Train
+
+Train it.
+
+## Step 3: Deploy
+
+Ship it.
+
+## Conclusion And Resources
+
+### Conclusion
+Done.
+
+### Related Resources
+- [Docs](https://docs.snowflake.com)
+
+"""
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def _step_raws(guide):
+    return [seg.raw for seg in guide._segments if seg.kind == "step"]
+
+
+@pytest.mark.parametrize("path", [TEMPLATE] + sorted(glob.glob(os.path.join(REPO_ROOT, "prompts", "**", "*.md"), recursive=True)))
+def test_unedited_guides_round_trip_byte_for_byte(path):
+    text = _read(path)
+    assert serialize(parse_guide(text)) == text
+
+
+def test_generated_guide_round_trips():
+    assert serialize(parse_guide(GENERATED)) == GENERATED
+
+
+def test_separators_belong_to_the_next_heading():
+    guide = load_guide(TEMPLATE)
+    assert guide.steps
+    for step in guide.steps:
+        assert "<!--" not in step.content.splitlines()[-1]
+    assert not guide.build.rstrip().endswith("-->")
+    assert all(raw.startswith(SEPARATOR) for raw in _step_raws(guide))
+
+
+def test_deleting_a_step_leaves_the_others_untouched():
+    text = _read(TEMPLATE)
+    guide = parse_guide(text)
+    first = _step_raws(guide)[0]
+    del guide.steps[0]
+    out = serialize(guide)
+    assert out == text.replace(first, "", 1)
+    assert "## Adding Appropriate Tags \n" in out
+
+
+def test_moving_a_step_moves_its_separator():
+    text = _read(TEMPLATE)
+    guide = parse_guide(text)
+    raws = _step_raws(guide)
+    guide.steps[1], guide.steps[2] = guide.steps[2], guide.steps[1]
+    assert serialize(guide) == text.replace(raws[1] + raws[2], raws[2] + raws[1])
+
+
+def test_inserted_step_gets_the_separator_style():
+    text = _read(TEMPLATE)
+    guide = parse_guide(text)
+    raws = _step_raws(guide)
+    guide.steps.insert(2, Step("New Step", "Fresh content."))
+    out = serialize(guide)
+    assert out == text.replace(raws[2], SEPARATOR + "## New Step\n\nFresh content.\n\n" + raws[2], 1)
+    reparsed = parse_guide(out)
+    assert [s.title for s in reparsed.steps][2] == "New Step"
+    assert reparsed.steps[2].content == "Fresh content."
+
+
+def test_edited_step_is_the_only_part_rendered_again():
+    text = _read(TEMPLATE)
+    guide = parse_guide(text)
+    raws = _step_raws(guide)
+    guide.steps[3] = Step(guide.steps[3].title, "Rewritten.")
+    out = serialize(guide)
+    assert out == text.replace(raws[3], SEPARATOR + f"## {guide.steps[3].title}\n\nRewritten.\n\n", 1)
+
+
+def test_numbered_steps_are_renumbered_in_place():
+    guide = parse_guide(GENERATED)
+    del guide.steps[0]
+    guide.steps.append(Step("Monitor", "Watch it."))
+    out = serialize(guide)
+    assert "## Step 1: Train\n\nTrain it.\n\n## Step 2: Deploy\n\nShip it.\n\n## Step 3: Monitor\n\nWatch it.\n\n" in out
+    assert "Load Data" not in out
+    assert out.startswith(GENERATED.partition("## Step 1")[0])
+    assert out.endswith(GENERATED.partition("Ship it.\n\n")[2])
+
+
+def test_duplicate_steps_are_matched_once_each():
+    md = "# T\n## Overview\nx\n## A\n\nsame\n\n## A\n\nsame\n\n"
+    guide = parse_guide(md)
+    guide.steps.append(Step("A", "same"))
+    assert serialize(guide) == md + "## A\n\nsame\n\n"
+
+
+def test_metadata_and_section_edits():
+    guide = parse_guide(GENERATED)
+    guide.frontmatter["language"] = "fr"
+    guide.learn.append("Another thing")
+    guide.resources.append(Resource("Blog", "https://example.com"))
+    out = serialize(guide)
+    assert "language: fr\n" in out
+    assert "- One thing\n- Another thing\n" in out
+    assert "- [Docs](https://docs.snowflake.com)\n- [Blog](https://example.com)\n" in out
+    assert "## Step 2: Train\n\nTrain it.\n\n" in out
+
+
+def test_guide_to_sections():
+    meta, sections = guide_to_sections(parse_guide(GENERATED))
+    assert meta["id"] == "numbered-guide" and meta["language"] == "en"
+    assert [s["title"] for s in sections["steps"]] == ["Load Data", "Train", "Deploy"]
+    assert sections["resources"] == "Docs | https://docs.snowflake.com"
+
+
+def test_apply_sections_keeps_untouched_form_fields_verbatim():
+    source = _read(TEMPLATE)
+    guide = parse_guide(source)
+    meta, sections = guide_to_sections(guide)
+    meta["categories"] = ", ".join(reversed(meta["categories"].split(", ")))
+    assert serialize(apply_sections(guide, meta, sections)) == source
+
+    meta["summary"] = "Edited summary"
+    sections["learn"] = "First\n\n  Second "
+    sections["resources"] = "Docs | https://docs.snowflake.com\nhttps://example.com"
+    del sections["steps"][1]
+    out = apply_sections(guide, meta, sections)
+    assert guide.frontmatter["summary"] == "This is a sample Snowflake Template"
+    assert out.frontmatter["summary"] == "Edited summary"
+    assert out.learn == ["First", "Second"]
+    assert out.resources == [Resource("Docs", "https://docs.snowflake.com"), Resource("", "https://example.com")]
+    md = serialize(out)
+    assert "summary: Edited summary\n" in md and "status: Published\n" in md
+    assert "## Creating Sections" not in md and md.count(SEPARATOR) == source.count(SEPARATOR) - 1
+    assert "## Metadata Configuration\n" in md and "## Adding Appropriate Tags \n" in md
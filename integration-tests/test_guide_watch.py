@@ -0,0 +1,121 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils.guide_watch import GuideWatcher, checks_for
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUIDE_MD = """author: Jane Doe
+id: {guide_id}
+language: en
+summary: Fixture guide
+categories: snowflake-site:taxonomy/solution-center/certification/quickstart
+environments: web
+status: Published
+
+# Fixture Guide
+## Overview
+![Architecture](assets/architecture.png)
+
+Save the screenshot as `assets/result.png`, then open *assets/result.png* again.
+Numbered exports look like ![copy](assets/export(1).png) and _assets/result.png_.
+
+## Load Data
+Run the script in **assets/setup.sql**.
+"""
+
+
+def _make_guide(root, guide_id="fixture-guide", md=None, assets=None):
+    guide = root / guide_id
+    (guide / "assets").mkdir(parents=True)
+    (guide / f"{guide_id}.md").write_text(md or GUIDE_MD.format(guide_id=guide_id), encoding="utf-8")
+    files = {"architecture.png": b"png", "result.png": b"png", "export(1).png": b"png", "setup.sql": b"SELECT 1;"}
+    for name, data in (files if assets is None else assets).items():
+        (guide / "assets" / name).write_bytes(data)
+    return guide
+
+
+def _run_once(*paths):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    return subprocess.run(
+        [sys.executable, "-m", "utils.guide_watch", *map(str, paths), "--once"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_once_passes_a_clean_guide_without_false_link_warnings(tmp_path):
+    guide = _make_guide(tmp_path)
+    proc = _run_once(guide)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "fixture-guide (frontmatter, assets, links" in proc.stdout
+    assert "✅ passed" in proc.stdout
+    assert "does not exist" not in proc.stdout
+    assert "is not referenced" not in proc.stdout
+    assert "should be" not in proc.stdout
+    assert "assets/setup.sql: non-image assets" in proc.stdout
+
+
+def test_once_reports_blocking_issues_and_exits_non_zero(tmp_path):
+    md = GUIDE_MD.format(guide_id="other-id").replace("language: en", "language: xx") + "\n![gone](assets/gone.png)\n"
+    guide = _make_guide(tmp_path, md=md, assets={"architecture.png": b"x" * 1_000_001, "result.png": b"png"})
+    proc = _run_once(guide)
+    assert proc.returncode == 1
+    out = proc.stdout
+    assert 'id must match folder/file name "fixture-guide"' in out
+    assert "language must be one of" in out
+    assert "assets/architecture.png: 1,000,001 bytes exceeds the 1MB image limit" in out
+    assert "assets/gone.png is referenced but does not exist" in out
+    assert "assets/export(1).png is referenced but does not exist" in out
+
+
+def test_once_checks_every_guide_under_a_src_root(tmp_path):
+    _make_guide(tmp_path, "guide-a")
+    _make_guide(tmp_path, "guide-b")
+    (tmp_path / "_shared").mkdir()
+    proc = _run_once(tmp_path)
+    assert proc.returncode == 0, proc.stdout
+    assert "guide-a (" in proc.stdout and "guide-b (" in proc.stdout
+    assert "_shared" not in proc.stdout
+
+
+def test_changes_rerun_only_the_affected_checks(tmp_path):
+    guide = _make_guide(tmp_path)
+    out = io.StringIO()
+    watcher = GuideWatcher([str(guide)], out=out)
+    watcher.prime()
+    assert not watcher.has_errors()
+
+    out.truncate(0), out.seek(0)
+    asset = guide / "assets" / "result.png"
+    watcher.handle({str(asset)})  # same content: nothing to do
+    assert out.getvalue() == ""
+
+    asset.write_bytes(b"x" * 1_000_001)
+    watcher.handle({str(asset)})
+    assert "(assets;" in out.getvalue()
+    assert watcher.has_errors()
+
+    out.truncate(0), out.seek(0)
+    md = guide / "fixture-guide.md"
+    md.write_text(md.read_text(encoding="utf-8") + "\n![new](assets/new.png)\n", encoding="utf-8")
+    watcher.handle({str(md)})
+    assert "(frontmatter, links;" in out.getvalue()
+    assert "assets/new.png is referenced but does not exist" in out.getvalue()
+
+
+@pytest.mark.parametrize("rel, existed, expected", [
+    ("assets/a.png", True, {"assets"}),
+    ("assets/new.png", False, {"assets", "links"}),
+    ("guide.md", True, {"frontmatter", "links"}),
+    ("notes.txt", False, {"frontmatter"}),
+    ("sub/dir/file.txt", False, set()),
+])
+def test_checks_for(tmp_path, rel, existed, expected):
+    path = tmp_path / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("x")
+    assert checks_for(str(tmp_path), str(path), existed) == expected
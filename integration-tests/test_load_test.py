@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from utils.load_test import collect_results, run_session
+
+FAKE_APP = """
+import streamlit as st
+
+draft = st.query_params.get("draft")
+if draft == "crash-on-load":
+    raise RuntimeError("draft restore failed")
+if draft == "error-on-load" and "loaded" not in st.session_state:
+    st.error("could not restore the draft")
+st.session_state.loaded = True
+with st.form("guide_form"):
+    submitted = st.form_submit_button("Generate Guide")
+if submitted:
+    if draft == "crash-on-submit":
+        raise RuntimeError("submit failed")
+    st.caption("Saved assets: none")
+"""
+
+
+def _reporting_worker(results, count):
+    for _ in range(count):
+        results.put({"load_s": 0.1, "submit_s": 0.2, "ok": True, "errors": [], "max_rss_bytes": 1})
+
+
+def _crashing_worker(results):
+    os._exit(3)
+
+
+def _hanging_worker(results):
+    time.sleep(600)
+
+
+def _start(target, *args):
+    proc = multiprocessing.Process(target=target, args=args, daemon=True)
+    proc.start()
+    return proc
+
+
+def test_all_sessions_reported():
+    results = multiprocessing.Queue()
+    workers = [_start(_reporting_worker, results, 2), _start(_reporting_worker, results, 1)]
+    collected = collect_results(results, workers, 3, stall_s=30, poll_s=0.05)
+    assert [r["ok"] for r in collected] == [True, True, True]
+
+
+def test_crashed_worker_counts_as_failed_sessions():
+    results = multiprocessing.Queue()
+    workers = [_start(_reporting_worker, results, 1), _start(_crashing_worker, results)]
+    started = time.perf_counter()
+    collected = collect_results(results, workers, 3, stall_s=30, poll_s=0.05)
+    assert time.perf_counter() - started < 10
+    assert sum(r["ok"] for r in collected) == 1
+    failed = [r for r in collected if not r["ok"]]
+    assert len(failed) == 2
+    assert "exit code 3" in failed[0]["errors"][0]
+
+
+def test_hung_worker_is_terminated_after_the_stall_timeout():
+    results = multiprocessing.Queue()
+    hung = _start(_hanging_worker, results)
+    started = time.perf_counter()
+    collected = collect_results(results, [_start(_reporting_worker, results, 1), hung], 2, stall_s=1, poll_s=0.05)
+    assert time.perf_counter() - started < 10
+    assert not hung.is_alive()
+    assert [r["ok"] for r in collected] == [True, False]
+    assert "exit code -15" in collected[1]["errors"][0]
+
+
+@pytest.fixture
+def fake_app(tmp_path):
+    path = tmp_path / "fake_app.py"
+    path.write_text(FAKE_APP, encoding="utf-8")
+    return str(path)
+
+
+def test_session_passes_when_both_runs_are_clean(fake_app):
+    result = run_session("fine", 30, fake_app)
+    assert result["ok"] and result["errors"] == []
+
+
+@pytest.mark.parametrize("draft, error", [
+    ("crash-on-load", "load: draft restore failed"),
+    ("error-on-load", "load: could not restore the draft"),
+    ("crash-on-submit", "submit: submit failed"),
+])
+def test_errors_in_either_run_fail_the_session(fake_app, draft, error):
+    result = run_session(draft, 30, fake_app)
+    assert not result["ok"]
+    assert result["errors"] == [error]
@@ -0,0 +1,136 @@
+import base64
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from utils import notebook_import
+from utils.notebook_import import import_notebook
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+def _notebook(cells, language="python"):
+    return {
+        "cells": cells,
+        "metadata": {"language_info": {"name": language}},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+def _md(source):
+    return {"cell_type": "markdown", "metadata": {}, "source": source}
+
+
+def _code(source, outputs=()):
+    return {"cell_type": "code", "metadata": {}, "source": source, "outputs": list(outputs), "execution_count": 1}
+
+
+def _image_output(data=PNG):
+    return {"output_type": "display_data", "data": {"image/png": base64.b64encode(data).decode("ascii")}, "metadata": {}}
+
+
+def _text_output(text):
+    return {"output_type": "stream", "name": "stdout", "text": [text]}
+
+
+SAMPLE = _notebook([
+    _md(["# Churn Model\n", "Intro text.\n"]),
+    _md("## Overview\nWhat this covers."),
+    _md("## Step 1: Load Data\nLoad it."),
+    _code(["import pandas as pd\n", "df = pd.read_csv('x.csv')"], [_text_output("STDOUT-LINE\n"), _image_output()]),
+    _md("## Train\n```\n## not a heading\n```"),
+    {"cell_type": "code", "metadata": {"language": "sql"}, "source": "SELECT 1;", "outputs": []},
+])
+
+
+def _import(nb, **kwargs):
+    return import_notebook(io.BytesIO(json.dumps(nb).encode("utf-8")), "My Notebook.ipynb", **kwargs)
+
+
+@pytest.fixture(params=["streaming", "loaded"])
+def parser_mode(request, monkeypatch):
+    """Run a test through the ijson stream and through the json.load fallback."""
+    if request.param == "streaming":
+        if notebook_import.ijson is None:
+            pytest.skip("ijson is not installed")
+    else:
+        monkeypatch.setattr(notebook_import, "ijson", None)
+    return request.param
+
+
+def test_cells_map_onto_steps(parser_mode):
+    sections = _import(SAMPLE)
+    assert sections["title"] == "Churn Model"
+    assert sections["overview"] == "Intro text.\n\nWhat this covers."
+    assert [s["title"] for s in sections["steps"]] == ["Load Data", "Train"]
+    load = sections["steps"][0]["content"]
+    assert "```python\nimport pandas as pd\ndf = pd.read_csv('x.csv')\n```" in load
+    assert "STDOUT-LINE" not in load  # text outputs are dropped
+    assert "![](assets/mynotebook-cell4-1.png)" in load
+    assert sections["steps"][1]["content"].endswith("```sql\nSELECT 1;\n```")
+    assert sections["assets"] == [("mynotebook-cell4-1.png", PNG, "image/png")]
+
+
+def test_streaming_and_loaded_parsers_agree(monkeypatch):
+    if notebook_import.ijson is None:
+        pytest.skip("ijson is not installed")
+    streamed = _import(SAMPLE)
+    monkeypatch.setattr(notebook_import, "ijson", None)
+    assert _import(SAMPLE) == streamed
+
+
+def test_oversized_images_and_steps_are_capped(parser_mode):
+    nb = _notebook([
+        _md("## Big"),
+        _code("x = 1", [_image_output(PNG * 10)]),
+        _md("a" * 500),
+    ])
+    sections = _import(nb, max_step_chars=100, max_image_bytes=len(PNG) * 5)
+    assert sections["skipped_images"] == 1
+    assert sections["assets"] == []
+    assert "_(Truncated: 500 characters omitted from the notebook.)_" in sections["steps"][0]["content"]
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b'{"cells": [{"cell_type": "markdown", "source": "## Cut',
+    b"not json at all",
+    b"[1, 2, 3]",
+    b'{"metadata": {}}',
+    b'{"cells": "nope"}',
+    b"\xff\xfe\x00garbage",
+])
+def test_unreadable_notebooks_raise_value_error(parser_mode, data):
+    with pytest.raises(ValueError):
+        import_notebook(io.BytesIO(data), "broken.ipynb")
+
+
+def test_streaming_memory_is_bounded_by_cell_not_file(tmp_path):
+    if notebook_import.ijson is None:
+        pytest.skip("ijson is not installed")
+    # ~24MB of text output the guide drops, spread across 300 cells of ~80KB
+    chunk = "row of output text\n" * 4_000
+    cells = []
+    for i in range(300):
+        cells.append(_md(f"## Step {i}\nText {i}."))
+        cells.append(_code(f"print({i})", [_text_output(chunk)]))
+    path = tmp_path / "big.ipynb"
+    path.write_text(json.dumps(_notebook(cells)), encoding="utf-8")
+    file_size = path.stat().st_size
+    assert file_size > 20_000_000
+
+    tracemalloc.start()
+    try:
+        with open(path, "rb") as f:
+            sections = import_notebook(f, "big.ipynb")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(sections["steps"]) == 300
+    assert peak < file_size / 10
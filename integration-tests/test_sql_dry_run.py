@@ -0,0 +1,215 @@
+import pytest
+
+from utils.sql_dry_run import ERROR, WARNING, dry_run, split_statements
+
+HEADER = "CREATE OR REPLACE SCHEMA db.s;\nUSE SCHEMA db.s;\n"
+
+
+def _run(tmp_path, sql, engine="catalog", name="delivery.sql"):
+    path = tmp_path / name
+    path.write_text(sql, encoding="utf-8")
+    return dry_run(str(path), engine)
+
+
+def _messages(report, level=ERROR, check=None):
+    return [i["message"] for i in report["issues"] if i["level"] == level and check in (None, i["check"])]
+
+
+# Splitting
+
+def test_split_keeps_dollar_bodies_whole():
+    sql = (
+        "CREATE OR REPLACE PROCEDURE p() RETURNS INT LANGUAGE SQL AS\n"
+        "$$\nBEGIN\n  INSERT INTO t VALUES (1);\n  RETURN 1;\nEND;\n$$;\n"
+        "CALL p();"
+    )
+    pieces, problems = split_statements(sql)
+    assert problems == []
+    assert [line for _, _, line in pieces] == [1, 8]
+    code, masked, _ = pieces[0]
+    assert code.endswith("END;\n$$")
+    assert "INSERT" not in masked and masked.endswith("$$")
+    assert len(code) == len(masked)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 'a;b' AS x; SELECT 2",
+    "SELECT 'it''s; fine'; SELECT 2",
+    "SELECT 'a\\'; b'; SELECT 2",
+    'SELECT 1 AS "a"";b"; SELECT 2',
+    "SELECT 1 -- not here; or here\n; SELECT 2",
+    "SELECT 1 /* ; */; SELECT 2",
+])
+def test_split_ignores_quoted_and_commented_semicolons(sql):
+    pieces, problems = split_statements(sql)
+    assert problems == []
+    assert len(pieces) == 2
+    assert pieces[1][0] == "SELECT 2"
+
+
+def test_split_blanks_comments_and_string_bodies_at_same_offsets():
+    pieces, _ = split_statements("SELECT 'x -- y' /* c */ FROM t")
+    code, masked, _ = pieces[0]
+    assert "/*" not in code and "-- y" in code
+    assert "-- y" not in masked
+    assert code.index("FROM") == masked.index("FROM")
+
+
+def test_split_reports_line_numbers_from_first_line():
+    pieces, _ = split_statements("SELECT 1;\n\n-- note\nSELECT\n  2;", first_line=10)
+    assert [line for _, _, line in pieces] == [10, 13]
+
+
+@pytest.mark.parametrize("sql, message", [
+    ("SELECT 'abc", "unterminated string literal"),
+    ('SELECT "abc', "unterminated quoted identifier"),
+    ("SELECT $$ abc", "unterminated $$ block"),
+    ("SELECT 1 /* abc", "unterminated /* comment"),
+    ("SELECT (1", "unbalanced parentheses"),
+])
+def test_split_reports_unterminated_input(sql, message):
+    _, problems = split_statements(sql)
+    assert problems == [(1, message)]
+
+
+# Name resolution
+
+def test_unquoted_names_fold_to_upper_case(tmp_path):
+    report = _run(tmp_path, HEADER + "CREATE TABLE orders (id INT);\n"
+                  "SELECT * FROM Orders;\nSELECT * FROM DB.S.ORDERS;\nSELECT * FROM \"ORDERS\";\n")
+    assert report["errors"] == 0
+    assert report["warnings"] == 0
+
+
+def test_quoted_names_are_case_sensitive(tmp_path):
+    report = _run(tmp_path, HEADER + 'CREATE TABLE "MixedCase" (id INT);\n'
+                  'SELECT * FROM "MixedCase";\nSELECT * FROM MixedCase;\n')
+    assert _messages(report, WARNING) == [
+        "table/view DB.S.MIXEDCASE is not created by this script and must already exist"
+    ]
+
+
+def test_use_sets_the_context_for_unqualified_names(tmp_path):
+    report = _run(tmp_path, "CREATE OR REPLACE SCHEMA db.a;\nCREATE OR REPLACE SCHEMA db.b;\n"
+                  "USE SCHEMA db.a;\nCREATE TABLE t (id INT);\nUSE SCHEMA db.b;\nSELECT * FROM t;\n"
+                  "SELECT * FROM db.a.t;\n")
+    assert _messages(report, WARNING) == ["table/view DB.B.T is not created by this script and must already exist"]
+
+
+def test_use_before_create_and_after_drop(tmp_path):
+    report = _run(tmp_path, HEADER + "SELECT * FROM t;\nCREATE TABLE t (id INT);\n"
+                  "DROP TABLE t;\nINSERT INTO t VALUES (1);\n")
+    assert _messages(report, check="resolution") == [
+        "table/view DB.S.T is used before it is created (line 4)",
+        "table/view DB.S.T is used after it was dropped (line 5)",
+    ]
+
+
+def test_duplicate_create_needs_or_replace(tmp_path):
+    report = _run(tmp_path, HEADER + "CREATE TABLE t (id INT);\nCREATE TABLE t (id INT);\n")
+    assert _messages(report) == [
+        "table/view DB.S.T already exists (created line 3); use CREATE OR REPLACE or IF NOT EXISTS"
+    ]
+
+
+def test_rerunnable_script_passes(tmp_path):
+    sql = HEADER + (
+        "CREATE TABLE IF NOT EXISTS t (id INT);\n"
+        "CREATE TABLE IF NOT EXISTS t (id INT);\n"
+        "CREATE OR REPLACE TABLE t (id INT);\n"
+        "DROP TABLE IF EXISTS never_made;\n"
+        "CREATE OR REPLACE VIEW v AS SELECT id FROM t;\n"
+        "CREATE OR REPLACE PROCEDURE p() RETURNS INT LANGUAGE SQL AS\n"
+        "$$\nBEGIN\n  SELECT * FROM not_here;\n  RETURN 1;\nEND;\n$$;\n"
+        "SELECT * FROM v WHERE id > 0;\n"
+        "SELECT * FROM INFORMATION_SCHEMA.TABLES;\n"
+    )
+    report = _run(tmp_path, sql)
+    assert report["issues"] == []
+
+
+def test_markdown_delivery_locations_point_into_the_file(tmp_path):
+    text = "# Guide\n\nIntro\n\n```sql\n" + HEADER + "SELECT * FROM missing;\n```\n"
+    report = _run(tmp_path, text, name="guide.md")
+    assert [(i["location"], i["level"]) for i in report["issues"]] == [("line 8", WARNING)]
+
+
+# Literal checks
+
+@pytest.fixture
+def typed_table():
+    return HEADER + (
+        "CREATE OR REPLACE TABLE t (\n"
+        "  name VARCHAR(5) NOT NULL,\n"
+        "  amount NUMBER(10, 2),\n"
+        "  day DATE,\n"
+        "  flag BOOLEAN\n"
+        ");\n"
+    )
+
+
+@pytest.mark.parametrize("values, message", [
+    ("('abcdef', 1, NULL, NULL)", "VALUES row 1, NAME: string of 6 characters is too long for VARCHAR(5)"),
+    ("('a', 'x1', NULL, NULL)", "VALUES row 1, AMOUNT: numeric value 'x1' is not recognized"),
+    ("('a', 1, '2024-02-30', NULL)", "VALUES row 1, DAY: date '2024-02-30' is not recognized"),
+    ("('a', 1, NULL, 'maybe')", "VALUES row 1, FLAG: boolean value 'maybe' is not recognized"),
+    ("(NULL, 1, NULL, NULL)", "VALUES row 1, NAME: NULL in a NOT NULL column"),
+    ("('a', 1, NULL)", "VALUES row 1 has 3 value(s) for 4 column(s)"),
+    ("('a', 1, NULL, NULL), ('b', 'two', NULL, NULL)", "VALUES row 2, AMOUNT: numeric value 'two' is not recognized"),
+])
+def test_values_checks(tmp_path, typed_table, values, message):
+    report = _run(tmp_path, typed_table + f"INSERT INTO t VALUES {values};\n")
+    assert _messages(report, check="engine") == [message]
+
+
+@pytest.mark.parametrize("insert", [
+    "INSERT INTO t VALUES ('abcde', 12.5, '2024-02-29', TRUE)",
+    "INSERT INTO t VALUES ('it''s', '-1.5e3', '2024-01-01 10:00:00', 'yes')",
+    "INSERT INTO t VALUES ('abc\\'\\n', ' 7 ', NULL, 'off')",
+    "INSERT INTO t VALUES ('a,b', 1, CURRENT_DATE(), NULL)",
+    "INSERT INTO t VALUES (UPPER('abcdefgh'), 1, NULL, NULL)",
+    "INSERT INTO t (name) VALUES ('x')",
+    "INSERT INTO t (NAME, \"AMOUNT\") VALUES ('x', '3')",
+    "INSERT INTO t (name) SELECT 'abcdefgh'",
+])
+def test_values_checks_accept_valid_rows(tmp_path, typed_table, insert):
+    report = _run(tmp_path, typed_table + insert + ";\n")
+    assert report["issues"] == []
+
+
+def test_values_columns_resolve_by_case_and_quoting(tmp_path):
+    report = _run(tmp_path, HEADER + 'CREATE OR REPLACE TABLE t ("id" INT, name VARCHAR(4));\n'
+                  'INSERT INTO t ("id", Name) VALUES (1, \'a\');\nINSERT INTO t (id) VALUES (2);\n')
+    assert _messages(report, check="engine") == ["column(s) ID do not exist in DB.S.T"]
+
+
+def test_values_checks_skip_tables_without_known_columns(tmp_path):
+    report = _run(tmp_path, HEADER + "CREATE OR REPLACE TABLE t AS SELECT 1 AS id;\n"
+                  "INSERT INTO t VALUES ('whatever', 'else');\n")
+    assert report["errors"] == 0
+
+
+# SQLite engine
+
+def test_sqlite_engine_runs_portable_statements(tmp_path):
+    report = _run(tmp_path, HEADER + (
+        "CREATE OR REPLACE TABLE t (id INT NOT NULL, name VARCHAR(10));\n"
+        "INSERT INTO t (id, name) VALUES (1, 'a;b');\n"
+        "INSERT INTO t (name) SELECT 'x';\n"
+        "SELECT nope FROM t;\n"
+        "SELECT id FROM t WHERE name = 'a;b';\n"
+    ), engine="sqlite")
+    assert report["engine"] == "sqlite"
+    assert [(i["location"], i["level"], i["message"]) for i in report["issues"]] == [
+        ("line 5", ERROR, "NOT NULL constraint failed: DB.S.T.id"),
+        ("line 6", WARNING, "no such column: nope (sqlite dry run)"),
+    ]
+
+
+def test_sqlite_engine_skips_dialect_it_cannot_run(tmp_path):
+    report = _run(tmp_path, HEADER + (
+        "CREATE OR REPLACE TABLE t (id INT, v VARIANT);\n"
+        "SELECT id, v:field::STRING FROM t QUALIFY ROW_NUMBER() OVER (ORDER BY id) = 1;\n"
+    ), engine="sqlite")
+    assert report["errors"] == 0
+    assert report["engine_skipped"] >= 1
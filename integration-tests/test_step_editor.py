@@ -0,0 +1,260 @@
+import io
+import os
+import sqlite3
+import time
+import zipfile
+
+import pytest
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from utils.load_test import APP_PATH, SUBMIT_KEY, start_taxonomy_stub
+
+DRAFT_ID = "step-editor-test"
+TEMPLATE = os.path.join(os.path.dirname(APP_PATH), "templates", "markdown-template.md")
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    stub = start_taxonomy_stub()
+    yield stub
+    stub.shutdown()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch, taxonomy):
+    path = str(tmp_path / "drafts.sqlite3")
+    monkeypatch.setenv("GUIDE_DRAFTS_DB", path)
+    monkeypatch.setenv("GUIDE_CATEGORIES_URL", taxonomy.url)
+    return path
+
+
+def _open_app(draft_id=DRAFT_ID):
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.query_params["draft"] = draft_id
+    at.run()
+    assert not at.exception
+    return at
+
+
+@pytest.fixture
+def app(db_path):
+    return _open_app()
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Files the app offers for download, captured as they go into the media store."""
+    files = []
+    original = MemoryMediaFileStorage.load_and_get_id
+
+    def record(self, path_or_data, mimetype, kind, filename=None):
+        files.append((filename, path_or_data))
+        return original(self, path_or_data, mimetype, kind, filename)
+
+    monkeypatch.setattr(MemoryMediaFileStorage, "load_and_get_id", record)
+    return files
+
+
+class _Upload(io.BytesIO):
+    """What st.file_uploader leaves in session state: a named file-like object."""
+
+    def __init__(self, name, data, type="text/markdown"):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+
+
+def _order(at):
+    return list(at.session_state["steps_order"])
+
+
+def _click(at, key):
+    at.button(key=key).click().run()
+    assert not at.exception
+    return at
+
+
+def _set_steps(at, *titles):
+    """Give the steps titles and content through session state, as a restored draft would."""
+    for step_id, title in zip(_order(at), titles):
+        at.session_state[f"steps_title_{step_id}"] = title
+        at.session_state[f"steps_content_{step_id}"] = f"{title} body"
+    at.run()
+    return _order(at)
+
+
+def _submitted_markdown(at, downloads, guide_id):
+    _click(at, SUBMIT_KEY)
+    assert [e.value for e in at.error] == []
+    data = [d for name, d in downloads if name.endswith(".zip")][-1]
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return archive.read(f"{guide_id}.md").decode("utf-8")
+
+
+def _import_guide(at, text, name="markdown-template.md"):
+    at.session_state["guide_upload"] = _Upload(name, text.encode("utf-8"))
+    return _click(at, "guide_import")
+
+
+def _template():
+    with open(TEMPLATE, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def _summaries(at):
+    return [m.value for m in at.markdown if m.value.startswith("**Step ")]
+
+
+def _editor_keys(at):
+    return sorted(w.key for w in list(at.text_input) + list(at.text_area) if w.key.startswith("step_editor_"))
+
+
+def _stored_keys(db_path, draft_id=DRAFT_ID, timeout=5.0):
+    """Draft field keys once the store's debounced flush has landed."""
+    deadline = time.monotonic() + timeout
+    last = None
+    while time.monotonic() < deadline:
+        with sqlite3.connect(db_path) as conn:
+            keys = {r[0] for r in conn.execute("SELECT key FROM draft_fields WHERE draft_id = ?", (draft_id,))}
+        if keys == last:
+            return keys
+        last = keys
+        time.sleep(1.0)
+    return last
+
+
+def test_new_guide_starts_with_three_closed_steps(app):
+    assert len(_order(app)) == 3
+    assert _summaries(app) == [f"**Step {i}:** (untitled) · 0 chars" for i in (1, 2, 3)]
+    assert _editor_keys(app) == []
+
+
+def test_open_edit_and_collapse(app):
+    step_id = _order(app)[0]
+    _click(app, f"step_open_{step_id}")
+    assert _editor_keys(app) == [f"step_editor_content_{step_id}", f"step_editor_title_{step_id}"]
+
+    app.text_input(key=f"step_editor_title_{step_id}").input("Load Data")
+    app.text_area(key=f"step_editor_content_{step_id}").input("Run the loader.")
+    app.run()
+    assert _summaries(app)[0] == "**Step 1:** Load Data · 15 chars"
+
+    _click(app, f"step_open_{step_id}")
+    assert _editor_keys(app) == []
+    assert app.session_state[f"steps_title_{step_id}"] == "Load Data"
+    assert app.session_state[f"steps_content_{step_id}"] == "Run the loader."
+
+    _click(app, f"step_open_{step_id}")
+    assert app.text_input(key=f"step_editor_title_{step_id}").value == "Load Data"
+
+
+def test_move_steps(app):
+    a, b, c = _set_steps(app, "A", "B", "C")
+    assert app.button(key=f"step_up_{a}").disabled and app.button(key=f"step_down_{c}").disabled
+
+    _click(app, f"step_down_{a}")
+    assert _order(app) == [b, a, c]
+    _click(app, f"step_up_{c}")
+    assert _order(app) == [b, c, a]
+    assert [s.split(" · ")[0] for s in _summaries(app)] == ["**Step 1:** B", "**Step 2:** C", "**Step 3:** A"]
+
+
+def test_open_step_keeps_unsaved_edits_when_moved(app):
+    a, b, _ = _set_steps(app, "A", "B", "C")
+    _click(app, f"step_open_{b}")
+    app.text_input(key=f"step_editor_title_{b}").input("B edited")
+    _click(app, f"step_up_{b}")
+    assert _order(app)[0] == b
+    assert app.text_input(key=f"step_editor_title_{b}").value == "B edited"
+    assert app.session_state[f"steps_title_{b}"] == "B edited"
+
+
+def test_insert_below_opens_the_new_step(app):
+    a, b, c = _set_steps(app, "A", "B", "C")
+    _click(app, f"step_insert_{a}")
+    order = _order(app)
+    assert len(order) == 4 and order[0] == a and order[2:] == [b, c]
+    new = order[1]
+    assert app.session_state["step_active"] == new
+    assert app.text_input(key=f"step_editor_title_{new}").value == ""
+
+    _click(app, "step_add")
+    assert len(_order(app)) == 5 and app.session_state["step_active"] == _order(app)[-1]
+
+
+def test_delete_drops_the_step_and_its_draft_fields(app, db_path):
+    a, b, c = _set_steps(app, "A", "B", "C")
+    assert {f"steps_title_{b}", f"steps_content_{b}"} <= _stored_keys(db_path)
+
+    _click(app, f"step_open_{b}")
+    _click(app, f"step_delete_{b}")
+    assert _order(app) == [a, c]
+    assert f"steps_title_{b}" not in app.session_state and app.session_state["step_active"] is None
+    stored = _stored_keys(db_path)
+    assert not {k for k in stored if k.endswith(f"_{b}")}
+    assert {f"steps_title_{a}", f"steps_title_{c}"} <= stored
+
+
+def test_steps_survive_a_reload(app, db_path):
+    a, b, c = _set_steps(app, "A", "B", "C")
+    _click(app, f"step_down_{a}")
+    _stored_keys(db_path)
+
+    reloaded = _open_app()
+    assert _order(reloaded) == [b, a, c]
+    assert [s.split(" · ")[0] for s in _summaries(reloaded)] == ["**Step 1:** B", "**Step 2:** A", "**Step 3:** C"]
+
+
+def test_submit_writes_the_edited_steps_in_order(app, downloads):
+    a, b, c = _set_steps(app, "Load", "Unused", "Train")
+    _click(app, f"step_delete_{b}")
+    _click(app, f"step_up_{c}")
+    _click(app, f"step_insert_{a}")
+    app.text_input(key=f"step_editor_title_{_order(app)[2]}").input("Deploy")
+    app.text_input(key="meta_guide_id").input("step-editor-guide")
+    _click(app, SUBMIT_KEY)
+    assert [e.value for e in app.error] == []
+
+    (name, data), = [d for d in downloads if d[0].endswith(".zip")]
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        md = archive.read("step-editor-guide.md").decode("utf-8")
+    assert [line for line in md.splitlines() if line.startswith("## Step ")] == [
+        "## Step 1: Train", "## Step 2: Load", "## Step 3: Deploy",
+    ]
+    assert "Train body" in md and "Load body" in md and "Unused" not in md
+
+
+# Guide import
+
+def test_unedited_import_regenerates_byte_for_byte(app, downloads):
+    source = _template()
+    _import_guide(app, source)
+    assert _submitted_markdown(app, downloads, "markdown-template") == source
+
+
+def test_import_survives_a_reload(app, db_path, downloads):
+    source = _template()
+    _import_guide(app, source)
+    assert "guide_source" in _stored_keys(db_path)
+
+    reloaded = _open_app()
+    assert _submitted_markdown(reloaded, downloads, "markdown-template") == source
+
+
+def test_edits_to_an_imported_guide_re_render_only_what_changed(app, downloads):
+    custom = "snowflake-site:taxonomy/custom/not-in-the-form"
+    source = _template().replace("status: Published", "status: Hidden").replace(
+        "certification/quickstart\n", f"certification/quickstart, {custom}\n", 1)
+    _import_guide(app, source)
+    assert custom in app.session_state["guide_import_note"]
+
+    app.text_input(key="meta_summary").input("Edited summary")
+    deleted = next(sid for sid in _order(app) if app.session_state[f"steps_title_{sid}"] == "Creating Sections")
+    _click(app, f"step_delete_{deleted}")
+    md = _submitted_markdown(app, downloads, "markdown-template")
+
+    expected = source.replace("summary: This is a sample Snowflake Template", "summary: Edited summary")
+    start = expected.index("<!-- ------------------------ -->\n## Creating Sections")
+    end = expected.index("<!-- ------------------------ -->\n## Headers and Subheaders")
+    assert md == expected[:start] + expected[end:]
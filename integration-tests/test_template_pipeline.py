@@ -0,0 +1,173 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from utils.template_pipeline import (
+    PIPELINE,
+    ClaudeCliBackend,
+    FakeBackend,
+    PipelineRunner,
+    Step,
+    StepError,
+    ancestors,
+    topological_order,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = {s.id: s for s in PIPELINE}
+ALL_STEPS = [s.id for s in PIPELINE]
+
+
+@pytest.fixture
+def env(tmp_path):
+    user_input = tmp_path / "my-template.md"
+    user_input.write_text("Build a churn model template.\n", encoding="utf-8")
+    return {"input": str(user_input), "cache": str(tmp_path / "cache"), "out": str(tmp_path / "out")}
+
+
+def _run(env, backend, force=()):
+    runner = PipelineRunner(backend, cache_dir=env["cache"], workers=4, out=io.StringIO())
+    results = runner.run("my-template", env["input"], env["out"], force)
+    return {step_id: r["status"] for step_id, r in results.items()}
+
+
+def test_dependencies_come_first():
+    order = [s.id for s in topological_order(PIPELINE)]
+    for step in PIPELINE:
+        assert all(order.index(dep) < order.index(step.id) for dep in step.deps)
+    assert ancestors(PIPELINE)["step7"] >= {"step1", "step2", "step3", "step3.5", "step6"}
+
+
+def test_first_run_runs_everything_and_publishes(env):
+    backend = FakeBackend()
+    assert set(_run(env, backend).values()) == {"ran"}
+    assert sorted(backend.calls) == sorted(ALL_STEPS)
+    out = set(os.listdir(env["out"]))
+    assert {"plan.md", "code.py", "validate_code.py", "streamlit_code.py", "template.ipynb"} <= out
+    with open(os.path.join(env["out"], "code.py"), encoding="utf-8") as f:
+        assert f.read().endswith("# validated\n")  # step3's version replaces step2's
+    assert ".steps" not in out
+    json.load(open(os.path.join(env["out"], "template.ipynb"), encoding="utf-8"))
+
+
+def test_second_run_is_served_from_cache(env):
+    _run(env, FakeBackend())
+    backend = FakeBackend()
+    assert set(_run(env, backend).values()) == {"cached"}
+    assert backend.calls == []
+
+
+def test_force_reruns_only_that_step_when_its_output_is_unchanged(env):
+    _run(env, FakeBackend())
+    backend = FakeBackend()
+    statuses = _run(env, backend, force=["step3"])
+    assert backend.calls == ["step3"]
+    assert statuses["step3"] == "ran"
+    assert {statuses[s] for s in ALL_STEPS if s != "step3"} == {"cached"}
+
+
+def test_changed_user_input_invalidates_downstream_steps(env):
+    _run(env, FakeBackend())
+    with open(env["input"], "a", encoding="utf-8") as f:
+        f.write("Also add a dashboard.\n")
+    backend = FakeBackend()
+    statuses = _run(env, backend)
+    assert statuses["step1"] == "ran" and statuses["step1.5"] == "ran"
+    assert statuses["step2"] == "ran" and statuses["step8"] == "ran"
+
+
+def test_failed_step_blocks_only_its_dependents(env):
+    statuses = _run(env, FakeBackend(fail={"step3"}))
+    assert statuses["step3"] == "failed"
+    assert statuses["step3.5"] == "blocked" and statuses["step7"] == "blocked"
+    assert statuses["step1"] == statuses["step2"] == "ran"
+    assert os.path.isdir(os.path.join(env["out"], ".steps"))  # kept for inspection
+
+    backend = FakeBackend()
+    statuses = _run(env, backend)
+    assert "step1" not in backend.calls and "step2" not in backend.calls
+    assert statuses["step3"] == "ran" and statuses["step8"] == "ran"
+
+
+def test_skipped_streamlit_branch(env):
+    statuses = _run(env, FakeBackend(streamlit=False, template_format="sql"))
+    assert statuses["step5"] == statuses["step6"] == statuses["step8"] == "skipped"
+    assert statuses["step7"] == "ran"
+    assert "template.sql" in os.listdir(env["out"])
+
+
+def test_cli_force_with_the_fake_backend(env):
+    cmd = [
+        sys.executable, "-m", "utils.template_pipeline", "my-template", "--backend", "fake",
+        "--input", env["input"], "--out", env["out"], "--cache-dir", env["cache"],
+    ]
+    first = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True, timeout=60)
+    assert first.returncode == 0, first.stderr
+    second = subprocess.run(cmd + ["--force", "step2"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=60)
+    assert second.returncode == 0, second.stderr
+    assert "✅ step2 Core code generation: ran" in second.stdout
+    assert "♻️ step1 Template planning: cached" in second.stdout
+    bad = subprocess.run(cmd + ["--force", "step99"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=60)
+    assert bad.returncode == 2 and "unknown step(s): step99" in bad.stderr
+
+
+# A stand-in for `sf ai claude`: finds the work folder in the prompt and writes what the test asks for
+
+AGENT = textwrap.dedent("""
+    import os, re, sys
+    workdir = re.search(r"Use the folder (\\S+) wherever", sys.argv[-1]).group(1)
+    for name, text in {writes!r}.items():
+        with open(os.path.join(workdir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+""")
+
+
+def _run_cli_step(tmp_path, step_id, inputs, writes):
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    for name, text in inputs.items():
+        (workdir / name).write_text(text, encoding="utf-8")
+    script = tmp_path / "agent.py"
+    script.write_text(AGENT.format(writes=writes), encoding="utf-8")
+    backend = ClaudeCliBackend(command=[sys.executable, str(script)])
+    job = {"template_id": "t", "user_input_path": "inputs.md", "inputs": inputs, "workdir": str(workdir)}
+    return backend.run_step(STEPS[step_id], job)
+
+
+def test_input_copies_do_not_count_as_outputs(tmp_path, monkeypatch):
+    monkeypatch.setitem(STEPS, "regen", Step("regen", "Regenerate", "step2-core-code-generation.md", outputs=("code.*",)))
+    with pytest.raises(StepError, match=r"regen did not write code\.\* \(only the unchanged input copy is there\)"):
+        _run_cli_step(tmp_path, "regen", {"code.py": "x = 1\n"}, {})
+
+
+@pytest.mark.parametrize("step_id, inputs, writes, passed_through", [
+    ("step3", {"code.py": "x = 1\n"}, {"validate_code.py": "x = 1\n"}, "code.py"),
+    ("step6", {"streamlit_code.py": "import streamlit\n"}, {"streamlit_validation.md": "ok\n"}, "streamlit_code.py"),
+    ("step8", {"template.ipynb": "{}"}, {"template_validation.md": "ok\n"}, "template.ipynb"),
+])
+def test_validation_that_finds_nothing_to_fix_passes_files_through(tmp_path, step_id, inputs, writes, passed_through):
+    files = _run_cli_step(tmp_path, step_id, inputs, writes)
+    assert files == {**writes, passed_through: inputs[passed_through]}
+
+
+def test_step_that_writes_nothing_fails(tmp_path):
+    with pytest.raises(StepError, match=r"step8 did not write template_validation\.md"):
+        _run_cli_step(tmp_path, "step8", {"template.ipynb": "{}"}, {})
+
+
+def test_rewritten_outputs_are_collected(tmp_path):
+    files = _run_cli_step(
+        tmp_path, "step3", {"plan.md": "plan", "code.py": "x = 1\n"},
+        {"code.py": "x = 2\n", "validate_code.py": "x = 2\n"},
+    )
+    assert files == {"code.py": "x = 2\n", "validate_code.py": "x = 2\n"}
+
+
+def test_fixed_files_come_back_with_the_report(tmp_path):
+    files = _run_cli_step(tmp_path, "step8", {"template.ipynb": "{"}, {"template.ipynb": "{}", "template_validation.md": "fixed\n"})
+    assert files == {"template.ipynb": "{}", "template_validation.md": "fixed\n"}
@@ -0,0 +1,90 @@
+import json
+import random
+
+import pytest
+
+from utils import webhook_dispatcher
+from utils.mock_webhook_server import MockWebhookServer
+from utils.webhook_dispatcher import _backoff_delay, build_payloads, dispatch, idempotency_key
+
+QUICKSTARTS = [{"name": f"guide-{i}", "language": "en"} for i in range(3)]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping through them."""
+    recorded = []
+    monkeypatch.setattr(webhook_dispatcher.time, "sleep", recorded.append)
+    return recorded
+
+
+def _payloads(batch_size=1):
+    return build_payloads(QUICKSTARTS, "staging", "org/repo", "abc123", "refs/heads/main", "7", batch_size)
+
+
+def test_payloads_are_delivered_once_each(sleeps):
+    with MockWebhookServer() as server:
+        results, report = dispatch(server.url, _payloads(), concurrency=3)
+    assert report["delivered"] == 3 and report["failed"] == 0 and report["retries"] == 0
+    assert sorted(r["payload"]["quickstart_name"] for r in server.received) == ["guide-0", "guide-1", "guide-2"]
+    assert len({r["idempotency_key"] for r in server.received}) == 3
+    assert sleeps == []
+
+
+def test_batching_uses_quickstart_names():
+    payloads = _payloads(batch_size=2)
+    assert [len(p["quickstart_names"]) for p in payloads] == [2, 1]
+    assert payloads[0]["pr_number"] == 7
+
+
+def test_server_errors_are_retried_with_backoff(sleeps):
+    random.seed(0)
+    with MockWebhookServer(fail_first=2) as server:
+        results, report = dispatch(server.url, _payloads()[:1], concurrency=1, max_retries=3, base_delay=0.5, max_delay=10)
+    assert results[0]["ok"] and results[0]["attempts"] == 3
+    assert report["retries"] == 2
+    assert len(server.received) == 1
+    # full jitter: attempt n waits somewhere in [0, base * 2**n]
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    random.seed(1)
+    assert all(_backoff_delay(attempt, 2.0, 5.0) <= 5.0 for attempt in range(10))
+    assert _backoff_delay(0, 0.1, 1.0, retry_after="3") >= 3.0
+    assert _backoff_delay(0, 0.1, 1.0, retry_after="soon") <= 0.1
+
+
+def test_rate_limit_is_retried(sleeps):
+    with MockWebhookServer(rate_limit_every=1) as server:
+        results, _ = dispatch(server.url, _payloads()[:1], concurrency=1, max_retries=2, base_delay=0.01)
+    assert not results[0]["ok"]
+    assert results[0]["status"] == 429 and results[0]["attempts"] == 3
+
+
+def test_repeated_dispatch_is_idempotent(sleeps):
+    payloads = _payloads()
+    with MockWebhookServer() as server:
+        dispatch(server.url, payloads)
+        results, report = dispatch(server.url, payloads)
+    assert report["delivered"] == 3
+    assert len(server.received) == 3
+    assert all(json.loads(r["response"])["duplicate"] for r in results)
+
+
+def test_idempotency_key_header_is_stable_per_payload(sleeps):
+    payloads = _payloads()
+    with MockWebhookServer() as server:
+        results, _ = dispatch(server.url, payloads)
+    expected = {idempotency_key(p["environment"], p["commit_sha"], p["quickstart_names"]) for p in payloads}
+    assert {r["idempotency_key"] for r in server.received} == expected
+    assert {r["idempotency_key"] for r in results} == expected
+
+
+def test_payloads_still_failing_after_retries_are_reported(sleeps):
+    with MockWebhookServer(fail_rate=1.0) as server:
+        results, report = dispatch(server.url, _payloads(), max_retries=1, base_delay=0.01)
+    assert report["delivered"] == 0 and report["failed"] == 3 and report["retries"] == 3
+    assert [(r["ok"], r["status"], r["attempts"]) for r in results] == [(False, 503, 2)] * 3
+    assert server.received == []
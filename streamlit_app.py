@@ -1,13 +1,24 @@
 import streamlit as st
-import os, io, re, tempfile, zipfile, requests
+import os, io, re, mimetypes, tempfile, uuid, zipfile, requests
 from datetime import datetime
 from urllib.parse import urlparse
 
+from utils.asset_index import index_asset_references, prune_orphans
+from utils.draft_store import DraftStore
+from utils.guide_common import (
+    ALLOWED_LANGS, IMAGE_CT_RE, MemoryUpload, sanitize_filename, select_guide_assets, validate_markdown,
+)
+from utils.guide_fanout import fan_out, overrides_from_files
+from utils.guide_model import apply_sections, guide_to_sections, parse_guide, serialize
+from utils.notebook_import import import_notebook
+
 # Reference: Language and Category Tags
 # https://www.snowflake.com/en/developers/guides/get-started-with-guides/#language-and-category-tags
 
-ALLOWED_LANGS = ["en","es","it","fr","de","ja","ko","pt_br"]
-CATEGORIES_SOURCE_URL = "https://www.snowflake.com/en/developers/guides/get-started-with-guides/#language-and-category-tags"
+CATEGORIES_SOURCE_URL = os.environ.get(
+    "GUIDE_CATEGORIES_URL",
+    "https://www.snowflake.com/en/developers/guides/get-started-with-guides/#language-and-category-tags",
+)
 
 # Fallback: minimal map in case live fetch/parse fails
 CATEGORIES_FALLBACK = {
@@ -36,7 +47,37 @@ CATEGORIES_FALLBACK = {
     "Alerts": "snowflake-site:taxonomy/products/alerts",
 }
 
-IMAGE_CT_RE = re.compile(r"image/(png|jpeg|jpg|gif|svg|webp|bmp|x-icon)", re.I)
+CONTENT_TYPE_OPTIONS = {
+    # Full Content Type list
+    "Community Solution": "snowflake-site:taxonomy/solution-center/certification/community-sourced",
+    "Partner Solution": "snowflake-site:taxonomy/solution-center/certification/partner-solution",
+    "Certified Solution": "snowflake-site:taxonomy/solution-center/certification/certified-solution",
+    "Quickstart": "snowflake-site:taxonomy/solution-center/certification/quickstart",
+}
+FEATURED_CATEGORY = "snowflake-site:taxonomy/technical/featured"
+
+# Step editor: summaries are paged so a rerun renders at most this many rows
+STEP_PAGE_SIZE = 10
+
+# Form state persisted to the local draft store (file uploaders cannot be restored,
+# so their contents are stored separately as assets); guide_source is the markdown
+# of an imported guide, which the form's edits are applied to on export
+DRAFT_FIELD_PREFIXES = ("meta_", "content_", "steps_title_", "steps_content_")
+DRAFT_FIELD_KEYS = ("steps_order", "assets_prune", "guide_source")
+DRAFTS_DB_PATH = os.environ.get("GUIDE_DRAFTS_DB", os.path.join(".drafts", "drafts.sqlite3"))
+DRAFTS_MAX_AGE_DAYS = float(os.environ.get("GUIDE_DRAFTS_MAX_AGE_DAYS", "30"))
+STEP_FIELD_RE = re.compile(r"^steps_(?:title|content)_(.+)$")
+
+# Widget defaults live in session state rather than in value=/index=, so a restored
+# draft or an imported guide can pre-fill the same widgets without a conflict
+FIELD_DEFAULTS = {
+    "meta_language": "en",
+    "meta_env": "web (default)",
+    "meta_feedback": "https://github.com/Snowflake-Labs/sfguides/issues",
+    "meta_forkrepo": "<repo>",
+    "meta_openin": "<deeplink or remove>",
+    "meta_content_type": next(iter(CONTENT_TYPE_OPTIONS)),
+}
 
 
 def load_template():
@@ -59,76 +100,28 @@ def load_template():
     )
 
 
-def validate_markdown(md_text, guide_id):
-    issues = []
-    # language within first 50 lines and allowed
-    first_50 = "\n".join(md_text.splitlines()[:50])
-    m = re.search(r"^\s*language:\s*(.+)$", first_50, re.M)
-    lang = m.group(1).strip().strip("'\"") if m else ""
-    if not lang or lang.lower() not in ALLOWED_LANGS:
-        issues.append(f'language must be one of {ALLOWED_LANGS} and in first 50 lines (found "{lang}")')
-    # id matches guide_id
-    m = re.search(r"^\s*id:\s*(.+)$", md_text, re.M)
-    md_id = m.group(1).strip() if m else ""
-    if md_id != guide_id:
-        issues.append(f'id must match folder/file name "{guide_id}" (found "{md_id}")')
-    # categories: allow comma-separated taxonomy paths
-    m = re.search(r"^\s*categories:\s*(.+)$", md_text, re.M)
-    cats_line = m.group(1).strip() if m else ""
-    if not cats_line:
-        issues.append('categories must be set (comma-separated taxonomy paths)')
-    else:
-        paths = [c.strip() for c in cats_line.split(",") if c.strip()]
-        if not paths or any(not p.startswith("snowflake-site:taxonomy/") for p in paths):
-            issues.append('categories must be comma-separated taxonomy paths (e.g., snowflake-site:taxonomy/solution-center/certification/quickstart)')
-    return issues
-
-
-def sanitize_filename(name):
-    base = os.path.basename(name)
-    # prefer hyphens, allow . _ -
-    base = base.lower().replace("_", "-")
-    return re.sub(r"[^a-z0-9_.\-]", "", base)
-
-
-def write_guide_tree(base_dir, guide_id, md_text, image_files, other_files):
+def write_guide_tree(base_dir, guide_id, md_text, image_files, other_files, prune_unreferenced=False):
     guide_dir = os.path.join(base_dir, "site", "sfguides", "src", guide_id)
     assets_dir = os.path.join(guide_dir, "assets")
     os.makedirs(assets_dir, exist_ok=True)
-    with open(os.path.join(guide_dir, f"{guide_id}.md"), "w", encoding="utf-8") as f:
-        f.write(md_text)
 
     saved = []
-
-    # Images (<= 1MB)
-    for up in image_files or []:
-        # accept by content-type or extension
-        is_image = (up.type and IMAGE_CT_RE.search(up.type)) or re.search(r"\.(png|jpe?g|gif|svg|webp|bmp|ico)$", up.name.lower())
-        if not is_image:
-            continue
-        data = up.getvalue()
-        if len(data) > 1_000_000:
-            continue
-        name = sanitize_filename(up.name)
-        p = os.path.join(assets_dir, name)
-        with open(p, "wb") as f:
+    for name, data in select_guide_assets(image_files, other_files):
+        with open(os.path.join(assets_dir, name), "wb") as f:
             f.write(data)
         saved.append(("assets/" + name, len(data)))
 
-    # Additional files (any type), cap at 10MB, skip .md
-    for up in other_files or []:
-        data = up.getvalue()
-        if len(data) > 10_000_000:
-            continue
-        name = sanitize_filename(up.name)
-        if not name or name.endswith(".md"):
-            continue
-        p = os.path.join(assets_dir, name)
-        with open(p, "wb") as f:
-            f.write(data)
-        saved.append(("assets/" + name, len(data)))
+    # Point references at the sanitized names before the markdown is written
+    asset_report = index_asset_references(md_text, [n[len("assets/"):] for n, _ in saved])
+    asset_report["pruned"] = []
+    if prune_unreferenced and asset_report["orphans"]:
+        asset_report["pruned"] = prune_orphans(guide_dir, asset_report["orphans"])
+        pruned = set("assets/" + n for n in asset_report["pruned"])
+        saved = [(n, size) for n, size in saved if n not in pruned]
+    with open(os.path.join(guide_dir, f"{guide_id}.md"), "w", encoding="utf-8") as f:
+        f.write(asset_report["markdown"])
 
-    return guide_dir, saved
+    return guide_dir, saved, asset_report
 
 
 def zipdir(path):
@@ -268,6 +261,313 @@ def build_guide_markdown(meta, sections):
     return "\n".join(header + body)
 
 
+def import_notebook_into_form():
+    """on_click callback: fill title, overview and step fields from the uploaded notebook."""
+    up = st.session_state.get("notebook_upload")
+    if not up:
+        return
+    up.seek(0)
+    try:
+        sections = import_notebook(up, up.name)
+    except ValueError as e:
+        st.session_state["notebook_import_note"] = f"Could not import {up.name}: {e}"
+        return
+    order = replace_steps(sections["steps"])
+    if sections["title"] and not st.session_state.get("content_title"):
+        st.session_state["content_title"] = sections["title"]
+    if sections["overview"] and not st.session_state.get("content_overview"):
+        st.session_state["content_overview"] = sections["overview"]
+    st.session_state["imported_assets"] = [MemoryUpload(n, data, mime) for n, data, mime in sections["assets"]]
+    note = f"Imported {len(order)} step(s) and {len(sections['assets'])} image(s) from {up.name}."
+    if sections["skipped_images"]:
+        note += f" Skipped {sections['skipped_images']} image output(s) over 1MB or unreadable."
+    st.session_state["notebook_import_note"] = note
+
+
+def replace_steps(steps):
+    """Swap the step list for new {"title", "content"} steps; returns the new step ids."""
+    for step_id in st.session_state.get("steps_order", []):
+        drop_step_state(step_id)
+    order = []
+    for step in steps:
+        step_id = new_step_id()
+        st.session_state[f"steps_title_{step_id}"] = step["title"]
+        st.session_state[f"steps_content_{step_id}"] = step["content"]
+        order.append(step_id)
+    st.session_state["steps_order"] = order or [new_step_id()]
+    st.session_state["step_active"] = None
+    st.session_state["step_page"] = 0
+    return order
+
+
+def read_guide_upload(up):
+    """Markdown text and asset uploads from an uploaded guide .md or a ZIP of its folder."""
+    up.seek(0)
+    if not up.name.lower().endswith(".zip"):
+        return up.read().decode("utf-8"), []
+    with zipfile.ZipFile(up) as zf:
+        names = [n for n in zf.namelist() if not n.endswith("/") and not n.startswith("__MACOSX/")]
+        md_names = [n for n in names if n.lower().endswith(".md") and "/assets/" not in f"/{n}"]
+        if not md_names:
+            raise ValueError("no guide markdown found in the ZIP")
+        # the guide itself sits next to assets/ (<id>/<id>.md); prefer the shallowest one
+        md_name = min(md_names, key=lambda n: (n.count("/"), n))
+        md_text = zf.read(md_name).decode("utf-8")
+        assets = []
+        for n in names:
+            if "/assets/" in f"/{n}" and not os.path.basename(n).startswith("."):
+                name = os.path.basename(n)
+                assets.append(MemoryUpload(name, zf.read(n), mimetypes.guess_type(name)[0] or ""))
+    return md_text, assets
+
+
+def import_guide_into_form(categories_map):
+    """on_click callback: load an existing guide (.md or ZIP) into the form for editing."""
+    up = st.session_state.get("guide_upload")
+    if not up:
+        return
+    try:
+        md_text, assets = read_guide_upload(up)
+    except (ValueError, UnicodeDecodeError, zipfile.BadZipFile) as e:
+        st.session_state["guide_import_note"] = f"Could not import {up.name}: {e}"
+        return
+    guide = parse_guide(md_text)
+    st.session_state["guide_source"] = md_text
+    st.session_state["imported_guide"] = guide
+    meta, sections = guide_to_sections(guide)
+
+    for key, field in (
+        ("meta_guide_id", "id"), ("meta_author", "author"), ("meta_summary", "summary"),
+        ("meta_env", "environments"), ("meta_feedback", "feedback"),
+        ("meta_forkrepo", "fork_repo"), ("meta_openin", "open_in"),
+    ):
+        st.session_state[key] = meta[field]
+    if meta["language"] in ALLOWED_LANGS:
+        st.session_state["meta_language"] = meta["language"]
+
+    # Categories go back into the product, content type and featured widgets
+    labels_by_path = {path: label for label, path in categories_map.items()}
+    content_types = {path: label for label, path in CONTENT_TYPE_OPTIONS.items()}
+    products, unknown = [], []
+    st.session_state["meta_feature"] = False
+    for path in [c.strip() for c in meta["categories"].split(",") if c.strip()]:
+        if path == FEATURED_CATEGORY:
+            st.session_state["meta_feature"] = True
+        elif path in content_types:
+            st.session_state["meta_content_type"] = content_types[path]
+        elif path in labels_by_path:
+            products.append(labels_by_path[path])
+        else:
+            unknown.append(path)
+    st.session_state["meta_products"] = products
+
+    for field in ("title", "overview", "learn", "need", "build", "conclusion", "resources"):
+        st.session_state[f"content_{field}"] = sections[field]
+    order = replace_steps(sections["steps"])
+
+    images = [a for a in assets if IMAGE_CT_RE.match(a.type)]
+    st.session_state["restored_images"] = images
+    st.session_state["restored_other"] = [a for a in assets if a not in images]
+    st.session_state["imported_assets"] = []
+    note = f"Imported {meta['id'] or up.name}: {len(order)} step(s) and {len(assets)} asset(s)."
+    if unknown:
+        note += " Categories not offered by the form are kept as they are: " + ", ".join(unknown)
+    st.session_state["guide_import_note"] = note
+
+
+def imported_guide():
+    """The guide loaded with "Load guide" (parsed again from the draft after a reload), or None."""
+    source = st.session_state.get("guide_source")
+    if not source:
+        return None
+    if "imported_guide" not in st.session_state:
+        st.session_state["imported_guide"] = parse_guide(source)
+    return st.session_state["imported_guide"]
+
+
+def keep_unlisted_categories(categories, guide, categories_map):
+    """Form categories plus those of the imported guide that the form has no widget for."""
+    listed = set(categories_map.values()) | set(CONTENT_TYPE_OPTIONS.values()) | {FEATURED_CATEGORY}
+    paths = [c.strip() for c in categories.split(",") if c.strip()]
+    for path in [c.strip() for c in guide.frontmatter.get("categories", "").split(",") if c.strip()]:
+        if path not in listed and path not in paths:
+            paths.append(path)
+    return ", ".join(paths)
+
+
+def new_step_id():
+    return uuid.uuid4().hex[:8]
+
+
+def init_steps():
+    """Start a new guide with three empty steps."""
+    if "steps_order" not in st.session_state:
+        st.session_state["steps_order"] = [new_step_id() for _ in range(3)]
+
+
+def step_field(step_id, field):
+    return st.session_state.get(f"steps_{field}_{step_id}", "")
+
+
+def drop_step_state(step_id):
+    for field in ("title", "content"):
+        st.session_state.pop(f"steps_{field}_{step_id}", None)
+        st.session_state.pop(f"step_editor_{field}_{step_id}", None)
+
+
+def sync_active_step():
+    """Copy the open editor's widget values into the step data, which outlives the widgets."""
+    step_id = st.session_state.get("step_active")
+    for field in ("title", "content"):
+        widget_key = f"step_editor_{field}_{step_id}"
+        if step_id is not None and widget_key in st.session_state:
+            st.session_state[f"steps_{field}_{step_id}"] = st.session_state[widget_key]
+
+
+def show_step_page_of(step_id):
+    st.session_state["step_page"] = st.session_state["steps_order"].index(step_id) // STEP_PAGE_SIZE
+
+
+def toggle_step(step_id):
+    sync_active_step()
+    if st.session_state.get("step_active") == step_id:
+        st.session_state["step_active"] = None
+        return
+    for field in ("title", "content"):
+        st.session_state[f"step_editor_{field}_{step_id}"] = step_field(step_id, field)
+    st.session_state["step_active"] = step_id
+    show_step_page_of(step_id)
+
+
+def move_step(step_id, delta):
+    sync_active_step()
+    order = list(st.session_state["steps_order"])
+    i = order.index(step_id)
+    j = i + delta
+    if 0 <= j < len(order):
+        order[i], order[j] = order[j], order[i]
+        st.session_state["steps_order"] = order
+        show_step_page_of(step_id)
+
+
+def insert_step(after_id=None):
+    sync_active_step()
+    order = list(st.session_state["steps_order"])
+    step_id = new_step_id()
+    st.session_state[f"steps_title_{step_id}"] = ""
+    st.session_state[f"steps_content_{step_id}"] = ""
+    order.insert(order.index(after_id) + 1 if after_id in order else len(order), step_id)
+    st.session_state["steps_order"] = order
+    toggle_step(step_id)
+
+
+def delete_step(step_id):
+    sync_active_step()
+    st.session_state["steps_order"] = [s for s in st.session_state["steps_order"] if s != step_id]
+    drop_step_state(step_id)
+    if st.session_state.get("step_active") == step_id:
+        st.session_state["step_active"] = None
+
+
+def set_step_page(page):
+    sync_active_step()
+    st.session_state["step_page"] = page
+
+
+def _summary_text(text):
+    return re.sub(r"([\\`*_\[\]#<>|])", r"\\\1", text)
+
+
+@st.fragment
+def step_editor(store, draft_id):
+    """
+    Steps as one-line summaries, paged, with only the open step rendered as
+    input widgets. Runs as a fragment so editing, reordering, inserting or
+    deleting a step reruns just this section, however many steps there are.
+    """
+    sync_active_step()  # the summaries below show what was just typed
+    order = st.session_state["steps_order"]
+    pages = max(1, -(-len(order) // STEP_PAGE_SIZE))
+    page = min(st.session_state.get("step_page", 0), pages - 1)
+    first = page * STEP_PAGE_SIZE
+    active = st.session_state.get("step_active")
+
+    st.subheader(f"Steps to include in Guide ({len(order)})")
+    for i, step_id in enumerate(order[first:first + STEP_PAGE_SIZE], start=first):
+        title = step_field(step_id, "title").strip() or "(untitled)"
+        size = len(step_field(step_id, "content"))
+        c_sum, c_open, c_up, c_down, c_ins, c_del = st.columns([10, 1, 1, 1, 1, 1])
+        c_sum.markdown(f"**Step {i+1}:** {_summary_text(title)} · {size} chars")
+        c_open.button("▾" if step_id == active else "✏️", key=f"step_open_{step_id}",
+                      on_click=toggle_step, args=(step_id,), help="Edit / collapse")
+        c_up.button("⬆", key=f"step_up_{step_id}", on_click=move_step, args=(step_id, -1),
+                    disabled=i == 0, help="Move up")
+        c_down.button("⬇", key=f"step_down_{step_id}", on_click=move_step, args=(step_id, 1),
+                      disabled=i == len(order) - 1, help="Move down")
+        c_ins.button("➕", key=f"step_insert_{step_id}", on_click=insert_step, args=(step_id,), help="Insert a step below")
+        c_del.button("🗑", key=f"step_delete_{step_id}", on_click=delete_step, args=(step_id,), help="Delete")
+        if step_id == active:
+            # labels must not include the position: they are part of the widget id, and a
+            # moved step would otherwise get a fresh, empty widget
+            st.text_input("Step title (3–4 words)", key=f"step_editor_title_{step_id}")
+            st.text_area("Step content", key=f"step_editor_content_{step_id}", height=220)
+
+    c_add, c_prev, c_page, c_next = st.columns([4, 1, 2, 1])
+    c_add.button("Add step", key="step_add", on_click=insert_step)
+    if pages > 1:
+        c_prev.button("◀", key="step_page_prev", on_click=set_step_page, args=(page - 1,), disabled=page == 0)
+        c_page.caption(f"Steps {first + 1}–{min(first + STEP_PAGE_SIZE, len(order))} of {len(order)}")
+        c_next.button("▶", key="step_page_next", on_click=set_step_page, args=(page + 1,), disabled=page == pages - 1)
+
+    # Fragment reruns skip the end-of-script draft save, so stage the step fields here
+    fields = {"steps_order": order}
+    if active in order:
+        fields[f"steps_title_{active}"] = step_field(active, "title")
+        fields[f"steps_content_{active}"] = step_field(active, "content")
+    store.stage(draft_id, fields, stale=lambda key: is_stale_step_field(key, order))
+
+
+@st.cache_resource
+def get_draft_store(path):
+    return DraftStore(path, max_age_s=DRAFTS_MAX_AGE_DAYS * 24 * 3600)
+
+
+def is_draft_field(key):
+    return key.startswith(DRAFT_FIELD_PREFIXES) or key in DRAFT_FIELD_KEYS
+
+
+def is_stale_step_field(key, order):
+    """Title/content field of a step that is no longer in the step list (deleted or replaced)."""
+    m = STEP_FIELD_RE.match(key)
+    return bool(m) and m.group(1) not in order
+
+
+def restore_draft(store, draft_id):
+    """Load a saved draft into session state before any widget is created."""
+    fields, assets = store.load(draft_id)
+    order = fields.get("steps_order")
+    for key, value in fields.items():
+        if is_draft_field(key) and not (order is not None and is_stale_step_field(key, order)):
+            st.session_state[key] = value
+    st.session_state["imported_assets"] = assets.get("imported", [])
+    st.session_state["restored_images"] = assets.get("images", [])
+    st.session_state["restored_other"] = assets.get("other", [])
+    st.session_state["draft_id"] = draft_id
+
+
+def discard_restored_assets():
+    st.session_state["restored_images"] = []
+    st.session_state["restored_other"] = []
+    st.session_state["imported_assets"] = []
+
+
+def merge_uploads(restored, uploads):
+    """Restored draft assets plus new uploads; a new upload replaces a same-named asset."""
+    uploads = list(uploads or [])
+    names = {sanitize_filename(up.name) for up in uploads}
+    return [up for up in restored or [] if sanitize_filename(up.name) not in names] + uploads
+
+
 def list_ai_inputs(base="new-template-form-inputs"):
     md_files = []
     if os.path.isdir(base):
@@ -509,20 +809,48 @@ st.markdown(
 )
 st.markdown('<h1>Snowflake Guide Generator</h1>', unsafe_allow_html=True)
 
-# Controls outside the form so changes re-render step fields immediately
-st.markdown('<div class="section-label">Change the number to add/remove step fields below</div>', unsafe_allow_html=True)
-_col_step_left, _col_step_right = st.columns([1, 2], gap="large")
-with _col_step_left:
-    st.number_input(
-        "",
-        min_value=1, max_value=20, value=int(st.session_state.get("step_count", 3)),
-        step=1, key="step_count", label_visibility="collapsed"
-    )
+# Drafts: the draft id lives in the URL so a refresh or restart restores the form
+draft_store = get_draft_store(DRAFTS_DB_PATH)
+draft_id = st.query_params.get("draft")
+if not draft_id:
+    draft_id = uuid.uuid4().hex[:12]
+    st.query_params["draft"] = draft_id
+if st.session_state.get("draft_id") != draft_id:
+    restore_draft(draft_store, draft_id)
+for key, value in FIELD_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+st.caption(f"Draft {draft_id} is saved automatically. Bookmark this page to come back to it.")
 
 # Preload categories
 categories_map = fetch_category_map()
 product_names = sorted(categories_map.keys())
 
+# Step editor lives outside the form so steps can be reordered, inserted and deleted
+init_steps()
+_col_step_left, _col_step_right = st.columns([1, 2], gap="large")
+with _col_step_right:
+    step_editor(draft_store, draft_id)
+with _col_step_left:
+    st.markdown('<div class="section-label">Steps are edited one at a time; the list is saved with your draft</div>', unsafe_allow_html=True)
+    with st.expander("Import steps from a notebook (.ipynb)"):
+        st.file_uploader(
+            "Markdown and code cells become steps; image outputs are saved to /assets",
+            type=["ipynb"],
+            key="notebook_upload",
+        )
+        st.button("Import notebook", on_click=import_notebook_into_form, key="notebook_import")
+        if st.session_state.get("notebook_import_note"):
+            st.caption(st.session_state["notebook_import_note"])
+    with st.expander("Edit an existing guide (.md or .zip)"):
+        st.file_uploader(
+            "The guide's markdown, or a ZIP of its folder with assets/; replaces the current form",
+            type=["md", "zip"],
+            key="guide_upload",
+        )
+        st.button("Load guide", on_click=import_guide_into_form, args=(categories_map,), key="guide_import")
+        if st.session_state.get("guide_import_note"):
+            st.caption(st.session_state["guide_import_note"])
+
 with st.form("guide_form"):
     col_meta, col_right = st.columns([1, 2], gap="large")
     with col_meta:
@@ -533,27 +861,43 @@ with st.form("guide_form"):
             key="meta_guide_id",
         ).strip()
         author = st.text_input("Author", placeholder="First Last", key="meta_author").strip()
-        language = st.selectbox("Language", ALLOWED_LANGS, index=ALLOWED_LANGS.index("en"), key="meta_language")
+        language = st.selectbox("Language", ALLOWED_LANGS, key="meta_language")
+        extra_langs = st.multiselect(
+            "Also export in (one folder and id per language, assets shared)",
+            ALLOWED_LANGS,
+            key="meta_extra_langs",
+        )
+        override_uploads = st.file_uploader(
+            "Per-language overrides (translated <lang>.md guides or JSON section overrides)",
+            type=["md", "json"],
+            accept_multiple_files=True,
+            key="lang_overrides",
+        )
         summary = st.text_input("Summary (1 sentence)", placeholder="This is a sample Snowflake Guide", key="meta_summary").strip()
 
         default_products = [product_names[0]] if product_names else []
+        # a restored draft may name products the live taxonomy no longer lists
+        st.session_state["meta_products"] = [
+            p for p in st.session_state.get("meta_products", default_products) if p in product_names
+        ]
         selected_products = st.multiselect(
             "Products (choose one or more; Categories will be added as taxonomy paths)",
             product_names,
-            default=default_products,
             key="meta_products",
         )
         auto_categories_list = [categories_map[p] for p in selected_products] if selected_products else [CATEGORIES_FALLBACK["Quickstart"]]
         auto_categories = ", ".join(auto_categories_list)
         categories_final = auto_categories
 
-        st.text("Status: Published")
-        status = "Published"
+        # an imported guide keeps its status; new guides are published
+        imported = imported_guide()
+        status = (imported.frontmatter.get("status") if imported else "") or "Published"
+        st.text(f"Status: {status}")
 
-        environments = st.text_input("Environments", value="web (default)", key="meta_env").strip()
-        feedback = st.text_input("Feedback link", value="https://github.com/Snowflake-Labs/sfguides/issues", key="meta_feedback").strip()
-        fork_repo = st.text_input("Fork repo link", value="<repo>", key="meta_forkrepo").strip()
-        open_in = st.text_input("Open in Snowflake (if template or deeplink is available)", value="<deeplink or remove>", key="meta_openin").strip()
+        environments = st.text_input("Environments", key="meta_env").strip()
+        feedback = st.text_input("Feedback link", key="meta_feedback").strip()
+        fork_repo = st.text_input("Fork repo link", key="meta_forkrepo").strip()
+        open_in = st.text_input("Open in Snowflake (if template or deeplink is available)", key="meta_openin").strip()
 
         st.subheader("Assets")
         image_uploads = st.file_uploader(
@@ -567,20 +911,16 @@ with st.form("guide_form"):
             accept_multiple_files=True,
             key="assets_other",
         )
+        prune_assets = st.checkbox(
+            "Leave out uploaded assets the guide never references",
+            key="assets_prune",
+        )
 
         # Publishing Options at the bottom of metadata
-        CONTENT_TYPE_OPTIONS = {
-            # Full Content Type list
-            "Community Solution": "snowflake-site:taxonomy/solution-center/certification/community-sourced",
-            "Partner Solution": "snowflake-site:taxonomy/solution-center/certification/partner-solution",
-            "Certified Solution": "snowflake-site:taxonomy/solution-center/certification/certified-solution",
-            "Quickstart": "snowflake-site:taxonomy/solution-center/certification/quickstart",
-        }
         st.subheader("Publishing Options")
         content_type_choice = st.selectbox(
             "Content Type",
             list(CONTENT_TYPE_OPTIONS.keys()),
-            index=0,
             key="meta_content_type",
         )
         feature_flag = st.checkbox("Feature this guide", key="meta_feature")
@@ -592,20 +932,7 @@ with st.form("guide_form"):
         learn = st.text_area("What You’ll Learn (one per line)", height=100, key="content_learn")
         need = st.text_area("What You’ll Need (one per line)", height=100, key="content_need")
         build_txt = st.text_input("What You’ll Build", placeholder="Describe the final outcome", key="content_build")
-
-        st.subheader("Steps to include in Guide")
-        sc = int(st.session_state.get("step_count", 3))
-        steps = []
-        for i in range(sc):
-            st.markdown(f"#### Step {i+1}")
-            title_key = f"steps_title_{i}"
-            content_key = f"steps_content_{i}"
-            st.text_input(f"Step {i+1} title (3–4 words)", key=title_key)
-            st.text_area(f"Step {i+1} content", key=content_key, height=140)
-            steps.append({
-                "title": st.session_state.get(title_key, "").strip(),
-                "content": st.session_state.get(content_key, "").strip()
-            })
+        st.caption("Steps are edited above the form.")
 
         st.subheader("Conclusion and Resources")
         conclusion = st.text_area("Concluding Statement", height=120, key="content_conclusion")
@@ -617,7 +944,7 @@ with st.form("guide_form"):
         if selected_ct_path:
             extra_tags.append(selected_ct_path)
         if feature_flag:
-            extra_tags.append("snowflake-site:taxonomy/technical/featured")
+            extra_tags.append(FEATURED_CATEGORY)
         if extra_tags:
             categories_final = ", ".join([categories_final] + extra_tags)
 
@@ -626,6 +953,22 @@ with st.form("guide_form"):
         with btn_col:
             submitted = st.form_submit_button("Generate Guide")
 
+# Persist the draft: only changed fields are written, debounced into one transaction
+draft_images = merge_uploads(st.session_state.get("restored_images"), image_uploads)
+draft_other = merge_uploads(st.session_state.get("restored_other"), other_uploads)
+draft_store.stage(
+    draft_id,
+    {k: v for k, v in st.session_state.items() if is_draft_field(k)},
+    stale=lambda key: is_stale_step_field(key, st.session_state["steps_order"]),
+)
+draft_store.save_assets(draft_id, "images", draft_images)
+draft_store.save_assets(draft_id, "other", draft_other)
+draft_store.save_assets(draft_id, "imported", st.session_state.get("imported_assets", []))
+if st.session_state.get("restored_images") or st.session_state.get("restored_other"):
+    restored_names = [up.name for up in st.session_state.get("restored_images", []) + st.session_state.get("restored_other", [])]
+    st.caption("Assets restored from your draft: " + ", ".join(restored_names))
+    st.button("Discard restored assets", on_click=discard_restored_assets, key="draft_discard_assets")
+
 if submitted:
     if not guide_id or not re.match(r"^[a-z0-9][a-z0-9\-]*[a-z0-9]$", guide_id):
         st.error("Guide ID required (lowercase letters/numbers with hyphens).")
@@ -644,6 +987,10 @@ if submitted:
         "fork_repo": fork_repo,
         "open_in": open_in
     }
+    steps = [
+        {"title": step_field(sid, "title").strip(), "content": step_field(sid, "content").strip()}
+        for sid in st.session_state["steps_order"]
+    ]
     # remove completely empty steps; keep all others
     steps_filtered = [s for s in steps if (s.get("title","") or s.get("content",""))]
     sections = {
@@ -656,7 +1003,12 @@ if submitted:
         "conclusion": conclusion,
         "resources": resources
     }
-    md = build_guide_markdown(meta, sections)
+    if imported:
+        # re-render only what was edited; the rest of the imported guide is kept byte-for-byte
+        meta["categories"] = keep_unlisted_categories(meta["categories"], imported, categories_map)
+        md = serialize(apply_sections(imported, meta, sections))
+    else:
+        md = build_guide_markdown(meta, sections)
 
     issues = validate_markdown(md, guide_id)
     if issues:
@@ -664,10 +1016,57 @@ if submitted:
     else:
         st.success("Local validation passed (key checks).")
 
+    extra_langs = [lang for lang in extra_langs if lang != language]
+    if extra_langs:
+        # Fan-out: every language in one pass, assets compressed once and shared by all variants
+        try:
+            overrides = overrides_from_files((up.name, up.getvalue()) for up in override_uploads or [])
+            assets = select_guide_assets(draft_images + st.session_state.get("imported_assets", []), draft_other)
+            buf, variants = fan_out(md, assets, overrides, [language] + extra_langs, prune_unreferenced=prune_assets)
+        except ValueError as e:  # bad override files and unknown languages, named in the message
+            st.error(f"Could not export the language variants: {e}")
+            st.stop()
+        if assets:
+            st.caption("Shared assets: " + ", ".join([f"assets/{n} ({len(d)} bytes)" for n, d in dict(assets).items()]))
+        for v in variants:
+            if v["issues"]:
+                st.warning(f"{v['id']} ({v['lang']}):\n- " + "\n- ".join(v["issues"]))
+            if v["missing"]:
+                st.warning(f"{v['id']}: referenced assets not found in uploads:\n- " + "\n- ".join(
+                    ["assets/" + n for n in v["missing"]]
+                ))
+        st.success("Exported " + ", ".join(f"{v['id']} ({v['lang']})" for v in variants))
+        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        st.download_button(
+            label="Download All Languages ZIP",
+            data=buf,
+            file_name=f"{guide_id}_all-languages_{ts}.zip",
+            mime="application/zip"
+        )
+        st.caption("The ZIP holds one <guide-id>-<lang>/ folder per language; unzip it into site/sfguides/src/.")
+        st.stop()
+
     with tempfile.TemporaryDirectory() as td:
-        guide_dir, saved = write_guide_tree(td, guide_id, md, image_uploads or [], other_uploads or [])
+        guide_dir, saved, asset_report = write_guide_tree(
+            td, guide_id, md, draft_images + st.session_state.get("imported_assets", []),
+            draft_other, prune_unreferenced=prune_assets,
+        )
         if saved:
             st.caption("Saved assets: " + ", ".join([f"{n} ({s} bytes)" for n,s in saved]))
+        if asset_report["rewritten"]:
+            st.info("Updated asset references to saved filenames:\n- " + "\n- ".join(
+                [f"assets/{old} → assets/{new}" for old, new in asset_report["rewritten"].items()]
+            ))
+        if asset_report["missing"]:
+            st.warning("Referenced assets not found in uploads:\n- " + "\n- ".join(
+                ["assets/" + n for n in asset_report["missing"]]
+            ))
+        if asset_report["pruned"]:
+            st.caption("Left out unreferenced assets: " + ", ".join(["assets/" + n for n in asset_report["pruned"]]))
+        elif asset_report["orphans"]:
+            st.warning("Uploaded assets not referenced in the guide:\n- " + "\n- ".join(
+                ["assets/" + n for n in asset_report["orphans"]]
+            ))
         buf = zipdir(guide_dir)
         ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         st.download_button(
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Asset Reference Index
+Cross-checks assets/ references in guide markdown against the files actually
+saved under assets/. References that only differ by sanitization are rewritten
+to the saved name, unreferenced assets are reported (or pruned), and a
+repo-wide mode runs the same check over every guide folder in parallel.
+
+Usage:
+  python -m utils.asset_index <guide_dir> [--fix] [--prune]
+  python -m utils.asset_index --repo site/sfguides/src [--fix] [--prune] [--workers N]
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote, unquote
+
+from utils.guide_common import sanitize_filename
+
+# Any assets/ path in the markdown: image and link targets, <img src>, <a href>
+# and bare mentions in code blocks. The lookbehind skips absolute URLs such as
+# https://github.com/.../assets/x.png, which point outside the guide folder.
+# Quoted attributes and <...> link targets may contain spaces. Unquoted paths
+# may hold balanced parentheses (Foo(1).png) but never end in sentence
+# punctuation or a markdown delimiter, so `assets/x.png`, *assets/x.png* and
+# _assets/x.png_ keep their closing backtick, asterisk or underscore outside
+# the match.
+_PATH_CHAR = r"[^\s()\"'<>\[\]`]"
+_PATH_PARENS = r"\([^\s()\"'<>\[\]`]*\)"
+ASSET_REF_RE = re.compile(
+    r"(?<=[\"'<])(?P<qprefix>(?:\./)?assets/)(?P<qpath>[^\"'<>\n]+?)(?=[\"'>])"
+    r"|(?:(?<![\w/.\-])|(?<=(?<!\w)_))(?P<prefix>(?:\./)?assets/)"
+    rf"(?P<path>(?:{_PATH_CHAR}|{_PATH_PARENS})*(?:[^\s()\"'<>\[\]`*_~.,;:!?]|{_PATH_PARENS}))"
+)
+
+
+def _canonical_asset_name(rel_path):
+    """Name an asset reference would be saved under by write_guide_tree()."""
+    head, tail = os.path.split(unquote(rel_path))
+    tail = sanitize_filename(tail)
+    return f"{head}/{tail}" if head else tail
+
+
+def index_asset_references(md_text, asset_names):
+    """
+    Build the reference index for one guide in a single pass over the markdown.
+    asset_names are paths relative to assets/ (e.g. "my-screenshot.png").
+    Returns a dict with the rewritten markdown plus rewritten, missing and
+    orphaned asset names.
+    """
+    available = set(asset_names)
+    referenced = set()
+    rewritten = {}
+    missing = []
+
+    def _resolve(m):
+        if m.group("qpath") is not None:
+            prefix, path = m.group("qprefix"), m.group("qpath")
+        else:
+            prefix, path = m.group("prefix"), m.group("path")
+        if path in available:
+            referenced.add(path)
+            return m.group(0)
+        decoded = unquote(path)
+        if decoded in available:
+            referenced.add(decoded)
+            return m.group(0)
+        canonical = _canonical_asset_name(path)
+        if canonical in available:
+            referenced.add(canonical)
+            rewritten[path] = canonical
+            return prefix + quote(canonical)
+        if path not in missing:
+            missing.append(path)
+        return m.group(0)
+
+    text = ASSET_REF_RE.sub(_resolve, md_text or "")
+    orphans = sorted(available - referenced)
+    return {
+        "markdown": text,
+        "rewritten": rewritten,
+        "missing": missing,
+        "orphans": orphans,
+    }
+
+
+def list_asset_files(guide_dir):
+    """Relative paths of every file under <guide_dir>/assets."""
+    assets_dir = os.path.join(guide_dir, "assets")
+    names = []
+    for root, _, files in os.walk(assets_dir):
+        for f in files:
+            rel = os.path.relpath(os.path.join(root, f), assets_dir)
+            names.append(rel.replace(os.sep, "/"))
+    return sorted(names)
+
+
+def prune_orphans(guide_dir, orphans):
+    """Delete unreferenced assets; returns the names that were removed."""
+    assets_dir = os.path.join(guide_dir, "assets")
+    removed = []
+    for name in orphans:
+        p = os.path.join(assets_dir, *name.split("/"))
+        if os.path.isfile(p):
+            os.remove(p)
+            removed.append(name)
+    return removed
+
+
+def find_guide_markdown(guide_dir):
+    """Guide markdown in the folder root: <folder>.md first, else the first .md."""
+    name = os.path.basename(os.path.normpath(guide_dir))
+    candidate = os.path.join(guide_dir, f"{name}.md")
+    if os.path.isfile(candidate):
+        return candidate
+    for f in sorted(os.listdir(guide_dir)):
+        if f.lower().endswith(".md") and f != "README.md":
+            return os.path.join(guide_dir, f)
+    return None
+
+
+def check_guide_folder(guide_dir, fix=False, prune=False):
+    """Index one guide folder on disk, optionally writing fixes back."""
+    report = {"guide": guide_dir, "markdown_file": None, "rewritten": {}, "missing": [], "orphans": [], "pruned": []}
+    md_path = find_guide_markdown(guide_dir)
+    if not md_path:
+        return report
+    with open(md_path, "r", encoding="utf-8") as f:
+        md_text = f.read()
+    index = index_asset_references(md_text, list_asset_files(guide_dir))
+    report.update({k: index[k] for k in ("rewritten", "missing", "orphans")})
+    report["markdown_file"] = md_path
+    if fix and index["rewritten"]:
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write(index["markdown"])
+    if prune and index["orphans"]:
+        report["pruned"] = prune_orphans(guide_dir, index["orphans"])
+    return report
+
+
+def _check_guide_folder_args(args):
+    return check_guide_folder(*args)
+
+
+def scan_repo(src_root, fix=False, prune=False, workers=None):
+    """Run check_guide_folder() over every guide folder (skipping _shared etc.)."""
+    folders = [
+        os.path.join(src_root, d)
+        for d in sorted(os.listdir(src_root))
+        if not d.startswith("_") and os.path.isdir(os.path.join(src_root, d))
+    ]
+    if not folders:
+        return []
+    jobs = [(d, fix, prune) for d in folders]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(_check_guide_folder_args, jobs, chunksize=chunk))
+
+
+def format_report(report):
+    lines = []
+    label = report["guide"]
+    for old, new in report["rewritten"].items():
+        lines.append(f"{label}: rewrote assets/{old} -> assets/{new}")
+    for name in report["missing"]:
+        lines.append(f"{label}: missing asset referenced: assets/{name}")
+    pruned = set(report["pruned"])
+    for name in report["orphans"]:
+        action = "pruned" if name in pruned else "unreferenced asset"
+        lines.append(f"{label}: {action}: assets/{name}")
+    return lines
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Cross-check guide markdown against its assets/ folder.")
+    parser.add_argument("guide_dir", nargs="?", help="single guide folder (site/sfguides/src/<id>)")
+    parser.add_argument("--repo", help="check every guide folder under this directory")
+    parser.add_argument("--fix", action="store_true", help="rewrite references to sanitized asset names")
+    parser.add_argument("--prune", action="store_true", help="delete unreferenced assets")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --repo")
+    args = parser.parse_args()
+
+    if bool(args.repo) == bool(args.guide_dir):
+        parser.error("pass either a guide folder or --repo <src dir>")
+
+    if args.repo:
+        reports = scan_repo(args.repo, fix=args.fix, prune=args.prune, workers=args.workers)
+    else:
+        reports = [check_guide_folder(args.guide_dir, fix=args.fix, prune=args.prune)]
+
+    missing = 0
+    for report in reports:
+        for line in format_report(report):
+            print(line)
+        missing += len(report["missing"])
+    print(f"Checked {len(reports)} guide folder(s); {missing} missing asset reference(s)")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Persistent Draft Store
+SQLite-backed store for in-progress guides so a browser refresh or server
+restart does not lose the form. Field writes are debounced and coalesced: each
+rerun only diffs the form against what is already stored, and a burst of
+changes becomes one small transaction containing just the changed fields.
+Uploaded assets are stored once per content hash and referenced by each draft.
+Drafts nobody has touched for max_age_s are expired, and blobs no draft
+references any more are deleted.
+
+Write transactions start with BEGIN IMMEDIATE so a second writer waits for the
+busy timeout instead of failing when a read would upgrade to a write. Saving a
+draft is best-effort: a write that still fails is logged and retried on the next
+change instead of raising into the page.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from utils.guide_common import MemoryUpload
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draft_fields (
+    draft_id   TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (draft_id, key)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size   INTEGER NOT NULL,
+    data   BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS draft_assets (
+    draft_id TEXT NOT NULL,
+    slot     TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name     TEXT NOT NULL,
+    type     TEXT NOT NULL,
+    sha256   TEXT NOT NULL REFERENCES blobs (sha256),
+    PRIMARY KEY (draft_id, slot, position)
+);
+CREATE INDEX IF NOT EXISTS draft_assets_sha256 ON draft_assets (sha256);
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_id   TEXT PRIMARY KEY,
+    touched_at REAL NOT NULL
+);
+"""
+
+MAX_AGE_S = 30 * 24 * 3600
+EXPIRE_INTERVAL_S = 3600
+
+log = logging.getLogger(__name__)
+
+_MISSING = object()
+_DELETED = None  # pending value for a field removed from the draft
+
+_TOUCH_SQL = (
+    "INSERT INTO drafts (draft_id, touched_at) VALUES (?, ?) "
+    "ON CONFLICT (draft_id) DO UPDATE SET touched_at = excluded.touched_at"
+)
+
+
+class DraftStore:
+    """Debounced, coalescing draft persistence shared by all sessions of the app."""
+
+    def __init__(self, path, debounce_s=0.75, max_age_s=MAX_AGE_S):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.debounce_s = debounce_s
+        self.max_age_s = max_age_s
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._stored = {}         # draft_id -> {key: json value} as persisted or pending
+        self._pending = {}        # draft_id -> {key: json value} not yet written
+        self._asset_sigs = {}     # (draft_id, slot) -> signature of the last saved uploads
+        self._timer = None
+        self._next_expiry = 0.0
+        atexit.register(self.close)
+        self.expire()
+
+    # Fields
+
+    def stage(self, draft_id, fields, stale=None):
+        """
+        Queue the fields that differ from the stored draft; returns how many changed.
+        stale(key) -> bool marks stored keys that no longer belong to the draft
+        (e.g. the fields of a deleted step); they are removed on the next flush.
+        """
+        with self._lock:
+            stored = self._stored.get(draft_id)
+            if stored is None:
+                stored = self._stored[draft_id] = self._read_fields(draft_id)
+            changed = {}
+            for key, value in fields.items():
+                encoded = json.dumps(value, ensure_ascii=False)
+                if stored.get(key, _MISSING) != encoded:
+                    stored[key] = encoded
+                    changed[key] = encoded
+            if stale is not None:
+                for key in [k for k in stored if k not in fields and stale(k)]:
+                    del stored[key]
+                    changed[key] = _DELETED
+            if changed:
+                self._pending.setdefault(draft_id, {}).update(changed)
+                self._schedule_flush()
+            return len(changed)
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce_s, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write every pending change in a single transaction."""
+        with self._lock:
+            self._timer = None
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            now = time.time()
+            rows = [(d, k, v, now) for d, fields in pending.items() for k, v in fields.items() if v is not _DELETED]
+            removed = [(d, k) for d, fields in pending.items() for k, v in fields.items() if v is _DELETED]
+            try:
+                self._write_fields(pending, rows, removed, now)
+            except sqlite3.Error as e:
+                log.warning("could not save %d draft(s), retrying: %s", len(pending), e)
+                for draft_id, fields in pending.items():
+                    self._pending[draft_id] = {**fields, **self._pending.get(draft_id, {})}
+                self._schedule_flush()
+                return 0
+            if now >= self._next_expiry:
+                self.expire()
+            return len(rows) + len(removed)
+
+    def _write_fields(self, pending, rows, removed, now):
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT INTO draft_fields (draft_id, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (draft_id, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                rows,
+            )
+            self._conn.executemany("DELETE FROM draft_fields WHERE draft_id = ? AND key = ?", removed)
+            self._conn.executemany(_TOUCH_SQL, [(d, now) for d in pending])
+
+    def _read_fields(self, draft_id):
+        cur = self._conn.execute("SELECT key, value FROM draft_fields WHERE draft_id = ?", (draft_id,))
+        return dict(cur.fetchall())
+
+    # Assets
+
+    def save_assets(self, draft_id, slot, uploads):
+        """
+        Remember the uploads for one slot (e.g. "images"). Contents are hashed and
+        stored only when the upload list changed since the last call, and each
+        distinct blob is stored once no matter how many drafts reference it.
+        Returns False when nothing was written, including when the write failed.
+        """
+        uploads = list(uploads or [])
+        sig = tuple((up.name, getattr(up, "file_id", None), up.size) for up in uploads)
+        with self._lock:
+            if self._asset_sigs.get((draft_id, slot)) == sig:
+                return False
+            try:
+                self._write_assets(draft_id, slot, uploads)
+            except sqlite3.Error as e:
+                log.warning("could not save %s assets of draft %s: %s", slot, draft_id, e)
+                return False
+            self._asset_sigs[(draft_id, slot)] = sig
+            return True
+
+    def _write_assets(self, draft_id, slot, uploads):
+        rows = []
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            replaced = [r[0] for r in self._conn.execute(
+                "SELECT sha256 FROM draft_assets WHERE draft_id = ? AND slot = ?", (draft_id, slot)
+            )]
+            for pos, up in enumerate(uploads):
+                data = up.getvalue()
+                digest = hashlib.sha256(data).hexdigest()
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (sha256, size, data) VALUES (?, ?, ?)",
+                    (digest, len(data), sqlite3.Binary(data)),
+                )
+                rows.append((draft_id, slot, pos, up.name, up.type or "", digest))
+            self._conn.execute("DELETE FROM draft_assets WHERE draft_id = ? AND slot = ?", (draft_id, slot))
+            self._conn.executemany("INSERT INTO draft_assets VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._delete_unreferenced_blobs(set(replaced))
+            self._conn.execute(_TOUCH_SQL, (draft_id, time.time()))
+
+    # Restore
+
+    def load(self, draft_id):
+        """Return (fields, assets) for a draft; assets maps slot -> [MemoryUpload]."""
+        with self._lock:
+            fields = {**self._read_fields(draft_id), **self._pending.get(draft_id, {})}
+            self._stored[draft_id] = dict(fields)
+            cur = self._conn.execute(
+                "SELECT a.slot, a.name, a.type, b.data FROM draft_assets a JOIN blobs b ON a.sha256 = b.sha256 "
+                "WHERE a.draft_id = ? ORDER BY a.slot, a.position",
+                (draft_id,),
+            )
+            assets = {}
+            for slot, name, ctype, data in cur.fetchall():
+                assets.setdefault(slot, []).append(MemoryUpload(name, bytes(data), ctype))
+            if fields or assets:
+                try:
+                    self._conn.execute(_TOUCH_SQL, (draft_id, time.time()))  # reopening a draft keeps it alive
+                except sqlite3.Error as e:
+                    log.warning("could not touch draft %s: %s", draft_id, e)
+        return {k: json.loads(v) for k, v in fields.items()}, assets
+
+    # Cleanup
+
+    def delete(self, draft_id):
+        self._delete_drafts([draft_id])
+
+    def expire(self, max_age_s=None):
+        """Delete drafts untouched for max_age_s (default: the store's) and any blob left unreferenced."""
+        max_age_s = self.max_age_s if max_age_s is None else max_age_s
+        with self._lock:
+            now = time.time()
+            self._next_expiry = now + EXPIRE_INTERVAL_S
+            if max_age_s is None:
+                return []
+            cutoff = now - max_age_s
+            # drafts saved before the drafts table existed fall back to their newest field
+            cur = self._conn.execute(
+                "SELECT ids.draft_id FROM ("
+                "  SELECT draft_id FROM draft_fields UNION SELECT draft_id FROM draft_assets"
+                "  UNION SELECT draft_id FROM drafts"
+                ") ids LEFT JOIN drafts d ON d.draft_id = ids.draft_id "
+                "WHERE COALESCE(d.touched_at, "
+                "  (SELECT MAX(updated_at) FROM draft_fields f WHERE f.draft_id = ids.draft_id), 0) < ?",
+                (cutoff,),
+            )
+            expired = [r[0] for r in cur.fetchall() if r[0] not in self._pending]
+            try:
+                self._delete_drafts(expired)
+            except sqlite3.Error as e:
+                log.warning("could not expire %d draft(s): %s", len(expired), e)
+                return []
+            return expired
+
+    def _delete_drafts(self, draft_ids):
+        with self._lock:
+            for draft_id in draft_ids:
+                self._pending.pop(draft_id, None)
+                self._stored.pop(draft_id, None)
+            gone = set(draft_ids)
+            for key in [k for k in self._asset_sigs if k[0] in gone]:
+                del self._asset_sigs[key]
+            ids = [(d,) for d in draft_ids]
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("DELETE FROM draft_fields WHERE draft_id = ?", ids)
+                self._conn.executemany("DELETE FROM draft_assets WHERE draft_id = ?", ids)
+                self._conn.executemany("DELETE FROM drafts WHERE draft_id = ?", ids)
+                self._delete_unreferenced_blobs()
+
+    def _delete_unreferenced_blobs(self, candidates=None):
+        """Drop blobs no draft references; only the given digests when candidates is set."""
+        if candidates is None:
+            self._conn.execute(
+                "DELETE FROM blobs WHERE NOT EXISTS (SELECT 1 FROM draft_assets a WHERE a.sha256 = blobs.sha256)"
+            )
+            return
+        self._conn.executemany(
+            "DELETE FROM blobs WHERE sha256 = ? AND NOT EXISTS (SELECT 1 FROM draft_assets WHERE sha256 = ?)",
+            [(d, d) for d in candidates],
+        )
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self.flush()
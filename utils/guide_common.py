@@ -0,0 +1,89 @@
+"""
+Shared Guide Rules
+Checks and helpers shared by the Streamlit app and the command-line utilities,
+kept here so local results match what the sfguides CI enforces.
+"""
+
+import os
+import re
+
+# Reference: Language and Category Tags
+# https://www.snowflake.com/en/developers/guides/get-started-with-guides/#language-and-category-tags
+
+ALLOWED_LANGS = ["en","es","it","fr","de","ja","ko","pt_br"]
+
+IMAGE_CT_RE = re.compile(r"image/(png|jpeg|jpg|gif|svg|webp|bmp|x-icon)", re.I)
+
+
+def validate_markdown(md_text, guide_id):
+    issues = []
+    # language within first 50 lines and allowed
+    first_50 = "\n".join(md_text.splitlines()[:50])
+    m = re.search(r"^\s*language:\s*(.+)$", first_50, re.M)
+    lang = m.group(1).strip().strip("'\"") if m else ""
+    if not lang or lang.lower() not in ALLOWED_LANGS:
+        issues.append(f'language must be one of {ALLOWED_LANGS} and in first 50 lines (found "{lang}")')
+    # id matches guide_id
+    m = re.search(r"^\s*id:\s*(.+)$", md_text, re.M)
+    md_id = m.group(1).strip() if m else ""
+    if md_id != guide_id:
+        issues.append(f'id must match folder/file name "{guide_id}" (found "{md_id}")')
+    # categories: allow comma-separated taxonomy paths
+    m = re.search(r"^\s*categories:\s*(.+)$", md_text, re.M)
+    cats_line = m.group(1).strip() if m else ""
+    if not cats_line:
+        issues.append('categories must be set (comma-separated taxonomy paths)')
+    else:
+        paths = [c.strip() for c in cats_line.split(",") if c.strip()]
+        if not paths or any(not p.startswith("snowflake-site:taxonomy/") for p in paths):
+            issues.append('categories must be comma-separated taxonomy paths (e.g., snowflake-site:taxonomy/solution-center/certification/quickstart)')
+    return issues
+
+
+def sanitize_filename(name):
+    base = os.path.basename(name)
+    # prefer hyphens, allow . _ -
+    base = base.lower().replace("_", "-")
+    return re.sub(r"[^a-z0-9_.\-]", "", base)
+
+
+def select_guide_assets(image_files, other_files):
+    """
+    (sanitized name, data) for every upload a guide keeps under assets/:
+    images up to 1MB and other files up to 10MB, never markdown.
+    """
+    selected = []
+    for up in image_files or []:
+        # accept by content-type or extension
+        is_image = (up.type and IMAGE_CT_RE.search(up.type)) or re.search(r"\.(png|jpe?g|gif|svg|webp|bmp|ico)$", up.name.lower())
+        if not is_image:
+            continue
+        data = up.getvalue()
+        if len(data) > 1_000_000:
+            continue
+        selected.append((sanitize_filename(up.name), data))
+    for up in other_files or []:
+        data = up.getvalue()
+        if len(data) > 10_000_000:
+            continue
+        name = sanitize_filename(up.name)
+        if not name or name.endswith(".md"):
+            continue
+        selected.append((name, data))
+    return selected
+
+
+class MemoryUpload:
+    """In-memory stand-in for a Streamlit UploadedFile (name, type, getvalue())."""
+
+    def __init__(self, name, data, type=""):
+        self.name = name
+        self.type = type
+        self._data = data
+
+    @property
+    def size(self):
+        return len(self._data)
+
+    def getvalue(self):
+        return self._data
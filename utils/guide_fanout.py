@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+"""
+Multi-Language Guide Fan-Out
+Emits every locale variant of one guide in a single pass: the base guide plus
+per-language section overrides become one folder per locale, each with its own
+id (<guide-id>-<lang>, pt_br -> pt-br; the base language keeps the guide id) so
+validate_markdown() passes for every variant. Sections a language does not
+override keep the base text byte-for-byte (guide_model.serialize()).
+
+Assets are read, CRC'd and compressed once. The archive writer reuses those
+bytes for every variant's assets/ folder, so each extra language costs only its
+markdown instead of another write_guide_tree() + zipdir() round over all assets.
+Variants are rendered, asset-indexed and validated in parallel.
+
+Overrides are JSON ({"es": {"title": ..., "summary": ..., "steps": [{"title": ...,
+"content": ...}, null, ...]}, ...}) or a folder of translated <lang>.md guides.
+learn, need and resources take one item per line like the app's form; a step
+entry of null keeps the base step.
+
+Usage:
+  python -m utils.guide_fanout site/sfguides/src/<id> --langs es,fr,ja [--overrides overrides.json | dir]
+                                [--out <id>-all-languages.zip] [--prune] [--workers 4]
+"""
+
+import argparse
+import io
+import json
+import os
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from utils.asset_index import find_guide_markdown, index_asset_references, list_asset_files
+from utils.guide_common import ALLOWED_LANGS, validate_markdown
+from utils.guide_model import Resource, Step, guide_to_sections, parse_guide, serialize
+
+SECTION_KEYS = ("title", "summary", "overview", "learn", "need", "build", "steps", "conclusion", "resources")
+# already compressed formats are stored as-is; deflating them again only costs time
+STORED_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".zip", ".gz", ".bz2", ".xz", ".7z", ".mp4", ".mov", ".pdf")
+
+
+@dataclass(frozen=True, slots=True)
+class SharedAsset:
+    name: str
+    size: int       # uncompressed bytes
+    crc: int
+    method: int     # zipfile.ZIP_DEFLATED or zipfile.ZIP_STORED
+    payload: bytes  # bytes as they go into the archive
+
+
+def compress_asset(name, data, level=6):
+    """Compress one file once so any number of archive entries can share it."""
+    crc = zlib.crc32(data)
+    if not name.lower().endswith(STORED_EXTS):
+        co = zlib.compressobj(level, zlib.DEFLATED, -15)
+        packed = co.compress(data) + co.flush()
+        if len(packed) < len(data):
+            return SharedAsset(name, len(data), crc, zipfile.ZIP_DEFLATED, packed)
+    return SharedAsset(name, len(data), crc, zipfile.ZIP_STORED, data)
+
+
+class SharedZipWriter:
+    """
+    Minimal ZIP writer that takes pre-compressed entries. zipfile compresses
+    whatever it is given, so the same asset under eight variant folders would be
+    deflated eight times; here it is written eight times but deflated once.
+    """
+
+    def __init__(self, fp, date_time=None):
+        self.fp = fp
+        self.entries = []
+        t = date_time or time.localtime()[:6]
+        self._time = (t[3] << 11) | (t[4] << 5) | (t[5] // 2)
+        self._date = ((t[0] - 1980) << 9) | (t[1] << 5) | t[2]
+
+    def add(self, arcname, asset):
+        if len(self.entries) >= 0xFFFF or self.fp.tell() + len(asset.payload) >= 0xFFFFFFFF:
+            raise ValueError("archive too large for a non-ZIP64 writer")
+        name = arcname.encode("utf-8")
+        offset = self.fp.tell()
+        self.fp.write(struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 20, 0x800, asset.method, self._time, self._date,
+            asset.crc, len(asset.payload), asset.size, len(name), 0,
+        ))
+        self.fp.write(name)
+        self.fp.write(asset.payload)
+        self.entries.append((name, asset, offset))
+
+    def close(self):
+        start = self.fp.tell()
+        for name, asset, offset in self.entries:
+            self.fp.write(struct.pack(
+                "<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | 20, 20, 0x800, asset.method, self._time, self._date,
+                asset.crc, len(asset.payload), asset.size, len(name), 0, 0, 0, 0, 0o100644 << 16, offset,
+            ))
+            self.fp.write(name)
+        end = self.fp.tell()
+        self.fp.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(self.entries), len(self.entries), end - start, start, 0))
+
+
+def locale_guide_id(guide_id, lang, base_lang):
+    """Id (and folder name) of one locale variant; the base language keeps the guide id."""
+    if lang == base_lang:
+        return guide_id
+    return f"{guide_id}-{lang.replace('_', '-')}"
+
+
+def _lines(value):
+    items = value.splitlines() if isinstance(value, str) else value
+    return [str(x).strip() for x in items if str(x).strip()]
+
+
+def _resources(value):
+    out = []
+    for line in _lines(value):
+        if " | " in line:
+            label, url = [p.strip() for p in line.split(" | ", 1)]
+            out.append(Resource(label, url))
+        else:
+            out.append(Resource("", line))
+    return out
+
+
+def validate_override(where, override):
+    """Raise ValueError (prefixed with where) unless override has the shape apply_overrides() expects."""
+    if not isinstance(override, dict):
+        raise ValueError(f"{where}: expected an object of sections, found {type(override).__name__}")
+    extra = sorted(set(override) - set(SECTION_KEYS))
+    if extra:
+        raise ValueError(f"{where}: unknown override section(s) {', '.join(extra)}; expected {', '.join(SECTION_KEYS)}")
+    for key in ("title", "summary", "overview", "build", "conclusion"):
+        if override.get(key) is not None and not isinstance(override[key], str):
+            raise ValueError(f"{where}: {key} must be text")
+    for key in ("learn", "need", "resources"):
+        value = override.get(key)
+        if value is not None and not isinstance(value, str) and not (
+                isinstance(value, list) and all(isinstance(x, str) for x in value)):
+            raise ValueError(f"{where}: {key} must be text or a list of lines")
+    steps = override.get("steps")
+    if steps is not None and not isinstance(steps, list):
+        raise ValueError(f"{where}: steps must be a list")
+    for n, step in enumerate(steps or [], 1):
+        if step is None:
+            continue
+        if not isinstance(step, dict) or set(step) - {"title", "content"} or not all(
+                v is None or isinstance(v, str) for v in step.values()):
+            raise ValueError(f"{where}: step {n} must be null or an object with title and content text")
+
+
+def apply_overrides(guide, lang, guide_id, override):
+    """Turn a parsed base guide into one locale variant in place."""
+    guide.frontmatter["id"] = guide_id
+    guide.frontmatter["language"] = lang
+    if override.get("summary"):
+        guide.frontmatter["summary"] = override["summary"]
+    for key in ("title", "overview", "build", "conclusion"):
+        if override.get(key):
+            setattr(guide, key, override[key])
+    for key in ("learn", "need"):
+        if override.get(key):
+            setattr(guide, key, _lines(override[key]))
+    if override.get("resources"):
+        guide.resources = _resources(override["resources"])
+    for i, step in enumerate(override.get("steps") or []):
+        if not step:
+            continue
+        if i < len(guide.steps):
+            base = guide.steps[i]
+            guide.steps[i] = Step(step.get("title") or base.title, step.get("content") or base.content)
+        else:
+            guide.steps.append(Step(step.get("title", ""), step.get("content", "")))
+    return guide
+
+
+def overrides_from_markdown(md_text):
+    """Section overrides from a translated guide: every section it fills in."""
+    meta, sections = guide_to_sections(parse_guide(md_text))
+    override = {k: v for k, v in sections.items() if v}
+    if meta["summary"]:
+        override["summary"] = meta["summary"]
+    return override
+
+
+def overrides_from_files(files):
+    """
+    {lang: overrides} from (filename, text) pairs: <lang>.md translated guides,
+    <lang>.json overrides for one language, or any other .json keyed by language.
+    text may be bytes as uploaded; bad files raise ValueError naming the file.
+    """
+    overrides = {}
+    for filename, text in files:
+        name = os.path.basename(filename)
+        lang, ext = os.path.splitext(name)
+        if ext not in (".md", ".json"):
+            continue
+        try:
+            if isinstance(text, bytes):
+                text = text.decode("utf-8")
+            data = json.loads(text) if ext == ".json" else None
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from e
+        if ext == ".md":
+            overrides[lang] = overrides_from_markdown(text)
+        elif lang in ALLOWED_LANGS:
+            validate_override(name, data)
+            overrides[lang] = data
+        elif isinstance(data, dict):
+            for key, override in data.items():
+                validate_override(f"{name}: {key}", override)
+            overrides.update(data)
+        else:
+            raise ValueError(f"{name}: expected an object keyed by language, found {type(data).__name__}")
+    return overrides
+
+
+def load_overrides(path):
+    """Overrides from a JSON file or a folder of <lang>.md / <lang>.json files."""
+    paths = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    files = []
+    for p in paths:
+        if p.endswith((".md", ".json")):
+            with open(p, "r", encoding="utf-8") as fp:
+                files.append((p, fp.read()))
+    return overrides_from_files(files)
+
+
+def render_variant(base_md, lang, guide_id, override, asset_names, prune_unreferenced=False):
+    """Build, asset-index and validate one locale variant; the markdown comes back compressed."""
+    md = serialize(apply_overrides(parse_guide(base_md), lang, guide_id, override))
+    report = index_asset_references(md, asset_names)
+    pruned = report["orphans"] if prune_unreferenced else []
+    return {
+        "lang": lang,
+        "id": guide_id,
+        "issues": validate_markdown(report["markdown"], guide_id),
+        "rewritten": report["rewritten"],
+        "missing": report["missing"],
+        "orphans": report["orphans"],
+        "pruned": pruned,
+        "assets": [n for n in asset_names if n not in pruned],
+        "document": compress_asset(f"{guide_id}.md", report["markdown"].encode("utf-8")),
+    }
+
+
+def fan_out(base_md, assets, overrides=None, langs=None, prune_unreferenced=False, workers=4):
+    """
+    Emit every locale variant of a guide as one ZIP with a <variant-id>/ folder each.
+    assets are (name, data) pairs as select_guide_assets() returns them; a later
+    asset replaces an earlier one of the same name, like on disk. langs defaults
+    to the languages in overrides; the base guide's own language is always included.
+    Returns (zip buffer, variant reports in langs order).
+    """
+    overrides = overrides or {}
+    base = parse_guide(base_md)
+    base_lang = base.frontmatter.get("language", "").strip().strip("'\"").lower() or "en"
+    langs = list(dict.fromkeys([base_lang] + list(langs if langs is not None else overrides)))
+    unknown = [lang for lang in langs + list(overrides) if lang not in ALLOWED_LANGS]
+    if unknown:
+        raise ValueError(f"unknown language(s) {', '.join(sorted(set(unknown)))}; expected one of {ALLOWED_LANGS}")
+    for lang, override in overrides.items():
+        validate_override(lang, override)
+    latest = dict(assets)
+    asset_names = list(latest)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        compressed = pool.map(lambda item: compress_asset(*item), latest.items())
+        rendered = pool.map(
+            lambda lang: render_variant(base_md, lang, locale_guide_id(base.id, lang, base_lang),
+                                        overrides.get(lang, {}), asset_names, prune_unreferenced),
+            langs,
+        )
+        shared = {a.name: a for a in compressed}
+        variants = list(rendered)
+
+    buf = io.BytesIO()
+    writer = SharedZipWriter(buf)
+    for v in variants:
+        writer.add(f"{v['id']}/{v['id']}.md", v.pop("document"))
+        for name in v["assets"]:
+            writer.add(f"{v['id']}/assets/{name}", shared[name])
+    writer.close()
+    buf.seek(0)
+    return buf, variants
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Export every language variant of a guide in one pass.")
+    parser.add_argument("guide", help="guide folder (<id>/<id>.md plus assets/) or a guide .md")
+    parser.add_argument("--langs", default="", help=f"comma-separated locales to emit (default: those in --overrides); one of {ALLOWED_LANGS}")
+    parser.add_argument("--overrides", help="JSON file or folder of <lang>.md / <lang>.json section overrides")
+    parser.add_argument("--out", help="ZIP to write (default <id>-all-languages.zip)")
+    parser.add_argument("--prune", action="store_true", help="leave out assets a variant never references")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    guide_md = args.guide if os.path.isfile(args.guide) else find_guide_markdown(args.guide)
+    if not guide_md:
+        parser.error(f"no guide markdown in {args.guide}")
+    guide_dir = os.path.dirname(guide_md)
+    with open(guide_md, "r", encoding="utf-8", newline="") as f:
+        base_md = f.read()
+    assets = []
+    for name in list_asset_files(guide_dir):
+        with open(os.path.join(guide_dir, "assets", *name.split("/")), "rb") as f:
+            assets.append((name, f.read()))
+    overrides = load_overrides(args.overrides) if args.overrides else {}
+    langs = [x.strip() for x in args.langs.split(",") if x.strip()] or None
+
+    started = time.perf_counter()
+    try:
+        buf, variants = fan_out(base_md, assets, overrides, langs, args.prune, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+
+    out = args.out or f"{parse_guide(base_md).id or 'guide'}-all-languages.zip"
+    with open(out, "wb") as f:
+        f.write(buf.getvalue())
+    for v in variants:
+        status = "✅ passed" if not v["issues"] else "❌ " + "; ".join(v["issues"])
+        print(f"{v['lang']:>5}  {v['id']}: {status}; {len(v['assets'])} asset(s)"
+              + (f", {len(v['missing'])} missing reference(s)" if v["missing"] else ""))
+    print(f"Wrote {len(variants)} variant(s) and {len(assets)} shared asset(s) to {out} in {elapsed:.2f}s")
+    sys.exit(1 if any(v["issues"] for v in variants) else 0)
+
+
+if __name__ == "__main__":
+    main()
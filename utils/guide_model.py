@@ -0,0 +1,531 @@
+#!/usr/bin/env python
+"""
+Guide Document Model
+Compact model of an sfguides markdown guide (frontmatter, title, overview,
+learn/need/build lists, steps, conclusion, resources) with a single-pass parser
+and a serializer. The parser keeps the raw text of every segment it reads next
+to the value it read from it, so serialize() writes unchanged parts back
+byte-for-byte and only re-renders what was edited, in the layout
+build_guide_markdown() uses.
+guide_to_sections() fills the app's form from a Guide and apply_sections()
+takes the form's edits back onto it.
+
+Both layouts are understood: generated guides ("## Process" followed by
+"## Step N: Title" sections) and hand-written sfguides where every H2 other
+than Overview and Conclusion is a step.
+
+Usage:
+  python -m utils.guide_model <guide.md | src_dir> ...   # round-trip check and parse throughput
+"""
+
+import copy
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+FRONTMATTER_ORDER = (
+    "author", "id", "language", "summary", "categories", "environments",
+    "status", "feedback link", "fork repo link", "open in snowflake",
+)
+
+STEP_PREFIX_RE = re.compile(r"^Step\s+\d+\s*:\s*", re.I)
+STEP_NUMBER_RE = re.compile(r"(?<=Step)(\s+)\d+", re.I)
+SEPARATOR_RE = re.compile(r"^<!--\s*-+\s*-->\s*$")
+RESOURCE_RE = re.compile(r"^\s*[-*]\s+\[(?P<label>[^\]]*)\]\((?P<url>[^)]*)\)\s*$")
+LIST_ITEM_RE = re.compile(r"^\s*[-*]\s+(?P<text>.*?)\s*$")
+
+# Segment kinds that belong to the overview and conclusion sections
+OVERVIEW_KINDS = ("overview", "overview_text", "learn", "need", "build")
+CONCLUSION_KINDS = ("conclusion", "conclusion_text", "resources")
+
+
+@dataclass(slots=True)
+class Step:
+    title: str = ""
+    content: str = ""
+
+
+@dataclass(slots=True)
+class Resource:
+    label: str = ""
+    url: str = ""
+
+
+@dataclass(slots=True)
+class _Segment:
+    kind: str             # frontmatter, title, process, step, raw or one of OVERVIEW_KINDS / CONCLUSION_KINDS
+    raw: str              # exact source text, lead included
+    heading: str = ""     # heading title the segment starts with, if any
+    value: object = None  # what the parser read from raw, compared again on serialize
+    lead: str = ""        # "<!-- ---- -->" separator (and blank lines) in front of the heading
+
+    @property
+    def text(self):
+        """raw without the lead: the heading line and what follows it."""
+        return self.raw[len(self.lead):]
+
+
+@dataclass(slots=True)
+class Guide:
+    frontmatter: dict = field(default_factory=dict)
+    title: str = ""
+    overview: str = ""
+    learn: list = field(default_factory=list)
+    need: list = field(default_factory=list)
+    build: str = ""
+    steps: list = field(default_factory=list)
+    conclusion: str = ""
+    resources: list = field(default_factory=list)
+    numbered_steps: bool = True  # "## Step 1: Title" (generated) vs "## Title" (hand-written)
+    _segments: list = field(default_factory=list, repr=False, compare=False)
+
+    @property
+    def id(self):
+        return self.frontmatter.get("id", "")
+
+
+# Parsing
+
+def _heading_level(line):
+    """(level, title) for an ATX heading line of level 1-3, else (0, "")."""
+    n = 0
+    while n < len(line) and n < 4 and line[n] == "#":
+        n += 1
+    if not 1 <= n <= 3 or line[n:n + 1] not in (" ", "\t"):
+        return 0, ""
+    return n, line[n:].strip().rstrip("#").strip()
+
+
+def _norm(title):
+    return title.lower().replace("’", "'")
+
+
+def _section_kind(title):
+    t = _norm(title)
+    if t == "overview":
+        return "overview"
+    if t == "process":
+        return "process"
+    if t.startswith("conclusion"):
+        return "conclusion"
+    return "step"
+
+
+def _subsection_kind(title, section):
+    t = _norm(title)
+    if section == "overview" and t.startswith("what you"):
+        for kind in ("learn", "need", "build"):
+            if kind in t:
+                return kind
+    if section == "conclusion":
+        if "resources" in t:
+            return "resources"
+        if t == "conclusion":
+            return "conclusion_body"
+    return f"{section}_text"
+
+
+def _body(seg):
+    """Segment text without its lead and heading line, stripped."""
+    return seg.text.partition("\n")[2].strip()
+
+
+def _take_separator(buf):
+    """Pop the separator comment (and blank lines after it) that introduces the next heading."""
+    i = len(buf)
+    while i and not buf[i - 1].strip():
+        i -= 1
+    if i and SEPARATOR_RE.match(buf[i - 1]):
+        lead = buf[i - 1:]
+        del buf[i - 1:]
+        return lead
+    return []
+
+
+def _parse_list(body):
+    items = []
+    for line in body.splitlines():
+        m = LIST_ITEM_RE.match(line)
+        if m:
+            items.append(m.group("text"))
+        elif line.strip() and items:
+            items[-1] += " " + line.strip()
+    return items
+
+
+def _parse_resources(body):
+    out = []
+    for line in body.splitlines():
+        m = RESOURCE_RE.match(line)
+        if m:
+            out.append(Resource(m.group("label"), m.group("url")))
+            continue
+        m = LIST_ITEM_RE.match(line)
+        if m and m.group("text"):
+            out.append(Resource("", m.group("text")))
+    return out
+
+
+def _parse_frontmatter(raw):
+    meta = {}
+    for line in raw.splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not line[:1].isspace():
+            meta[key.strip().lower()] = value.strip()
+    return meta
+
+
+def parse_guide(md_text):
+    """Parse guide markdown into a Guide with one pass over its lines."""
+    guide = Guide()
+    segments = guide._segments
+    kind, heading, buf, lead = "frontmatter", "", [], ""
+    section = ""
+    in_fence = False
+
+    for line in md_text.splitlines(keepends=True):
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith("#"):
+            level, title = _heading_level(line)
+            new_kind = None
+            if level == 1 and kind == "frontmatter":
+                new_kind = "title"
+            elif level == 2:
+                section = _section_kind(title)
+                new_kind = section
+            elif level == 3 and section in ("overview", "conclusion"):
+                new_kind = _subsection_kind(title, section)
+            if new_kind:
+                next_buf = _take_separator(buf)
+                if buf:
+                    segments.append(_Segment(kind, "".join(buf), heading, lead=lead))
+                kind, heading, buf, lead = new_kind, title, next_buf, "".join(next_buf)
+        buf.append(line)
+    if buf:
+        segments.append(_Segment(kind, "".join(buf), heading, lead=lead))
+
+    overview_parts, conclusion_parts, numbered = [], [], 0
+    for seg in segments:
+        kind = seg.kind
+        if kind == "frontmatter":
+            guide.frontmatter = _parse_frontmatter(seg.raw)
+            seg.value = dict(guide.frontmatter)
+        elif kind == "title":
+            guide.title = seg.value = seg.heading
+        elif kind == "overview":
+            overview_parts.append(_body(seg))
+        elif kind == "overview_text":
+            overview_parts.append(seg.text.strip())
+        elif kind in ("learn", "need"):
+            items = _parse_list(_body(seg))
+            setattr(guide, kind, items)
+            seg.value = list(items)
+        elif kind == "build":
+            guide.build = seg.value = _body(seg)
+        elif kind == "conclusion":
+            conclusion_parts.append(_body(seg))
+        elif kind == "conclusion_body":
+            seg.kind = "conclusion_text"
+            conclusion_parts.append(_body(seg))
+        elif kind == "conclusion_text":
+            conclusion_parts.append(seg.text.strip())
+        elif kind == "resources":
+            guide.resources = _parse_resources(_body(seg))
+            seg.value = [Resource(r.label, r.url) for r in guide.resources]
+        elif kind == "step":
+            if STEP_PREFIX_RE.match(seg.heading):
+                numbered += 1
+            step = Step(STEP_PREFIX_RE.sub("", seg.heading), _body(seg))
+            guide.steps.append(step)
+            seg.value = Step(step.title, step.content)
+
+    guide.overview = "\n\n".join(p for p in overview_parts if p)
+    guide.conclusion = "\n\n".join(p for p in conclusion_parts if p)
+    # the section text is compared as a whole, so its snapshot sits on the H2 segment
+    for seg in segments:
+        if seg.kind in ("overview", "conclusion"):
+            seg.value = getattr(guide, seg.kind)
+    guide.numbered_steps = numbered * 2 >= len(guide.steps) if guide.steps else True
+    return guide
+
+
+def load_guide(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return parse_guide(f.read())
+
+
+# Serializing
+
+_MISSING = object()
+
+
+def _render_frontmatter(meta):
+    keys = [k for k in FRONTMATTER_ORDER if k in meta] + [k for k in meta if k not in FRONTMATTER_ORDER]
+    return "".join(f"{k}: {meta[k]}\n" for k in keys) + "\n"
+
+
+def _render_step(guide, idx, step):
+    title = step.title.strip() or f"Step {idx}"
+    heading = f"## Step {idx}: {title}" if guide.numbered_steps else f"## {title}"
+    return f"{heading}\n\n{step.content.strip()}\n\n"
+
+
+def _renumber(seg, idx):
+    """Step segment verbatim, with "Step N" in its heading changed to idx if it moved."""
+    heading, sep, rest = seg.text.partition("\n")
+    if not STEP_PREFIX_RE.match(seg.heading):
+        return seg.raw
+    return seg.lead + STEP_NUMBER_RE.sub(lambda m: m.group(1) + str(idx), heading, count=1) + sep + rest
+
+
+def _render_part(guide, kind):
+    if kind == "overview":
+        return "## Overview\n" + guide.overview.strip() + "\n\n"
+    if kind == "learn" and guide.learn:
+        return "### What You’ll Learn\n" + "\n".join(f"- {x}" for x in guide.learn) + "\n\n"
+    if kind == "need" and guide.need:
+        return "### What You’ll Need\n" + "\n".join(f"- {x}" for x in guide.need) + "\n\n"
+    if kind == "build" and guide.build:
+        return "### What You’ll Build\n" + guide.build.strip() + "\n\n"
+    if kind == "conclusion" and guide.conclusion:
+        return "### Conclusion\n" + guide.conclusion.strip() + "\n\n"
+    if kind == "resources" and guide.resources:
+        lines = [f"- [{r.label}]({r.url})" if r.label else f"- {r.url}" for r in guide.resources]
+        return "### Related Resources\n" + "\n".join(lines) + "\n\n"
+    return ""
+
+
+def _default_segments():
+    """Layout for a Guide built in code rather than parsed (that of build_guide_markdown())."""
+    return [
+        _Segment("frontmatter", "", "", _MISSING),
+        _Segment("title", "", "", _MISSING),
+        _Segment("overview", "", "Overview", _MISSING),
+        _Segment("process", "## Process\n"),
+    ]
+
+
+def serialize(guide):
+    """Write a Guide back to markdown; parts that were not edited are reproduced verbatim."""
+    segments = guide._segments or _default_segments()
+    kinds = {seg.kind for seg in segments}
+    original_steps = [seg for seg in segments if seg.kind == "step"]
+    # unchanged steps are found by content, not position, so deleting, inserting or
+    # moving one step leaves every other step byte-for-byte as it was
+    unused = {}
+    for seg in original_steps:
+        unused.setdefault((seg.value.title, seg.value.content), []).append(seg)
+    changed = {
+        seg.kind for seg in segments
+        if seg.kind in ("overview", "conclusion") and seg.value != getattr(guide, seg.kind)
+    }
+    out = []
+    state = {"step": 0, "group": None}
+
+    def write_step(i, slot):
+        step = guide.steps[i]
+        matches = unused.get((step.title, step.content))
+        if matches:
+            seg = matches.pop(0)
+            out.append(_renumber(seg, i + 1) if guide.numbered_steps else seg.raw)
+        else:
+            # a new or edited step takes the separator style of the slot it lands in
+            out.append(slot.lead + _render_step(guide, i + 1, step))
+
+    def write_remaining_steps():
+        slot = original_steps[-1] if original_steps else _Segment("step", "")
+        while state["step"] < len(guide.steps):
+            write_step(state["step"], slot)
+            state["step"] += 1
+
+    def leave_group():
+        # parts the source did not have go at the end of their section
+        group, state["group"] = state["group"], None
+        if group == "overview":
+            for part in ("learn", "need", "build"):
+                if part not in kinds:
+                    out.append(_render_part(guide, part))
+        elif group == "conclusion" and "resources" not in kinds:
+            out.append(_render_part(guide, "resources"))
+
+    for seg in segments:
+        kind = seg.kind
+        group = "overview" if kind in OVERVIEW_KINDS else "conclusion" if kind in CONCLUSION_KINDS else None
+        if group != state["group"]:
+            leave_group()
+            state["group"] = group
+
+        if kind == "frontmatter":
+            out.append(seg.raw if seg.value == guide.frontmatter else _render_frontmatter(guide.frontmatter))
+        elif kind == "title":
+            if seg.value == guide.title:
+                out.append(seg.raw)
+            else:
+                rest = seg.text.partition("\n")[2]
+                out.append(seg.lead + f"# {guide.title or 'Snowflake Guide'}\n" + (rest if seg.raw else "\n"))
+            if "overview" not in kinds and (guide.overview or guide.learn or guide.need or guide.build):
+                out.append(_render_part(guide, "overview"))
+                state["group"] = "overview"
+                leave_group()
+        elif kind in ("overview", "conclusion"):
+            if kind not in changed:
+                out.append(seg.raw)
+            elif kind == "overview":
+                out.append(seg.lead + f"## {seg.heading}\n{guide.overview.strip()}\n\n")
+            else:
+                out.append(seg.lead + f"## {seg.heading}\n\n" + _render_part(guide, "conclusion"))
+        elif kind in ("overview_text", "conclusion_text"):
+            if kind.partition("_")[0] not in changed:
+                out.append(seg.raw)
+        elif kind in ("learn", "need", "build", "resources"):
+            if seg.value == getattr(guide, kind):
+                out.append(seg.raw)
+            else:
+                rendered = _render_part(guide, kind)
+                out.append(seg.lead + rendered if rendered else "")
+        elif kind == "process":
+            out.append(seg.raw)
+            if not original_steps:
+                write_remaining_steps()
+        elif kind == "step":
+            # steps stay where they were; added steps follow the last one, removed ones vanish
+            if state["step"] < len(guide.steps):
+                write_step(state["step"], seg)
+                state["step"] += 1
+            if seg is original_steps[-1]:
+                write_remaining_steps()
+        else:
+            out.append(seg.raw)
+    leave_group()
+
+    write_remaining_steps()
+    if "conclusion" not in kinds and (guide.conclusion or guide.resources):
+        out.append("## Conclusion And Resources\n\n")
+        out.append(_render_part(guide, "conclusion"))
+        out.append(_render_part(guide, "resources"))
+    return "".join(out)
+
+
+# Form conversion
+
+def guide_to_sections(guide):
+    """(meta, sections) in the shape build_guide_markdown() and the app's form use."""
+    fm = guide.frontmatter
+    meta = {
+        "author": fm.get("author", ""),
+        "id": fm.get("id", ""),
+        "language": fm.get("language", ""),
+        "summary": fm.get("summary", ""),
+        "categories": fm.get("categories", ""),
+        "environments": fm.get("environments", ""),
+        "status": fm.get("status", ""),
+        "feedback": fm.get("feedback link", ""),
+        "fork_repo": fm.get("fork repo link", ""),
+        "open_in": fm.get("open in snowflake", ""),
+    }
+    sections = {
+        "title": guide.title,
+        "overview": guide.overview,
+        "learn": "\n".join(guide.learn),
+        "need": "\n".join(guide.need),
+        "build": guide.build,
+        "steps": [{"title": s.title, "content": s.content} for s in guide.steps],
+        "conclusion": guide.conclusion,
+        "resources": "\n".join(f"{r.label} | {r.url}" if r.label else r.url for r in guide.resources),
+    }
+    return meta, sections
+
+
+# form meta keys that are spelled differently in the frontmatter
+META_FRONTMATTER_KEYS = {"feedback": "feedback link", "fork_repo": "fork repo link", "open_in": "open in snowflake"}
+
+
+def _split_categories(value):
+    return {c.strip() for c in value.split(",") if c.strip()}
+
+
+def _form_lines(text):
+    return [x.strip() for x in (text or "").splitlines() if x.strip()]
+
+
+def _form_resources(text):
+    out = []
+    for line in _form_lines(text):
+        label, sep, url = line.partition(" | ")
+        out.append(Resource(label.strip(), url.strip()) if sep else Resource("", line))
+    return out
+
+
+def apply_sections(guide, meta, sections):
+    """Copy of guide with the form's (meta, sections) applied, ready for serialize().
+
+    Only values that differ from what guide_to_sections() put into the form are
+    taken over, so parts the user did not touch keep their parsed value and are
+    written back verbatim. Categories compare as a set, since the form rebuilds
+    them in its own order.
+    """
+    old_meta, old_sections = guide_to_sections(guide)
+    out = copy.deepcopy(guide)
+
+    for key, value in meta.items():
+        old = old_meta.get(key, "")
+        if key == "categories" and _split_categories(value) == _split_categories(old):
+            continue
+        if value != old:
+            out.frontmatter[META_FRONTMATTER_KEYS.get(key, key)] = value
+
+    for key in ("title", "overview", "build", "conclusion"):
+        if sections[key] != old_sections[key]:
+            setattr(out, key, sections[key])
+    for key in ("learn", "need"):
+        if sections[key] != old_sections[key]:
+            setattr(out, key, _form_lines(sections[key]))
+    if sections["resources"] != old_sections["resources"]:
+        out.resources = _form_resources(sections["resources"])
+    out.steps = [Step(s["title"], s["content"]) for s in sections["steps"]]
+    return out
+
+
+# Command line
+
+def _iter_markdown(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("_") and d != "assets")
+                for f in sorted(files):
+                    if f.endswith(".md"):
+                        yield os.path.join(root, f)
+        else:
+            yield p
+
+
+def main():
+    """Main function for command-line usage"""
+    if len(sys.argv) < 2:
+        print("Usage:")
+        print("  python -m utils.guide_model <guide.md | src_dir> ...")
+        sys.exit(1)
+
+    texts = []
+    for path in _iter_markdown(sys.argv[1:]):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            texts.append((path, f.read()))
+
+    mismatches = 0
+    started = time.perf_counter()
+    for path, text in texts:
+        if serialize(parse_guide(text)) != text:
+            mismatches += 1
+            print(f"Round-trip mismatch: {path}")
+    elapsed = time.perf_counter() - started
+    rate = len(texts) / elapsed if elapsed else float("inf")
+    print(f"Parsed and re-serialized {len(texts)} guide(s) in {elapsed:.3f}s ({rate:,.0f} guides/s), {mismatches} mismatch(es)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+"""
+Guide Watch Mode
+Watches guide folders in an sfguides fork (site/sfguides/src/<id>/) and re-runs
+the validate-and-stage.yml checks locally as files are saved, so problems show
+up before the push instead of in the PR. Changes arrive through inotify when
+inotify_simple is installed (Linux), otherwise by polling. Bursts of saves are
+debounced into one run, and only the checks a changed file can affect are
+re-run:
+
+  guide markdown         -> frontmatter (validate_markdown(), one .md per folder), links
+  asset added or removed -> assets (size, type), links
+  asset modified         -> assets
+
+A stat/hash cache drops events for files whose contents did not change
+(editor touch, save without edits, checkout of the same content).
+
+Usage:
+  python -m utils.guide_watch site/sfguides/src/<id> [...] [--poll] [--debounce 0.15]
+  python -m utils.guide_watch site/sfguides/src           # every guide folder, new ones included
+  python -m utils.guide_watch site/sfguides/src --once    # check once and exit (status 1 on errors)
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+from utils.asset_index import index_asset_references, list_asset_files
+from utils.guide_common import validate_markdown
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # optional: fall back to polling
+    INotify = None
+
+MAX_IMAGE_BYTES = 1_000_000  # "Check for large files in assets (blocking)"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".bmp", ".ico")
+CHECKS = ("frontmatter", "assets", "links")
+
+ERROR, WARNING, INFO = "❌", "⚠️", "💡"
+
+
+def _ignored(name):
+    """Editor swap/backup files and other dotfiles."""
+    return name.startswith((".", "#")) or name.endswith(("~", ".swp", ".swx", ".tmp"))
+
+
+class FileCache:
+    """Content fingerprints keyed by path; stat first, hash only when stat moved."""
+
+    def __init__(self):
+        self._entries = {}  # path -> (mtime_ns, size, digest)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def changed(self, path):
+        """True when the file appeared, vanished or its contents differ from last time."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return self._entries.pop(path, None) is not None
+        old = self._entries.get(path)
+        if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+            return False
+        digest = self._digest(path)
+        self._entries[path] = (st.st_mtime_ns, st.st_size, digest)
+        return old is None or old[2] != digest
+
+    @staticmethod
+    def _digest(path):
+        h = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        except OSError:
+            return None
+        return h.hexdigest()
+
+
+class GuideState:
+    """Latest results per check for one guide folder."""
+
+    def __init__(self, guide_dir):
+        self.guide_dir = guide_dir
+        self.guide_id = os.path.basename(os.path.normpath(guide_dir))
+        self.results = {check: [] for check in CHECKS}
+        self._md_text = None
+
+    def markdown_files(self):
+        try:
+            return sorted(
+                f for f in os.listdir(self.guide_dir)
+                if f.lower().endswith(".md") and os.path.isfile(os.path.join(self.guide_dir, f))
+            )
+        except OSError:
+            return []
+
+    def markdown_text(self, reload=False):
+        if reload or self._md_text is None:
+            files = self.markdown_files()
+            # CI names the file after the folder; fall back to the only .md present
+            name = f"{self.guide_id}.md" if f"{self.guide_id}.md" in files else (files[0] if files else None)
+            self._md_text = ""
+            if name:
+                with open(os.path.join(self.guide_dir, name), "r", encoding="utf-8", errors="replace") as f:
+                    self._md_text = f.read()
+        return self._md_text
+
+    # Checks
+
+    def check_frontmatter(self):
+        issues = []
+        files = self.markdown_files()
+        if not files:
+            return [(ERROR, "no markdown file in the folder root")]
+        if len(files) > 1:
+            issues.append((ERROR, "only one markdown file is allowed in the folder root (found " + ", ".join(files) + ")"))
+        issues += [(ERROR, msg) for msg in validate_markdown(self.markdown_text(reload=True), self.guide_id)]
+        for f in sorted(os.listdir(self.guide_dir)):
+            p = os.path.join(self.guide_dir, f)
+            if os.path.isfile(p) and not f.lower().endswith(".md") and not _ignored(f):
+                issues.append((INFO, f"{f}: non-markdown files belong in assets/"))
+        return issues
+
+    def check_assets(self):
+        issues = []
+        assets_dir = os.path.join(self.guide_dir, "assets")
+        for name in list_asset_files(self.guide_dir):
+            if _ignored(os.path.basename(name)):
+                continue
+            if not name.lower().endswith(IMAGE_EXTS):
+                issues.append((INFO, f"assets/{name}: non-image assets are not uploaded to snowflake.com"))
+                continue
+            try:
+                size = os.path.getsize(os.path.join(assets_dir, *name.split("/")))
+            except OSError:
+                continue
+            if size > MAX_IMAGE_BYTES:
+                issues.append((ERROR, f"assets/{name}: {size:,} bytes exceeds the 1MB image limit"))
+        return issues
+
+    def check_links(self):
+        names = [n for n in list_asset_files(self.guide_dir) if not _ignored(os.path.basename(n))]
+        index = index_asset_references(self.markdown_text(), names)
+        issues = [(WARNING, f"assets/{n} is referenced but does not exist") for n in index["missing"]]
+        issues += [
+            (WARNING, f"assets/{old} should be assets/{new} (saved filenames are sanitized)")
+            for old, new in index["rewritten"].items()
+        ]
+        issues += [(INFO, f"assets/{n} is not referenced by the guide") for n in index["orphans"]]
+        return issues
+
+    def run(self, checks):
+        # frontmatter reloads the markdown, so it runs before links
+        for check in CHECKS:
+            if check in checks:
+                self.results[check] = getattr(self, f"check_{check}")()
+
+    def issues(self):
+        return [issue for check in CHECKS for issue in self.results[check]]
+
+
+def checks_for(guide_dir, path, existed):
+    """Checks affected by a content change of path inside guide_dir."""
+    rel = os.path.relpath(path, guide_dir).replace(os.sep, "/")
+    if rel.startswith("assets/"):
+        # a modified asset cannot change which references resolve
+        return {"assets"} if existed and os.path.exists(path) else {"assets", "links"}
+    if "/" not in rel and rel.lower().endswith(".md"):
+        return {"frontmatter", "links"}
+    if "/" not in rel:
+        return {"frontmatter"}
+    return set()
+
+
+# Change sources
+
+def _iter_dirs(root):
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        yield dirpath
+
+
+class PollingSource:
+    """Stat-walks the watched trees; wait() returns the paths whose stat changed."""
+
+    def __init__(self, roots, interval=0.25):
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snap = {}
+        for root in self.roots:
+            for dirpath in _iter_dirs(root):
+                try:
+                    entries = list(os.scandir(dirpath))
+                except OSError:
+                    continue
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and not _ignored(entry.name):
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        snap[entry.path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def wait(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snap = self._scan()
+            changed = {p for p in snap.keys() | self._snapshot.keys() if snap.get(p) != self._snapshot.get(p)}
+            self._snapshot = snap
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+class InotifySource:
+    """inotify watches on every directory of the trees; new directories are watched as they appear."""
+
+    def __init__(self, roots):
+        self._inotify = INotify()
+        self._mask = (
+            flags.CLOSE_WRITE | flags.MODIFY | flags.CREATE | flags.DELETE
+            | flags.MOVED_TO | flags.MOVED_FROM | flags.DELETE_SELF
+        )
+        self._dirs = {}  # wd -> directory
+        for root in roots:
+            for dirpath in _iter_dirs(root):
+                self._watch(dirpath)
+
+    def _watch(self, path):
+        try:
+            self._dirs[self._inotify.add_watch(path, self._mask)] = path
+        except OSError:
+            pass  # removed before we got to it
+
+    def wait(self, timeout):
+        changed = set()
+        events = self._inotify.read(timeout=None if timeout is None else int(timeout * 1000))
+        for event in events:
+            base = self._dirs.get(event.wd)
+            if base is None:
+                continue
+            if event.mask & flags.IGNORED:
+                self._dirs.pop(event.wd, None)
+                continue
+            path = os.path.join(base, event.name) if event.name else base
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    # files can land before the watch exists, so report what is already there
+                    for dirpath in _iter_dirs(path):
+                        self._watch(dirpath)
+                        try:
+                            changed.update(e.path for e in os.scandir(dirpath) if e.is_file())
+                        except OSError:
+                            pass
+                elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    changed.add(path)
+            elif event.name and not _ignored(event.name):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        self._inotify.close()
+
+
+# Watch loop
+
+def find_guide_dirs(path):
+    """A guide folder itself, or every guide folder of a src root (skipping _shared etc.)."""
+    path = os.path.normpath(path)
+    if os.path.isdir(os.path.join(path, "assets")) or any(f.lower().endswith(".md") for f in os.listdir(path)):
+        return [path]
+    return [
+        os.path.join(path, d) for d in sorted(os.listdir(path))
+        if not d.startswith(("_", ".")) and os.path.isdir(os.path.join(path, d))
+    ]
+
+
+class GuideWatcher:
+    """Routes changed paths to their guide, skips unchanged content and re-runs affected checks."""
+
+    def __init__(self, paths, out=sys.stdout):
+        self.roots = [os.path.normpath(p) for p in paths]
+        self.out = out
+        self.cache = FileCache()
+        self.guides = {}
+        for root in self.roots:
+            for guide_dir in find_guide_dirs(root):
+                self.guides[guide_dir] = GuideState(guide_dir)
+
+    def _guide_for(self, path):
+        for root in self.roots:
+            if path == root or not path.startswith(root + os.sep):
+                continue
+            if root in self.guides:
+                return self.guides[root]
+            # a folder under a src root; new ones are picked up here
+            guide_dir = os.path.join(root, os.path.relpath(path, root).split(os.sep)[0])
+            if os.path.basename(guide_dir).startswith(("_", ".")):
+                return None
+            if guide_dir == path:
+                return self.guides.get(guide_dir)
+            if guide_dir not in self.guides and os.path.isdir(guide_dir):
+                self.guides[guide_dir] = GuideState(guide_dir)
+            return self.guides.get(guide_dir)
+        return None
+
+    def prime(self):
+        """Fill the content cache and run every check once."""
+        for guide in self.guides.values():
+            for dirpath in _iter_dirs(guide.guide_dir):
+                for f in os.listdir(dirpath):
+                    self.cache.changed(os.path.join(dirpath, f))
+            self.run(guide, set(CHECKS))
+
+    def handle(self, paths):
+        """Process one debounced batch of changed paths."""
+        pending = {}
+        for path in sorted(paths):
+            guide = self._guide_for(path)
+            if guide is None:
+                continue
+            if not os.path.exists(guide.guide_dir):
+                self.guides.pop(guide.guide_dir, None)
+                self.out.write(f"{guide.guide_id}: folder removed\n")
+                continue
+            if os.path.isdir(path):
+                continue
+            existed = path in self.cache
+            if not self.cache.changed(path):
+                continue
+            pending.setdefault(guide.guide_dir, set()).update(checks_for(guide.guide_dir, path, existed))
+        for guide_dir, checks in pending.items():
+            if checks:
+                self.run(self.guides[guide_dir], checks)
+        self.out.flush()
+
+    def run(self, guide, checks):
+        started = time.perf_counter()
+        guide.run(checks)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        issues = guide.issues()
+        ran = ", ".join(c for c in CHECKS if c in checks)
+        stamp = time.strftime("%H:%M:%S")
+        errors = sum(1 for level, _ in issues if level == ERROR)
+        status = "✅ passed" if not errors else f"{ERROR} {errors} blocking issue(s)"
+        self.out.write(f"[{stamp}] {guide.guide_id} ({ran}; {elapsed_ms:.1f} ms): {status}\n")
+        for level, msg in issues:
+            self.out.write(f"  {level} {msg}\n")
+
+    def has_errors(self):
+        return any(level == ERROR for g in self.guides.values() for level, _ in g.issues())
+
+    def watch(self, debounce=0.15, poll=False, interval=0.25):
+        source = PollingSource(self.roots, interval) if poll or INotify is None else InotifySource(self.roots)
+        mode = "polling" if isinstance(source, PollingSource) else "inotify"
+        self.out.write(f"Watching {len(self.guides)} guide folder(s) with {mode}; Ctrl+C to stop.\n")
+        self.out.flush()
+        try:
+            while True:
+                batch = source.wait(None)
+                # keep collecting until the burst of saves goes quiet
+                while True:
+                    more = source.wait(debounce)
+                    if not more:
+                        break
+                    batch |= more
+                self.handle(batch)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            source.close()
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Re-validate guides locally as they are edited.")
+    parser.add_argument("paths", nargs="+", help="guide folders or a site/sfguides/src root")
+    parser.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    parser.add_argument("--interval", type=float, default=0.25, help="polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=0.15, help="quiet period that ends a burst of saves, in seconds")
+    parser.add_argument("--once", action="store_true", help="check once and exit")
+    args = parser.parse_args()
+
+    for p in args.paths:
+        if not os.path.isdir(p):
+            parser.error(f"not a directory: {p}")
+    watcher = GuideWatcher(args.paths)
+    watcher.prime()
+    if args.once:
+        sys.exit(1 if watcher.has_errors() else 0)
+    if INotify is None and not args.poll:
+        print("Note: inotify_simple is not installed; polling for changes.", file=sys.stderr)
+    watcher.watch(args.debounce, args.poll, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+"""
+Guide Generator Load Test
+Replays realistic guide submissions against streamlit_app.py with many
+concurrent headless sessions (streamlit.testing AppTest). AppTest keeps one
+global runtime per process, so each concurrent author runs in its own worker
+process and memory is reported as the sum over all workers. Each simulated author
+gets a pre-seeded draft (metadata, steps and uploaded assets of the configured
+size), so a session exercises the real submit path: taxonomy fetch, draft
+restore, build_guide_markdown(), write_guide_tree() into a temp dir and the
+in-memory ZIP. The taxonomy URL is served by a local stub so runs are offline.
+
+For every scenario it reports submit latency percentiles, peak RSS and peak
+temp-disk usage. A session fails if the load or the submit run raised or showed
+an error.
+
+Each worker process opens its own DraftStore on the shared SQLite file, while
+the app in production is one process with one cached store. Draft writes
+therefore also contend for the file lock across processes, which production
+never does; with concurrency above 1 the latencies include that contention and
+are an upper bound (the report notes it as draft_store_processes).
+
+Usage:
+  python -m utils.load_test [--concurrency 1,10,50] [--asset-mb 0.5,5] [--sessions 50]
+                            [--images 3] [--steps 10] [--json results.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from streamlit.testing.v1 import AppTest
+
+from utils.draft_store import DraftStore
+from utils.guide_common import MemoryUpload
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "streamlit_app.py")
+SUBMIT_KEY = "FormSubmitter:guide_form-Generate Guide"
+MAX_IMAGE_BYTES = 1_000_000  # images above this are dropped by write_guide_tree()
+
+TAXONOMY_PAGE = "\n".join(
+    f"<li><code>snowflake-site:taxonomy/{p}</code></li>"
+    for p in (
+        "solution-center/certification/quickstart",
+        "solution-center/certification/community-sourced",
+        "products/snowflake-cortex",
+        "products/snowpark",
+        "products/streamlit-in-snowflake",
+        "products/dynamic-tables",
+        "technical/featured",
+    )
+)
+
+
+class _TaxonomyHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits += 1
+        data = f"<html><body><ul>{TAXONOMY_PAGE}</ul></body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_taxonomy_stub():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _TaxonomyHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.hits = 0
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    host, port = httpd.server_address[:2]
+    httpd.url = f"http://{host}:{port}/get-started-with-guides/"
+    return httpd
+
+
+def _rss_bytes(pid="self"):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass  # temp dirs vanish while we walk them
+    return total
+
+
+class _PeakSampler:
+    """Background sampler for peak total RSS of the workers and peak size of the temp dir."""
+
+    def __init__(self, pids, tmp_dir, interval=0.02):
+        self.pids = pids
+        self.tmp_dir = tmp_dir
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_tmp = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, sum(_rss_bytes(pid) for pid in self.pids))
+            self.peak_tmp = max(self.peak_tmp, _dir_size(self.tmp_dir))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def seed_drafts(store, sessions, asset_bytes, images, steps):
+    """One draft per simulated author with realistic fields and assets."""
+    image_size = min(asset_bytes, MAX_IMAGE_BYTES)
+    draft_ids = []
+    for n in range(sessions):
+        draft_id = f"load-{n}-{uuid.uuid4().hex[:6]}"
+        fields = {
+            "meta_guide_id": f"load-test-guide-{n}",
+            "meta_author": "Load Test",
+            "meta_summary": "Synthetic submission from the load-test harness",
+            "content_title": f"Load Test Guide {n}",
+            "content_overview": "Overview paragraph. " * 40,
+            "content_learn": "\n".join(f"Lesson {i}" for i in range(5)),
+            "steps_order": [str(i) for i in range(steps)],
+        }
+        body = ["![](assets/load-image-0.png)"] + [f"Line {i} of the step with some `code`." for i in range(30)]
+        for i in range(steps):
+            fields[f"steps_title_{i}"] = f"Step title {i}"
+            fields[f"steps_content_{i}"] = "\n".join(body)
+        store.stage(draft_id, fields)
+        # distinct bytes per author so the store cannot dedupe them away
+        seed = n.to_bytes(4, "big")
+        store.save_assets(draft_id, "images", [
+            MemoryUpload(f"load-image-{i}.png", seed * (image_size // 4), "image/png") for i in range(images)
+        ])
+        store.save_assets(draft_id, "other", [
+            MemoryUpload("load-data.csv", seed * (asset_bytes // 4), "text/csv")
+        ])
+        draft_ids.append(draft_id)
+    store.flush()
+    return draft_ids
+
+
+def _run_errors(at, stage):
+    return [f"{stage}: {e.message}" for e in at.exception] + [f"{stage}: {e.value}" for e in at.error]
+
+
+def run_session(draft_id, timeout, app_path=APP_PATH):
+    """
+    One author: open the app on their draft and submit the form. The session
+    fails if either run raised or showed an error; a failed load is not submitted.
+    """
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    at.query_params["draft"] = draft_id
+    started = time.perf_counter()
+    at.run()
+    loaded = time.perf_counter()
+    errors = _run_errors(at, "load")
+    if at.exception:
+        return {"load_s": loaded - started, "submit_s": 0.0, "ok": False, "errors": errors}
+    at.button(key=SUBMIT_KEY).click()
+    at.run()
+    done = time.perf_counter()
+    errors += _run_errors(at, "submit")
+    saved = any(c.value.startswith("Saved assets:") for c in at.caption)
+    return {
+        "load_s": loaded - started,
+        "submit_s": done - loaded,
+        "ok": not errors and saved,
+        "errors": errors,
+    }
+
+
+def _worker(jobs, results, env, tmp_dir, timeout):
+    """Worker process: run queued sessions one after another until the None sentinel."""
+    os.environ.update(env)
+    tempfile.tempdir = tmp_dir  # the app's TemporaryDirectory() lands here
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)  # the app imports utils.* like `streamlit run` does
+    while True:
+        draft_id = jobs.get()
+        if draft_id is None:
+            break
+        try:
+            result = run_session(draft_id, timeout)
+        except Exception as e:
+            result = {"load_s": 0.0, "submit_s": 0.0, "ok": False, "errors": [f"{type(e).__name__}: {e}"]}
+        result["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        results.put(result)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _lost_session(error):
+    return {"load_s": 0.0, "submit_s": 0.0, "ok": False, "errors": [error], "max_rss_bytes": 0}
+
+
+def collect_results(result_queue, workers, expected, stall_s, poll_s=0.5):
+    """
+    Gather `expected` session results from the workers. Sessions a worker never
+    reports, because it crashed or made no progress for stall_s (it is then
+    terminated), come back as failed results naming the worker and exit code.
+    """
+    results = []
+    last_progress = time.perf_counter()
+    while len(results) < expected:
+        try:
+            results.append(result_queue.get(timeout=poll_s))
+            last_progress = time.perf_counter()
+            continue
+        except queue.Empty:
+            pass
+        if not any(w.is_alive() for w in workers):
+            break
+        if time.perf_counter() - last_progress > stall_s:
+            for w in workers:
+                if w.is_alive():
+                    w.terminate()
+            break
+    for w in workers:
+        w.join()
+    # results a worker queued just before it exited
+    while len(results) < expected:
+        try:
+            results.append(result_queue.get(timeout=0.1))
+        except queue.Empty:
+            break
+    lost = expected - len(results)
+    if lost:
+        exits = ", ".join(f"pid {w.pid} exit code {w.exitcode}" for w in workers if w.exitcode)
+        reason = f"worker died or hung ({exits or 'no exit codes'}); session never reported"
+        results.extend(_lost_session(reason) for _ in range(lost))
+    return results
+
+
+def run_scenario(concurrency, asset_mb, sessions, images, steps, timeout, taxonomy):
+    work_dir = tempfile.mkdtemp(prefix="guide-load-")
+    tmp_dir = os.path.join(work_dir, "tmp")
+    os.makedirs(tmp_dir)
+    db_path = os.path.join(work_dir, "drafts.sqlite3")
+    seed_store = DraftStore(db_path)
+    draft_ids = seed_drafts(seed_store, sessions, int(asset_mb * 1_000_000), images, steps)
+    seed_store.close()
+
+    env = {"GUIDE_DRAFTS_DB": db_path, "GUIDE_CATEGORIES_URL": taxonomy.url}
+    jobs, result_queue = multiprocessing.Queue(), multiprocessing.Queue()
+    for draft_id in draft_ids:
+        jobs.put(draft_id)
+    workers = [
+        multiprocessing.Process(target=_worker, args=(jobs, result_queue, env, tmp_dir, timeout), daemon=True)
+        for _ in range(min(concurrency, len(draft_ids)))
+    ]
+    for _ in workers:
+        jobs.put(None)
+    hits_before = taxonomy.hits
+    try:
+        started = time.perf_counter()
+        for w in workers:
+            w.start()
+        with _PeakSampler([w.pid for w in workers], tmp_dir) as sampler:
+            # each session is a load and a submit, each bounded by the AppTest timeout
+            results = collect_results(result_queue, workers, len(draft_ids), stall_s=2 * timeout + 30)
+            elapsed = time.perf_counter() - started
+        jobs.cancel_join_thread()  # jobs a dead worker never took must not block exit
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    submit = sorted(r["submit_s"] for r in results)
+    load = sorted(r["load_s"] for r in results)
+    failures = [r for r in results if not r["ok"]]
+    return {
+        "concurrency": concurrency,
+        "asset_mb": asset_mb,
+        "sessions": sessions,
+        "ok": len(results) - len(failures),
+        "failed": len(failures),
+        "first_error": (failures[0]["errors"] or ["no 'Saved assets' caption"])[0] if failures else "",
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "load_p50_s": round(_percentile(load, 50), 3),
+        "submit_p50_s": round(_percentile(submit, 50), 3),
+        "submit_p90_s": round(_percentile(submit, 90), 3),
+        "submit_p99_s": round(_percentile(submit, 99), 3),
+        "submit_max_s": round(submit[-1], 3) if submit else 0.0,
+        # procfs gives the concurrent total; elsewhere fall back to the largest worker
+        "peak_rss_mb": round((sampler.peak_rss or max(r["max_rss_bytes"] for r in results)) / 1e6, 1),
+        "peak_tmp_mb": round(sampler.peak_tmp / 1e6, 1),
+        "taxonomy_fetches": taxonomy.hits - hits_before,
+        # production shares one store in one process; more than one here adds cross-process lock waits
+        "draft_store_processes": len(workers),
+    }
+
+
+def _csv_floats(text):
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Simulate concurrent authors submitting guides.")
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrency levels")
+    parser.add_argument("--asset-mb", default="0.5,5", help="comma-separated size of each session's data file in MB")
+    parser.add_argument("--sessions", type=int, default=50, help="submissions per scenario")
+    parser.add_argument("--images", type=int, default=3, help="images per submission (each <= 1MB)")
+    parser.add_argument("--steps", type=int, default=10, help="steps per submission")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-run timeout in seconds")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    taxonomy = start_taxonomy_stub()
+
+    rows = []
+    try:
+        for asset_mb in _csv_floats(args.asset_mb):
+            for concurrency in [int(c) for c in _csv_floats(args.concurrency)]:
+                row = run_scenario(concurrency, asset_mb, args.sessions, args.images, args.steps, args.timeout, taxonomy)
+                rows.append(row)
+                print(
+                    f"concurrency={row['concurrency']:>3} asset={row['asset_mb']:>5}MB "
+                    f"ok={row['ok']}/{row['sessions']} "
+                    f"submit p50={row['submit_p50_s']}s p90={row['submit_p90_s']}s p99={row['submit_p99_s']}s "
+                    f"peak_rss={row['peak_rss_mb']}MB peak_tmp={row['peak_tmp_mb']}MB "
+                    f"taxonomy_fetches={row['taxonomy_fetches']}"
+                )
+                if row["draft_store_processes"] > 1:
+                    print(f"  note: {row['draft_store_processes']} processes share the draft database; "
+                          "latency includes cross-process lock contention production does not have")
+                if row["failed"]:
+                    print(f"  {row['failed']} failed; first error: {row['first_error']}")
+    finally:
+        taxonomy.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    sys.exit(1 if any(r["failed"] for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Mock Staging Webhook Server
+Local stand-in for the Workato staging/production webhooks. Records every JSON
+payload it accepts, answers repeated Idempotency-Key values without recording
+them twice, and can inject latency, server errors and rate-limit responses so
+the dispatcher's retry path can be exercised offline.
+
+Usage:
+  python -m utils.mock_webhook_server [--port 8787] [--latency 0.05] [--fail-rate 0.2] [--rate-limit-every 10]
+                                      [--fail-first 0]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, code, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.lock:
+            server.request_count += 1
+            count = server.request_count
+        if count <= server.fail_first:
+            self._reply(503, {"error": "injected failure"})
+            return
+        if server.rate_limit_every and count % server.rate_limit_every == 0:
+            self._reply(429, {"error": "Rate limit reached: 6000 requests per 5m0s"}, {"Retry-After": "0"})
+            return
+        if server.fail_rate and server.rng.random() < server.fail_rate:
+            self._reply(503, {"error": "injected failure"})
+            return
+
+        try:
+            payload = json.loads(raw.decode("utf-8") or "null")
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+
+        key = self.headers.get("Idempotency-Key")
+        with server.lock:
+            duplicate = bool(key) and key in server.seen_keys
+            if not duplicate:
+                if key:
+                    server.seen_keys.add(key)
+                server.received.append({"idempotency_key": key, "payload": payload})
+        self._reply(200, {"status": "accepted", "duplicate": duplicate})
+
+
+class MockWebhookServer:
+    """Threaded mock webhook bound to localhost; usable as a context manager."""
+
+    def __init__(self, port=0, latency=0.0, fail_rate=0.0, rate_limit_every=0, fail_first=0, seed=None, verbose=False):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _WebhookHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.verbose = verbose
+        self.httpd.latency = latency
+        self.httpd.fail_rate = fail_rate
+        self.httpd.rate_limit_every = rate_limit_every
+        self.httpd.fail_first = fail_first
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.request_count = 0
+        self.httpd.seen_keys = set()
+        self.httpd.received = []
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/webhook"
+
+    @property
+    def received(self):
+        return list(self.httpd.received)
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Run a local mock of the staging webhook.")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 503")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with HTTP 429")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with HTTP 503")
+    args = parser.parse_args()
+
+    server = MockWebhookServer(
+        port=args.port, latency=args.latency, fail_rate=args.fail_rate,
+        rate_limit_every=args.rate_limit_every, fail_first=args.fail_first, verbose=True,
+    )
+    print(f"Mock webhook listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Accepted {len(server.received)} payload(s) from {server.request_count} request(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+"""
+Notebook to Guide Importer
+Streams a Jupyter/Snowflake notebook and maps its cells onto the
+sections["steps"] structure build_guide_markdown() expects: every "## ..."
+heading starts a step, markdown and code cells become its content, text
+outputs are dropped and image outputs are decoded into assets/ files instead
+of being inlined. Each step is capped in size so huge notebooks stay usable.
+
+With ijson installed the notebook is parsed as an event stream, so memory is
+bounded by the largest single cell value rather than the file size. Without
+it the whole notebook is loaded with json. Malformed, truncated or non-notebook
+files raise ValueError either way.
+
+Usage:
+  python -m utils.notebook_import deliveries/*.ipynb --out imported/ [--max-step-chars 20000] [--workers N]
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.guide_common import sanitize_filename
+
+try:
+    import ijson
+except ImportError:  # optional: fall back to json.load
+    ijson = None
+
+# Parse errors that mean "not a readable notebook"; ijson's do not derive from ValueError
+NOTEBOOK_ERRORS = (ValueError, ijson.JSONError) if ijson is not None else (ValueError,)
+
+MAX_STEP_CHARS = 20_000
+MAX_IMAGE_BYTES = 1_000_000  # same cap write_guide_tree() applies to images
+
+IMAGE_MIME_EXT = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/bmp": "bmp",
+    "image/svg+xml": "svg",
+}
+
+STEP_PREFIX_RE = re.compile(r"^step\s*\d+\s*[:.\-–—]\s*", re.I)
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+def _new_cell():
+    return {"cell_type": "", "source": [], "language": "", "images": []}
+
+
+def _iter_cells_streaming(fp, info):
+    """Yield cells from an ijson event stream, keeping only what the guide needs."""
+    cell = None
+    output = None
+    has_cells = False
+    for prefix, event, value in ijson.parse(fp):
+        if cell is None:
+            if prefix == "" and event not in ("start_map", "map_key", "end_map"):
+                raise ValueError("not a notebook: top level is not a JSON object")
+            if prefix == "cells" and event != "end_array":
+                if event != "start_array":
+                    raise ValueError('not a notebook: "cells" is not a list')
+                has_cells = True
+            elif prefix == "cells.item" and event == "start_map":
+                cell = _new_cell()
+            elif event == "string" and prefix in ("metadata.language_info.name", "metadata.kernelspec.language"):
+                info.setdefault("language", value)
+            continue
+        if prefix == "cells.item" and event == "end_map":
+            yield cell
+            cell = None
+        elif prefix == "cells.item.cell_type":
+            cell["cell_type"] = value
+        elif prefix in ("cells.item.source", "cells.item.source.item") and event == "string":
+            cell["source"].append(value)
+        elif prefix in ("cells.item.metadata.language", "cells.item.metadata.vscode.languageId") and event == "string":
+            cell["language"] = cell["language"] or value
+        elif prefix == "cells.item.outputs.item":
+            if event == "start_map":
+                output = {}
+            elif event == "end_map":
+                cell["images"].extend((mime, "".join(parts)) for mime, parts in output.items())
+                output = None
+        elif output is not None and event == "string" and prefix.startswith("cells.item.outputs.item.data.image/"):
+            mime = prefix[len("cells.item.outputs.item.data."):]
+            if mime.endswith(".item"):
+                mime = mime[:-len(".item")]
+            output.setdefault(mime, []).append(value)
+    if not has_cells:
+        raise ValueError('not a notebook: no "cells" list')
+
+
+def _iter_cells_loaded(fp, info):
+    nb = json.load(fp)
+    if not isinstance(nb, dict) or not isinstance(nb.get("cells"), list):
+        raise ValueError('not a notebook: no "cells" list')
+    meta = nb.get("metadata") or {}
+    lang = (meta.get("language_info") or {}).get("name") or (meta.get("kernelspec") or {}).get("language")
+    if lang:
+        info["language"] = lang
+    for c in nb["cells"]:
+        if not isinstance(c, dict):
+            continue
+        cell = _new_cell()
+        cell["cell_type"] = c.get("cell_type", "")
+        src = c.get("source") or []
+        cell["source"] = [src] if isinstance(src, str) else list(src)
+        cmeta = c.get("metadata") or {}
+        cell["language"] = cmeta.get("language") or (cmeta.get("vscode") or {}).get("languageId") or ""
+        for out in c.get("outputs") or []:
+            for mime, val in (out.get("data") or {}).items():
+                if mime.startswith("image/"):
+                    cell["images"].append((mime, "".join(val) if isinstance(val, list) else val))
+        yield cell
+
+
+def iter_notebook_cells(fp, info):
+    """Cells as dicts (cell_type, source, language, images); fills info["language"]."""
+    if ijson is not None:
+        return _iter_cells_streaming(fp, info)
+    return _iter_cells_loaded(fp, info)
+
+
+def _decode_image(mime, value):
+    if mime == "image/svg+xml":
+        return value.encode("utf-8")
+    try:
+        return base64.b64decode(value)
+    except (binascii.Error, ValueError):
+        return None
+
+
+class _StepBuilder:
+    """Accumulates step parts, enforcing the per-step size cap as it goes."""
+
+    def __init__(self, max_step_chars):
+        self.max_step_chars = max_step_chars
+        self.title = ""
+        self.overview = []
+        self.steps = []
+        self.target = self.overview
+        self.size = 0
+        self.omitted = 0
+
+    def _close_step(self):
+        if self.omitted:
+            self.target.append(("md", f"_(Truncated: {self.omitted} characters omitted from the notebook.)_"))
+        self.omitted = 0
+        self.size = 0
+
+    def start_step(self, title):
+        self._close_step()
+        self.steps.append({"title": title, "parts": []})
+        self.target = self.steps[-1]["parts"]
+
+    def start_overview(self):
+        self._close_step()
+        self.target = self.overview
+
+    def fits(self, text):
+        return self.size + len(text) <= self.max_step_chars
+
+    def add(self, kind, text, lang=""):
+        if not text.strip():
+            return
+        if not self.fits(text):
+            self.omitted += len(text)
+            return
+        self.size += len(text)
+        self.target.append((kind, text, lang) if kind == "code" else (kind, text))
+
+    def add_markdown(self, text):
+        buf = []
+        in_fence = False
+        for line in text.splitlines():
+            if FENCE_RE.match(line):
+                in_fence = not in_fence
+            heading = None if in_fence else re.match(r"^(#{1,2})\s+(.+?)\s*#*\s*$", line)
+            if heading:
+                self.add("md", "\n".join(buf))
+                buf = []
+                level, title = len(heading.group(1)), heading.group(2)
+                if level == 1 and not self.title:
+                    self.title = title
+                elif level == 2 and title.strip().lower() == "overview":
+                    self.start_overview()
+                elif level == 2:
+                    self.start_step(STEP_PREFIX_RE.sub("", title))
+                else:
+                    buf.append(line)
+                continue
+            buf.append(line)
+        self.add("md", "\n".join(buf))
+
+    def finish(self, default_language):
+        self._close_step()
+
+        def render(parts):
+            out = []
+            for part in parts:
+                if part[0] == "code":
+                    lang = (part[2] or default_language or "").lower()
+                    out.append(f"```{lang}\n{part[1].rstrip()}\n```")
+                else:
+                    out.append(part[1].strip())
+            return "\n\n".join(out)
+
+        return {
+            "title": self.title,
+            "overview": render(self.overview),
+            "steps": [{"title": s["title"], "content": render(s["parts"])} for s in self.steps],
+        }
+
+
+def import_notebook(fp, asset_prefix, assets_dir=None, max_step_chars=MAX_STEP_CHARS, max_image_bytes=MAX_IMAGE_BYTES):
+    """
+    Convert a notebook (binary file object) into guide sections.
+    Returns {"title", "overview", "steps", "assets", "skipped_images"}. Extracted
+    images are written to assets_dir when given, otherwise returned in memory
+    as (name, bytes, mime) tuples; "assets" lists whichever applies.
+    Raises ValueError when the file is not a readable notebook.
+    """
+    prefix = sanitize_filename(asset_prefix).rsplit(".ipynb", 1)[0] or "notebook"
+    info = {}
+    builder = _StepBuilder(max_step_chars)
+    assets = []
+    skipped = 0
+    try:
+        for n, cell in enumerate(iter_notebook_cells(fp, info), start=1):
+            source = "".join(cell["source"])
+            if cell["cell_type"] == "markdown":
+                builder.add_markdown(source)
+            elif cell["cell_type"] == "code":
+                builder.add("code", source, cell["language"])
+            for k, (mime, value) in enumerate(cell["images"], start=1):
+                ext = IMAGE_MIME_EXT.get(mime.split(";")[0])
+                data = _decode_image(mime, value) if ext else None
+                if not data or len(data) > max_image_bytes:
+                    skipped += 1
+                    continue
+                name = f"{prefix}-cell{n}-{k}.{ext}"
+                ref = f"![](assets/{name})"
+                if not builder.fits(ref):
+                    builder.add("md", ref)  # counted as truncated, image not extracted
+                    continue
+                if assets_dir:
+                    os.makedirs(assets_dir, exist_ok=True)
+                    with open(os.path.join(assets_dir, name), "wb") as f:
+                        f.write(data)
+                    assets.append(name)
+                else:
+                    assets.append((name, data, mime))
+                builder.add("md", ref)
+    except NOTEBOOK_ERRORS as e:
+        raise ValueError(f"not a readable notebook: {e}") from e
+    sections = builder.finish(info.get("language", ""))
+    sections["assets"] = assets
+    sections["skipped_images"] = skipped
+    return sections
+
+
+def import_notebook_file(path, out_dir, max_step_chars=MAX_STEP_CHARS):
+    """Batch helper: write <out_dir>/<stem>/steps.json plus its assets/ folder."""
+    stem = sanitize_filename(os.path.splitext(os.path.basename(path))[0]) or "notebook"
+    target = os.path.join(out_dir, stem)
+    with open(path, "rb") as f:
+        sections = import_notebook(f, stem, assets_dir=os.path.join(target, "assets"), max_step_chars=max_step_chars)
+    os.makedirs(target, exist_ok=True)
+    with open(os.path.join(target, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump(sections, f, indent=2, ensure_ascii=False)
+    return path, len(sections["steps"]), len(sections["assets"]), sections["skipped_images"]
+
+
+def _import_notebook_file_args(args):
+    try:
+        return import_notebook_file(*args)
+    except ValueError as e:
+        return args[0], None, str(e), 0
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Convert notebooks into guide steps and assets.")
+    parser.add_argument("notebooks", nargs="+", help=".ipynb files")
+    parser.add_argument("--out", required=True, help="output directory (one folder per notebook)")
+    parser.add_argument("--max-step-chars", type=int, default=MAX_STEP_CHARS)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+
+    if ijson is None:
+        print("Note: ijson is not installed; notebooks are loaded fully into memory.", file=sys.stderr)
+    jobs = [(p, args.out, args.max_step_chars) for p in args.notebooks]
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, steps, assets, skipped in pool.map(_import_notebook_file_args, jobs):
+            if steps is None:
+                failed += 1
+                print(f"❌ {path}: {assets}")
+                continue
+            note = f", {skipped} image(s) skipped" if skipped else ""
+            print(f"{path}: {steps} step(s), {assets} asset(s){note}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
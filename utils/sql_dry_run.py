@@ -0,0 +1,1278 @@
+#!/usr/bin/env python
+"""
+Offline SQL Dry Run
+Pre-validates generated code before the live run of
+prompts/tasks/step3-code-validation.md, without a Snowflake connection. A
+delivery (.sql, the SQL cells and session.sql() calls of an .ipynb, or the
+```sql blocks of a .md) is split into statements, and every statement's effects
+are read from it: which tables, views, stages and other objects it creates,
+drops, reads or writes, resolved against the USE DATABASE / USE SCHEMA context
+in effect at that point. From that it checks:
+
+  syntax       unterminated strings, comments and $$ bodies, unbalanced parentheses
+  constraint   account-level operations the learning environment rejects
+               (analyze_sql_code() from fail-fast-constraint-detector.py)
+  resolution   objects used before they are created or after they are dropped,
+               created twice without OR REPLACE / IF NOT EXISTS, or never created
+               by the script (warning: they must already exist)
+
+Statements that touch disjoint objects form independent groups. Each group is
+dry-run in order against its own session of a local engine, and groups run in
+parallel. Engines are pluggable (ENGINES); "catalog" models tables and their
+columns (VALUES arity, column lists, literal types, NOT NULL, foreign keys) and
+"sqlite" additionally executes the portable statements in an in-memory SQLite
+database to catch unknown columns.
+
+Usage:
+  python -m utils.sql_dry_run deliveries/replication.sql [more files...]
+  python -m utils.sql_dry_run deliveries/ --engine sqlite --json report.json
+"""
+
+import argparse
+import ast
+import datetime
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from utils.notebook_import import iter_notebook_cells
+
+ERROR, WARNING = "❌", "⚠️"
+SQL_EXTS = (".sql", ".ipynb", ".md")
+
+# object keyword(s) -> namespace; tables, views and streams share one like in Snowflake
+OBJECT_KINDS = {
+    "TABLE": "relation", "VIEW": "relation", "STREAM": "relation",
+    "SEMANTIC VIEW": "semantic view", "STAGE": "stage", "SCHEMA": "schema", "DATABASE": "database",
+    "FILE FORMAT": "file format", "SEQUENCE": "sequence", "PIPE": "pipe", "TASK": "task",
+    "ALERT": "alert", "FUNCTION": "function", "DATA METRIC FUNCTION": "function", "PROCEDURE": "procedure", "TAG": "tag",
+    "MASKING POLICY": "masking policy", "ROW ACCESS POLICY": "row access policy",
+    "NOTEBOOK": "notebook", "STREAMLIT": "streamlit", "CORTEX SEARCH SERVICE": "cortex search service",
+    "SERVICE": "service", "SECRET": "secret", "NETWORK RULE": "network rule",
+    "IMAGE REPOSITORY": "image repository", "MODEL": "model",
+}
+ACCOUNT_KINDS = {
+    "WAREHOUSE", "ROLE", "DATABASE ROLE", "USER", "SHARE", "INTEGRATION", "STORAGE INTEGRATION",
+    "API INTEGRATION", "NOTIFICATION INTEGRATION", "SECURITY INTEGRATION", "ACCESS INTEGRATION",
+    "COMPUTE POOL", "RESOURCE MONITOR", "REPLICATION GROUP", "FAILOVER GROUP", "NETWORK POLICY",
+    "APPLICATION", "APPLICATION PACKAGE", "CONNECTION", "ACCOUNT",
+}
+KIND_MODIFIERS = {
+    "TRANSIENT", "TEMPORARY", "TEMP", "VOLATILE", "LOCAL", "GLOBAL", "SECURE", "RECURSIVE",
+    "DYNAMIC", "HYBRID", "ICEBERG", "EXTERNAL", "MATERIALIZED", "EVENT",
+}
+# bodies of these run later (task schedule, call time), so their references are not checked now
+DEFERRED_NS = {"task", "alert", "function", "procedure", "pipe"}
+CONTAINER_NS = {"database", "schema"}
+UNCHECKED_NS = {"database", "account"}
+FROM_FUNCTIONS = {"EXTRACT", "TRIM", "SUBSTRING", "SUBSTR", "POSITION", "OVERLAY", "DATE_PART"}
+ALIAS_STOP = {
+    "WHERE", "GROUP", "ORDER", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "NATURAL",
+    "ON", "USING", "LIMIT", "UNION", "EXCEPT", "MINUS", "INTERSECT", "HAVING", "QUALIFY", "WINDOW",
+    "AT", "BEFORE", "CHANGES", "MATCH_RECOGNIZE", "PIVOT", "UNPIVOT", "SAMPLE", "TABLESAMPLE",
+    "LATERAL", "SET", "VALUES", "SELECT", "WHEN", "FETCH", "OFFSET", "ASOF", "MATCH_CONDITION",
+}
+NUMERIC_TYPES = {
+    "NUMBER", "DECIMAL", "NUMERIC", "INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "BYTEINT",
+    "FLOAT", "FLOAT4", "FLOAT8", "DOUBLE", "REAL",
+}
+STRING_TYPES = {"VARCHAR", "CHAR", "CHARACTER", "STRING", "TEXT", "NVARCHAR", "NCHAR"}
+BOOLEAN_LITERALS = {"TRUE", "FALSE", "T", "F", "YES", "NO", "Y", "N", "ON", "OFF", "1", "0"}
+
+TOKEN_RE = re.compile(r"""
+    "(?:[^"]|"")*"          # quoted identifier
+  | '[^']*'                 # string literal (contents already blanked)
+  | @[~%]?[\w$./"]*         # stage reference
+  | \$\$ | \$\w+            # $$ marker, $variable
+  | [A-Za-z_][\w$]*         # word
+  | \d+(?:\.\d+)?(?:[eE][-+]?\d+)?
+  | :: | => | \S
+""", re.X)
+STRING_BODY_RE = re.compile(r"\\.|''|'", re.S)
+STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'", re.S)
+STRING_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "0": "\0"}
+SPLIT_START_RE = re.compile(r"--|//|/\*|\S")
+SPLIT_SPECIAL_RE = re.compile(r"--|//|/\*|\$\$|[;()'\"]")
+NUMBER_RE = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?")
+ISO_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})(?:[ T].*)?$")
+SQL_FENCE_RE = re.compile(r"^```sql[^\n]*\n(.*?)^```", re.M | re.S | re.I)
+JINJA_RE = re.compile(r"\{\{(.*?)\}\}")
+
+
+def _load_constraint_detector():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fail-fast-constraint-detector.py")
+    spec = importlib.util.spec_from_file_location("fail_fast_constraint_detector", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+analyze_sql_code = _load_constraint_detector().analyze_sql_code
+
+
+# Splitting
+
+def split_statements(sql, first_line=1):
+    """
+    Split SQL text into statements. Returns (pieces, problems): pieces are
+    (code, masked, line) where code has comments blanked out and masked also
+    blanks the insides of string literals and $$ bodies, both at the same
+    offsets so token positions carry over. problems are (line, message).
+    """
+    n = len(sql)
+    code = list(sql)
+    masked = list(sql)
+    pieces, problems = [], []
+    line, start, stmt_line, depth = first_line, 0, None, 0
+
+    def blank(chars, a, b):
+        chars[a:b] = [ch if ch == "\n" else " " for ch in sql[a:b]]
+
+    def close(end):
+        nonlocal start, stmt_line, depth
+        if stmt_line is not None:
+            if depth:
+                problems.append((stmt_line, "unbalanced parentheses"))
+            pieces.append(("".join(code[start:end]).rstrip(), "".join(masked[start:end]).rstrip(), stmt_line))
+        start, stmt_line, depth = end + 1, None, 0
+
+    i = 0
+    while i < n:
+        # outside a statement anything visible starts one; inside, only these characters matter
+        m = (SPLIT_SPECIAL_RE if stmt_line is not None else SPLIT_START_RE).search(sql, i)
+        if m is None:
+            break
+        line += sql.count("\n", i, m.start())
+        i, tok = m.start(), m.group()
+        if tok in ("--", "//"):
+            j = sql.find("\n", i)
+            j = n if j < 0 else j
+            blank(code, i, j)
+            blank(masked, i, j)
+            i = j
+            continue
+        if tok == "/*":
+            j = sql.find("*/", i + 2)
+            if j < 0:
+                problems.append((line, "unterminated /* comment"))
+                j = n - 2
+            blank(code, i, j + 2)
+            blank(masked, i, j + 2)
+            line += sql.count("\n", i, j + 2)
+            i = j + 2
+            continue
+        if stmt_line is None:
+            stmt_line, start = line, i
+        if tok == ";":
+            close(i)
+        elif tok == "(":
+            depth += 1
+        elif tok == ")":
+            depth -= 1
+        elif tok == "'":
+            end = next((e for e in STRING_BODY_RE.finditer(sql, i + 1) if e.group() == "'"), None)
+            j = end.start() if end else n
+            if end is None:
+                problems.append((line, "unterminated string literal"))
+            blank(masked, i + 1, j)
+            line += sql.count("\n", i, j)
+            i = j + 1
+            continue
+        elif tok == '"':
+            j = sql.find('"', i + 1)
+            while j >= 0 and sql[j + 1:j + 2] == '"':
+                j = sql.find('"', j + 2)
+            if j < 0:
+                problems.append((line, "unterminated quoted identifier"))
+                j = n
+            line += sql.count("\n", i, j)
+            i = j + 1
+            continue
+        elif tok == "$$":
+            j = sql.find("$$", i + 2)
+            if j < 0:
+                problems.append((line, "unterminated $$ block"))
+                j = n
+            blank(masked, i + 2, j)
+            line += sql.count("\n", i, j)
+            i = j + 2
+            continue
+        i = m.end()
+    close(n)
+    return pieces, problems
+
+
+# Statements
+
+@dataclass(slots=True)
+class Token:
+    upper: str
+    text: str
+    start: int
+    end: int
+
+
+@dataclass(slots=True)
+class Statement:
+    index: int
+    location: str
+    code: str
+    masked: str
+    verb: str = ""
+    creates: list = field(default_factory=list)   # (ns, fq, "create" | "replace" | "if_not_exists" | "copy")
+    drops: list = field(default_factory=list)     # (ns, fq, if_exists)
+    reads: list = field(default_factory=list)     # (ns, fq)
+    writes: list = field(default_factory=list)    # (ns, fq)
+    renames: list = field(default_factory=list)   # (ns, old fq, new fq)
+    vars_set: list = field(default_factory=list)
+    vars_read: list = field(default_factory=list)
+    refs: list = field(default_factory=list)      # (start, end, fq) of relation names, for engines
+    columns: list = None                          # column definitions of CREATE TABLE (...)
+    foreign_keys: list = field(default_factory=list)  # (columns, referenced fq, referenced columns)
+    alter_columns: list = field(default_factory=list)  # ("add" | "drop" | "rename", column, type | new name)
+    insert: dict = None                           # {"target", "columns", "rows"} of INSERT ... VALUES
+    barrier: bool = False                         # effects unknown (CALL, EXECUTE IMMEDIATE, scripting)
+    dynamic: bool = False                         # built from a Python f-string or Jinja template
+
+    def keys(self):
+        objs = [(ns, fq) for ns, fq, *_ in self.creates + self.drops + self.reads + self.writes]
+        objs += [(ns, fq) for ns, old, new in self.renames for fq in (old, new)]
+        return set(objs) | {("variable", v) for v in self.vars_set + self.vars_read}
+
+
+def _ident(text):
+    if text.startswith('"'):
+        return text[1:-1].replace('""', '"')
+    return text.upper()
+
+
+def _is_word(tok):
+    return tok is not None and (tok.text[0].isalpha() or tok.text[0] in '_"')
+
+
+def _is_system(parts):
+    return "INFORMATION_SCHEMA" in parts or (len(parts) > 1 and parts[0] in ("SNOWFLAKE", "SNOWFLAKE_SAMPLE_DATA"))
+
+
+def _dedupe(items):
+    return list(dict.fromkeys(items))
+
+
+class Analyzer:
+    """Reads statement effects in script order, tracking the session context like Snowflake does."""
+
+    def __init__(self):
+        self.database = None
+        self.schema = None
+        self.variables = {}   # $NAME -> literal value, when SET from a literal
+        self.count = 0
+
+    # context and names
+
+    def qualify(self, parts, ns):
+        levels = 1 if ns in UNCHECKED_NS else 2 if ns == "schema" else 3
+        parts = parts[-levels:]
+        defaults = [self.database or "?", self.schema or "?"][:levels - 1]
+        return ".".join(defaults[:levels - len(parts)] + parts)
+
+    def _name_at(self, st, toks, i):
+        """Parse a possibly qualified name at toks[i]; returns (parts, next index)."""
+        parts = []
+        while i < len(toks):
+            tok = toks[i]
+            if tok.upper == "IDENTIFIER" and i + 1 < len(toks) and toks[i + 1].text == "(":
+                close = _matching(toks, i + 1)
+                inner = toks[i + 2:close]
+                if len(inner) == 1 and inner[0].text.startswith("$"):
+                    var = inner[0].upper
+                    if not var.startswith("$PY_"):
+                        st.vars_read.append(var)
+                    value = self.variables.get(var)
+                    parts.extend(_split_name(value) if value else [var])
+                elif len(inner) == 1 and inner[0].text.startswith("'"):
+                    parts.extend(_split_name(st.code[inner[0].start + 1:inner[0].end - 1]))
+                else:
+                    return None, i
+                i = close + 1
+            elif _is_word(tok):
+                parts.append(_ident(tok.text))
+                i += 1
+            else:
+                break
+            if i < len(toks) and toks[i].text == ".":
+                i += 1
+                continue
+            break
+        return parts or None, i
+
+    def _object(self, st, toks, i, ns, bucket, ref=True):
+        """Parse the name at toks[i] and record it in st.<bucket>; returns (fq, next index)."""
+        parts, end = self._name_at(st, toks, i)
+        if not parts or _is_system(parts):
+            return None, end
+        fq = self.qualify(parts, ns)
+        if bucket is not None and ns not in UNCHECKED_NS:
+            getattr(st, bucket).append((ns, fq))
+        if ref and ns == "relation":
+            st.refs.append((toks[i].start, toks[end - 1].end, fq))
+        return fq, end
+
+    def _switch(self, parts, ns):
+        if ns == "database":
+            self.database, self.schema = parts[-1], "PUBLIC"
+        elif ns == "schema":
+            if len(parts) > 1:
+                self.database = parts[-2]
+            self.schema = parts[-1]
+
+    # statements
+
+    def synthetic(self, location, verb, creates=(), reads=()):
+        """A statement for an effect outside SQL text, e.g. Snowpark's save_as_table()."""
+        st = Statement(self.count, location, "", "", verb)
+        self.count += 1
+        for ns, name, mode in creates:
+            st.creates.append((ns, self.qualify(_split_name(name), ns), mode))
+        for ns, name in reads:
+            st.reads.append((ns, self.qualify(_split_name(name), ns)))
+        return st
+
+    def analyze(self, code, masked, location, dynamic=False):
+        st = Statement(self.count, location, code, masked, dynamic=dynamic)
+        self.count += 1
+        toks = []
+        for m in TOKEN_RE.finditer(masked):
+            text = m.group()
+            toks.append(Token(_ident(text) if text[0] == '"' else text.upper(), text, m.start(), m.end()))
+        if not toks:
+            return st
+        verb = toks[0].upper
+        st.verb = verb
+        scan_from = 1
+        handler = getattr(self, "_" + verb.lower(), None) if verb.isalpha() else None
+        if verb in ("SELECT", "WITH", "(", "SHOW", "LIST", "LS", "PUT", "GET", "REMOVE", "RM",
+                    "BEGIN", "COMMIT", "ROLLBACK", "START", "EXPLAIN", "UNSET"):
+            if verb == "UNSET":
+                st.vars_set.extend("$" + t.upper for t in toks[1:] if _is_word(t))
+            scan_from = 0
+        elif handler is not None:
+            scan_from = handler(st, toks)
+        else:
+            st.barrier = True
+        if scan_from is not None:
+            self._scan_query(st, toks, scan_from)
+        for k, tok in enumerate(toks if "$" in masked else ()):
+            if tok.text.startswith("$") and tok.text[1:2].isalpha() and not tok.upper.startswith("$PY_"):
+                if not (k and toks[k - 1].upper == "SET" and verb == "SET"):
+                    st.vars_read.append(tok.upper)
+        for name in ("reads", "writes", "vars_read", "vars_set"):
+            setattr(st, name, _dedupe(getattr(st, name)))
+        return st
+
+    def _kind_at(self, toks, i):
+        """Object kind after CREATE/DROP/ALTER/...: (kind, modifiers, namespace, next index)."""
+        mods = []
+        while i < len(toks) and toks[i].upper in KIND_MODIFIERS and not (
+                toks[i].upper == "EXTERNAL" and i + 1 < len(toks) and toks[i + 1].upper == "ACCESS"):
+            mods.append(toks[i].upper)
+            i += 1
+        for width in (3, 2, 1):
+            kind = " ".join(t.upper for t in toks[i:i + width])
+            if kind in OBJECT_KINDS:
+                return kind, mods, OBJECT_KINDS[kind], i + width
+            if kind in ACCOUNT_KINDS or kind.endswith(" INTEGRATION"):
+                return kind, mods, "account", i + width
+        return None, mods, None, i
+
+    def _use(self, st, toks):
+        kind = toks[1].upper if len(toks) > 1 else ""
+        if kind in ("ROLE", "WAREHOUSE", "SECONDARY"):
+            return None
+        ns = "schema" if kind == "SCHEMA" else "database"
+        i = 2 if kind in ("SCHEMA", "DATABASE") else 1
+        parts, _ = self._name_at(st, toks, i)
+        if parts:
+            if ns == "schema":
+                st.reads.append(("schema", self.qualify(parts, "schema")))
+            self._switch(parts, ns)
+        st.verb = f"USE {ns.upper()}"
+        return None
+
+    def _set(self, st, toks):
+        eq = next((k for k, t in enumerate(toks) if t.text == "="), len(toks))
+        targets = ["$" + t.upper for t in toks[1:eq] if _is_word(t)]
+        st.vars_set.extend(targets)
+        value = toks[eq + 1:]
+        for var in targets:
+            self.variables.pop(var, None)
+        if len(targets) == 1 and len(value) == 1 and value[0].text.startswith("'"):
+            self.variables[targets[0]] = st.code[value[0].start + 1:value[0].end - 1]
+        return eq + 1
+
+    def _create(self, st, toks):
+        i, mode = 1, "create"
+        if [t.upper for t in toks[1:3]] == ["OR", "REPLACE"]:
+            i, mode = 3, "replace"
+        kind, mods, ns, i = self._kind_at(toks, i)
+        st.verb = " ".join(["CREATE"] + mods + [kind or "?"])
+        if kind is None:
+            st.barrier = True
+            return 1
+        if [t.upper for t in toks[i:i + 3]] == ["IF", "NOT", "EXISTS"]:
+            i, mode = i + 3, "if_not_exists"
+        if ns in ("function", "procedure"):
+            mode = "replace"  # overloads share a name
+        parts, end = self._name_at(st, toks, i)
+        if not parts:
+            return None
+        if ns == "account":
+            return None
+        fq = self.qualify(parts, ns)
+        rest = [t.upper for t in toks[end:end + 3]]
+        if ns in CONTAINER_NS and (rest[:1] == ["CLONE"] or rest == ["AS", "REPLICA", "OF"] or rest[:2] == ["FROM", "SHARE"]):
+            mode = "copy"  # contents come from elsewhere and are not known here
+        st.creates.append((ns, fq, mode))
+        if ns == "relation":
+            st.refs.append((toks[i].start, toks[end - 1].end, fq))
+        if ns in CONTAINER_NS:
+            self._switch(fq.split("."), ns)  # CREATE DATABASE/SCHEMA also switch the session to it
+            return end
+        if ns in DEFERRED_NS:
+            return None
+        if rest[:1] in (["CLONE"], ["LIKE"]):
+            self._object(st, toks, end + 1, ns, "reads")
+        elif kind == "STREAM":
+            on = next((k for k in range(end, len(toks)) if toks[k].upper == "ON"), None)
+            if on is not None:
+                _, _, src_ns, k = self._kind_at(toks, on + 1)
+                self._object(st, toks, k, src_ns or "relation", "reads")
+            return None
+        elif kind == "SEMANTIC VIEW":
+            self._semantic_tables(st, toks, end)
+            return None
+        elif kind == "TABLE" and end < len(toks) and toks[end].text == "(" and not mods[-1:] == ["DYNAMIC"]:
+            close = _matching(toks, end)
+            if close + 1 >= len(toks) or toks[close + 1].upper != "AS":
+                self._column_defs(st, toks, end, close)
+        return end
+
+    def _semantic_tables(self, st, toks, i):
+        """TABLES ( [alias AS] db.schema.table [PRIMARY KEY (...)] , ... )"""
+        k = next((k for k in range(i, len(toks) - 1) if toks[k].upper == "TABLES" and toks[k + 1].text == "("), None)
+        if k is None:
+            return
+        close = _matching(toks, k + 1)
+        j = k + 2
+        while j < close:
+            parts, end = self._name_at(st, toks, j)
+            if parts and end < close and toks[end].upper == "AS":
+                j = end + 1
+            self._object(st, toks, j, "relation", "reads")
+            while j < close and not (toks[j].text == "," and _depth(toks, k + 1, j) == 1):
+                j += 1
+            j += 1
+
+    def _column_defs(self, st, toks, open_, close):
+        st.columns = []
+        for item in _split_items(toks, open_, close):
+            head = item[0].upper
+            if head in ("CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK"):
+                if any(t.upper == "FOREIGN" for t in item):
+                    self._foreign_key(st, item)
+                continue
+            col = {"name": _ident(item[0].text), "type": item[1].upper if len(item) > 1 else "",
+                   "length": None, "not_null": False}
+            if len(item) > 3 and item[2].text == "(" and item[3].text.isdigit():
+                col["length"] = int(item[3].text)
+            uppers = [t.upper for t in item]
+            col["not_null"] = "PRIMARY" in uppers or any(
+                a == "NOT" and b == "NULL" for a, b in zip(uppers, uppers[1:]))
+            st.columns.append(col)
+            if "REFERENCES" in uppers:
+                self._foreign_key(st, item, [col["name"]])
+
+    def _foreign_key(self, st, item, columns=None):
+        uppers = [t.upper for t in item]
+        ref = uppers.index("REFERENCES")
+        if columns is None:
+            key = uppers.index("KEY") if "KEY" in uppers else None
+            columns = _paren_names(item, key + 1) if key is not None else []
+        fq, end = self._object(st, item, ref + 1, "relation", None, ref=False)
+        if fq:
+            st.foreign_keys.append((columns, fq, _paren_names(item, end)))
+
+    def _drop(self, st, toks):
+        kind, mods, ns, i = self._kind_at(toks, 1)
+        st.verb = " ".join(["DROP"] + mods + [kind or "?"])
+        if ns is None or ns == "account":
+            return None
+        if_exists = [t.upper for t in toks[i:i + 2]] == ["IF", "EXISTS"]
+        i += 2 if if_exists else 0
+        parts, end = self._name_at(st, toks, i)
+        if parts and not _is_system(parts):
+            fq = self.qualify(parts, ns)
+            st.drops.append((ns, fq, if_exists))
+            if ns == "relation":
+                st.refs.append((toks[i].start, toks[end - 1].end, fq))
+        return None
+
+    def _undrop(self, st, toks):
+        kind, mods, ns, i = self._kind_at(toks, 1)
+        st.verb = f"UNDROP {kind}"
+        parts, _ = self._name_at(st, toks, i)
+        if parts and ns and ns != "account":
+            st.creates.append((ns, self.qualify(parts, ns), "replace"))
+        return None
+
+    def _alter(self, st, toks):
+        kind, mods, ns, i = self._kind_at(toks, 1)
+        st.verb = " ".join(["ALTER"] + mods + [kind or (toks[1].upper if len(toks) > 1 else "?")])
+        if ns is None or ns == "account":
+            return None
+        if_exists = [t.upper for t in toks[i:i + 2]] == ["IF", "EXISTS"]
+        i += 2 if if_exists else 0
+        fq, end = self._object(st, toks, i, ns, None if if_exists else "writes")
+        if fq is None:
+            return None
+        uppers = [t.upper for t in toks]
+        if uppers[end:end + 2] == ["RENAME", "TO"]:
+            parts, _ = self._name_at(st, toks, end + 2)
+            if parts:
+                st.renames.append((ns, fq, self.qualify(parts, ns)))
+                if ns == "relation" and st.writes:
+                    st.writes.pop()
+        elif uppers[end:end + 2] == ["SWAP", "WITH"]:
+            self._object(st, toks, end + 2, ns, "writes")
+        elif ns == "relation" and end < len(toks):
+            action = uppers[end]
+            k = end + 1 + (uppers[end + 1:end + 2] == ["COLUMN"])
+            if action == "ADD" and k < len(toks) and uppers[k] not in ("CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "ROW", "SEARCH"):
+                st.alter_columns.append(("add", _ident(toks[k].text), uppers[k + 1] if k + 1 < len(toks) else ""))
+            elif action == "DROP" and k < len(toks) and uppers[k] not in ("CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "ROW", "SEARCH"):
+                st.alter_columns.extend(("drop", _ident(t.text), None) for t in toks[k:] if _is_word(t))
+            elif action == "RENAME" and uppers[end + 1:end + 2] == ["COLUMN"] and end + 4 < len(toks):
+                st.alter_columns.append(("rename", _ident(toks[end + 2].text), _ident(toks[end + 4].text)))
+        return end
+
+    def _insert(self, st, toks):
+        uppers = [t.upper for t in toks]
+        intos = [k for k, u in enumerate(uppers) if u == "INTO" and _depth(toks, 0, k) == 0]
+        for k in intos:
+            self._object(st, toks, k + 1, "relation", "writes")
+        if len(intos) != 1 or "OVERWRITE" in uppers[:3] or st.dynamic:
+            return 1
+        fq = st.writes[-1][1] if st.writes else None
+        _, j = self._name_at(st, toks, intos[0] + 1)
+        columns = None
+        if j < len(toks) and toks[j].text == "(" and j + 1 < len(toks) and toks[j + 1].upper not in ("SELECT", "WITH"):
+            columns = _paren_names(toks, j)
+            j = _matching(toks, j) + 1
+        if fq and j < len(toks) and uppers[j] == "VALUES":
+            st.insert = {"target": fq, "columns": columns, "rows": _values_rows(st.code, toks, j + 1)}
+        return j
+
+    def _update(self, st, toks):
+        _, end = self._object(st, toks, 1, "relation", "writes")
+        return end
+
+    def _delete(self, st, toks):
+        k = 2 if len(toks) > 1 and toks[1].upper == "FROM" else 1
+        _, end = self._object(st, toks, k, "relation", "writes")
+        return end
+
+    def _merge(self, st, toks):
+        _, end = self._object(st, toks, 2, "relation", "writes")
+        return end
+
+    def _truncate(self, st, toks):
+        i = 2 if len(toks) > 1 and toks[1].upper == "TABLE" else 1
+        if_exists = [t.upper for t in toks[i:i + 2]] == ["IF", "EXISTS"]
+        self._object(st, toks, i + 2 if if_exists else i, "relation", None if if_exists else "writes")
+        return None
+
+    def _copy(self, st, toks):
+        if len(toks) > 2 and not toks[2].text.startswith("@"):
+            _, end = self._object(st, toks, 2, "relation", "writes")
+            return end
+        return 2
+
+    def _describe(self, st, toks):
+        kind, mods, ns, i = self._kind_at(toks, 1)
+        if ns and ns != "account":
+            self._object(st, toks, i, ns, "reads")
+        return None
+
+    _desc = _describe
+
+    def _comment(self, st, toks):
+        uppers = [t.upper for t in toks]
+        if "ON" not in uppers:
+            return None
+        kind, mods, ns, i = self._kind_at(toks, uppers.index("ON") + 1)
+        if ns and ns != "account":
+            self._object(st, toks, i, ns, None if "EXISTS" in uppers[:3] else "writes")
+        return None
+
+    def _grant(self, st, toks):
+        uppers = [t.upper for t in toks]
+        if "ON" not in uppers:
+            return None
+        on = uppers.index("ON")
+        if uppers[on + 1:on + 2] in (["ALL"], ["FUTURE"]):
+            return None
+        kind, mods, ns, i = self._kind_at(toks, on + 1)
+        if ns and ns != "account":
+            self._object(st, toks, i, ns, "reads")
+        return None
+
+    _revoke = _grant
+
+    def _call(self, st, toks):
+        parts, _ = self._name_at(st, toks, 1)
+        if parts and not parts[-1].startswith("SYSTEM$"):
+            st.reads.append(("procedure", self.qualify(parts, "procedure")))
+            st.barrier = True
+        return None
+
+    def _execute(self, st, toks):
+        if len(toks) > 1 and toks[1].upper == "TASK":
+            self._object(st, toks, 2, "task", "reads")
+        else:
+            st.barrier = True
+        return None
+
+    # query references
+
+    def _scan_query(self, st, toks, i):
+        ctes = set()
+        for k in range(i, len(toks) - 1):
+            if toks[k].upper == "AS" and toks[k + 1].text == "(":
+                j = k - 1
+                if j >= 0 and toks[j].text == ")":
+                    j = _opening(toks, j) - 1
+                if j >= 1 and _is_word(toks[j]) and toks[j - 1].upper in ("WITH", "RECURSIVE", ","):
+                    ctes.add(_ident(toks[j].text))
+        calls = []
+        for k in range(i, len(toks)):
+            tok = toks[k]
+            if tok.text == "(":
+                calls.append(toks[k - 1].upper if k else "")
+            elif tok.text == ")":
+                if calls:
+                    calls.pop()
+            elif tok.text.startswith("@") and len(tok.text) > 1 and tok.text[1] not in "~%":
+                parts = _split_name(tok.text[1:].split("/")[0])
+                if parts and not _is_system(parts):
+                    st.reads.append(("stage", self.qualify(parts, "stage")))
+            elif tok.upper in ("FROM", "JOIN"):
+                if calls and calls[-1] in FROM_FUNCTIONS:
+                    continue
+                if k >= 2 and toks[k - 1].upper == "DISTINCT" and toks[k - 2].upper in ("IS", "NOT"):
+                    continue
+                self._from_item(st, toks, k + 1, ctes, tok.upper == "FROM")
+            elif tok.upper == "USING" and k + 1 < len(toks) and toks[k + 1].text != "(":
+                self._from_item(st, toks, k + 1, ctes, False)
+            elif tok.upper == "REFERENCES" and st.verb.startswith("ALTER"):
+                self._object(st, toks, k + 1, "relation", "reads", ref=False)
+
+    def _from_item(self, st, toks, j, ctes, listed):
+        while j < len(toks):
+            tok = toks[j]
+            if not _is_word(tok) or tok.upper in ("LATERAL", "TABLE", "VALUES", "UNNEST", "SELECT"):
+                return
+            parts, end = self._name_at(st, toks, j)
+            if not parts or (end < len(toks) and toks[end].text == "("):
+                return
+            if not (len(parts) == 1 and parts[0] in ctes) and not _is_system(parts):
+                fq = self.qualify(parts, "relation")
+                st.reads.append(("relation", fq))
+                st.refs.append((tok.start, toks[end - 1].end, fq))
+            if not listed:
+                return
+            k = end
+            if k < len(toks) and toks[k].upper == "AS":
+                k += 2
+            elif k < len(toks) and _is_word(toks[k]) and toks[k].upper not in ALIAS_STOP:
+                k += 1
+            if k < len(toks) and toks[k].text == ",":
+                j = k + 1
+            else:
+                return
+
+
+def _split_name(text):
+    parts = re.findall(r'"(?:[^"]|"")*"|[^.]+', text.strip())
+    return [_ident(p.strip()) for p in parts if p.strip()]
+
+
+def _matching(toks, open_):
+    depth = 0
+    for k in range(open_, len(toks)):
+        if toks[k].text == "(":
+            depth += 1
+        elif toks[k].text == ")":
+            depth -= 1
+            if depth == 0:
+                return k
+    return len(toks) - 1
+
+
+def _opening(toks, close):
+    depth = 0
+    for k in range(close, -1, -1):
+        if toks[k].text == ")":
+            depth += 1
+        elif toks[k].text == "(":
+            depth -= 1
+            if depth == 0:
+                return k
+    return 0
+
+
+def _depth(toks, start, k):
+    depth = 0
+    for t in toks[start:k]:
+        depth += (t.text == "(") - (t.text == ")")
+    return depth
+
+
+def _split_items(toks, open_, close):
+    """Comma-separated token lists inside toks[open_] ... toks[close]."""
+    items, current, depth = [], [], 0
+    for t in toks[open_ + 1:close]:
+        if t.text == "," and depth == 0:
+            items.append(current)
+            current = []
+            continue
+        depth += (t.text == "(") - (t.text == ")")
+        current.append(t)
+    items.append(current)
+    return [item for item in items if item]
+
+
+def _paren_names(toks, open_):
+    if open_ >= len(toks) or toks[open_].text != "(":
+        return []
+    return [_ident(item[0].text) for item in _split_items(toks, open_, _matching(toks, open_)) if _is_word(item[0])]
+
+
+def _values_rows(code, toks, j):
+    """Rows of a VALUES list as lists of value source text."""
+    rows = []
+    while j < len(toks) and toks[j].text == "(":
+        close = _matching(toks, j)
+        rows.append([code[item[0].start:item[-1].end].strip() for item in _split_items(toks, j, close)])
+        j = close + 1
+        if j < len(toks) and toks[j].text == ",":
+            j += 1
+    return rows
+
+
+def _unescape(m):
+    tok = m.group()
+    return "'" if tok == "''" else STRING_ESCAPES.get(tok[1], tok[1])
+
+
+def _literal(text):
+    """(kind, value) of a VALUES entry: string, number, null, boolean or expression."""
+    if STRING_LITERAL_RE.fullmatch(text):
+        return "string", STRING_BODY_RE.sub(_unescape, text[1:-1])
+    upper = text.upper()
+    if upper == "NULL":
+        return "null", None
+    if upper in ("TRUE", "FALSE"):
+        return "boolean", upper
+    if NUMBER_RE.fullmatch(text):
+        return "number", text
+    return "expression", text
+
+
+# Loading deliveries
+
+def _python_sql(source):
+    """
+    session.sql(), save_as_table() and session.table() calls of a Python cell, in
+    source order: ("sql", text, line, dynamic) or ("create" | "read", name, line).
+    f-string parts become IDENTIFIER($PY_<n>) placeholders and mark the SQL dynamic.
+    """
+    lines = [("# " + l) if l.lstrip().startswith(("%", "!")) else l for l in source.splitlines()]
+    try:
+        tree = ast.parse("\n".join(lines))
+    except SyntaxError:
+        return []
+    found = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        attr = node.func.attr
+        arg = node.args[0] if node.args else next((kw.value for kw in node.keywords if kw.arg in ("query", "name", "table_name")), None)
+        if attr == "sql" and isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            found.append((node.lineno, node.col_offset, ("sql", arg.value, arg.lineno, False)))
+        elif attr == "sql" and isinstance(arg, ast.JoinedStr):
+            text = "".join(v.value if isinstance(v, ast.Constant) else f"IDENTIFIER($PY_{n})"
+                           for n, v in enumerate(arg.values))
+            found.append((node.lineno, node.col_offset, ("sql", text, arg.lineno, True)))
+        elif attr in ("save_as_table", "table") and isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            found.append((node.lineno, node.col_offset, ("create" if attr == "save_as_table" else "read", arg.value, node.lineno)))
+    return [item for _, _, item in sorted(found, key=lambda f: f[:2])]
+
+
+def load_chunks(path):
+    """
+    The SQL of a delivery as chunks in execution order: ("sql", text, prefix,
+    first line, dynamic) or ("create" | "read", name, location).
+    """
+    if path.endswith(".ipynb"):
+        chunks = []
+        with open(path, "rb") as fp:
+            info = {}
+            for n, cell in enumerate(iter_notebook_cells(fp, info), 1):
+                if cell["cell_type"] != "code":
+                    continue
+                source = "".join(cell["source"])
+                if cell["language"].lower() == "sql":
+                    dynamic = bool(JINJA_RE.search(source))
+                    source = JINJA_RE.sub(lambda m: f"IDENTIFIER($PY_{m.start()})", source)
+                    chunks.append(("sql", source, f"cell {n}, ", 1, dynamic))
+                    continue
+                for item in _python_sql(source):
+                    if item[0] == "sql":
+                        chunks.append(("sql", item[1], f"cell {n}, ", item[2], item[3]))
+                    else:
+                        chunks.append((item[0], item[1], f"cell {n}, line {item[2]}"))
+        return chunks
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".md"):
+        return [("sql", m.group(1), "", text.count("\n", 0, m.start(1)) + 1, False) for m in SQL_FENCE_RE.finditer(text)]
+    return [("sql", text, "", 1, False)]
+
+
+def parse_delivery(path):
+    """Statements of a delivery plus the syntax and constraint issues found while splitting."""
+    analyzer = Analyzer()
+    statements, issues = [], []
+    for chunk in load_chunks(path):
+        if chunk[0] == "create":
+            statements.append(analyzer.synthetic(chunk[2], "SAVE_AS_TABLE", creates=[("relation", chunk[1], "replace")]))
+            continue
+        if chunk[0] == "read":
+            statements.append(analyzer.synthetic(chunk[2], "SESSION.TABLE", reads=[("relation", chunk[1])]))
+            continue
+        _, text, prefix, first_line, dynamic = chunk
+        pieces, problems = split_statements(text, first_line)
+        issues += [_issue(f"{prefix}line {line}", ERROR, "syntax", msg) for line, msg in problems]
+        for code, masked, line in pieces:
+            st = analyzer.analyze(code, masked, f"{prefix}line {line}", dynamic)
+            statements.append(st)
+            for v in analyze_sql_code(masked):
+                issues.append(_issue(f"{prefix}line {line + v['line'] - 1}", ERROR, "constraint", v["message"], st.index))
+    return statements, issues
+
+
+def _issue(location, level, check, message, index=-1):
+    return {"location": location, "level": level, "check": check, "message": message, "index": index}
+
+
+# Name resolution and ordering
+
+def check_resolution(statements):
+    """Walk the script in order and report objects that do not exist when a statement needs them."""
+    issues = []
+    first_create = {}
+    for st in statements:
+        for ns, fq, _ in st.creates:
+            first_create.setdefault((ns, fq), st)
+    live, dropped, reported = {}, {}, set()
+    copies = {}   # containers created by CLONE / AS REPLICA OF / FROM SHARE -> creating statement
+
+    def label(ns, fq):
+        return f"{'table/view' if ns == 'relation' else ns} {fq}"
+
+    def require(st, ns, fq):
+        key = (ns, fq)
+        if key in live or ns in UNCHECKED_NS or any(fq.startswith(c + ".") for c in copies):
+            return
+        reason = "dropped" if key in dropped else "later" if key in first_create and first_create[key].index > st.index else "missing"
+        if (key, reason) in reported:
+            return
+        reported.add((key, reason))
+        if reason == "dropped":
+            issues.append(_issue(st.location, ERROR, "resolution",
+                                 f"{label(ns, fq)} is used after it was dropped ({dropped[key].location})", st.index))
+        elif reason == "later":
+            issues.append(_issue(st.location, ERROR, "resolution",
+                                 f"{label(ns, fq)} is used before it is created ({first_create[key].location})", st.index))
+        elif ns != "schema" or fq.split(".")[-1] != "PUBLIC":
+            issues.append(_issue(st.location, WARNING, "resolution",
+                                 f"{label(ns, fq)} is not created by this script and must already exist", st.index))
+
+    def drop_tree(st, ns, fq):
+        live.pop((ns, fq), None)
+        copies.pop(fq, None)
+        dropped[(ns, fq)] = st
+        if ns in CONTAINER_NS:
+            for key in [k for k in live if k[1].startswith(fq + ".")]:
+                live.pop(key)
+                dropped[key] = st
+
+    for st in statements:
+        for ns, fq in st.reads + st.writes:
+            require(st, ns, fq)
+        for ns, old, new in st.renames:
+            require(st, ns, old)
+            live[(ns, new)] = live.pop((ns, old), st)
+            dropped[(ns, old)] = st
+        for ns, fq, if_exists in st.drops:
+            if not if_exists:
+                require(st, ns, fq)
+            drop_tree(st, ns, fq)
+        for ns, fq, mode in st.creates:
+            key = (ns, fq)
+            if key in live and mode in ("create", "copy"):
+                issues.append(_issue(st.location, ERROR, "resolution",
+                                     f"{label(ns, fq)} already exists (created {live[key].location}); "
+                                     "use CREATE OR REPLACE or IF NOT EXISTS", st.index))
+            if ns not in CONTAINER_NS:
+                schema = fq.rsplit(".", 1)[0]
+                if ("schema", schema) in dropped and ("schema", schema) not in live:
+                    require(st, "schema", schema)
+            if key in live and mode == "if_not_exists":
+                continue
+            if mode in ("replace", "copy") and ns in CONTAINER_NS:
+                drop_tree(st, ns, fq)
+            live[key] = st
+            dropped.pop(key, None)
+            if mode == "copy":
+                copies[fq] = st
+    return issues
+
+
+# Independent groups
+
+def group_statements(statements):
+    """Statements partitioned into groups that share no objects or variables, each in script order."""
+    parent = list(range(len(statements)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    owner = {}
+    for n, st in enumerate(statements):
+        for key in st.keys():
+            if key in owner:
+                union(n, owner[key])
+            else:
+                owner[key] = n
+    for n, st in enumerate(statements):
+        containers = [(ns, fq) for ns, fq, *_ in st.drops + st.creates if ns in CONTAINER_NS]
+        for ns, fq in containers:
+            for key, other in owner.items():
+                if key[0] != "variable" and key[1].startswith(fq + "."):
+                    union(n, other)
+        if st.barrier:
+            for other in range(len(statements)):
+                union(n, other)
+    groups = {}
+    for n, st in enumerate(statements):
+        groups.setdefault(find(n), []).append(st)
+    return list(groups.values())
+
+
+# Engines
+
+class CatalogSession:
+    """Pure-Python catalog of tables and their columns."""
+
+    def __init__(self):
+        self.tables = {}   # fq -> column definitions, or None when unknown (CTAS, views, external)
+        self.skipped = 0
+
+    def execute(self, st):
+        issues = []
+        for ns, fq, _ in st.drops:
+            self.tables.pop(fq, None)
+        for ns, old, new in st.renames:
+            if old in self.tables:
+                self.tables[new] = self.tables.pop(old)
+        for ns, fq, mode in st.creates:
+            if ns == "relation" and not (mode != "replace" and fq in self.tables):
+                self.tables[fq] = [dict(c) for c in st.columns] if st.columns is not None else None
+                names = [c["name"] for c in st.columns or []]
+                dupes = sorted({n for n in names if names.count(n) > 1})
+                if dupes:
+                    issues.append((ERROR, f"duplicate column(s) {', '.join(dupes)} in {fq}"))
+        for action, name, extra in st.alter_columns:
+            cols = self.tables.get(st.writes[0][1]) if st.writes else None
+            if cols is None:
+                continue
+            if action == "add":
+                cols.append({"name": name, "type": extra, "length": None, "not_null": False})
+            elif not any(c["name"] == name for c in cols):
+                issues.append((ERROR, f"column {name} does not exist in {st.writes[0][1]}"))
+            elif action == "drop":
+                cols[:] = [c for c in cols if c["name"] != name]
+            else:
+                next(c for c in cols if c["name"] == name)["name"] = extra
+        for columns, fq, ref_columns in st.foreign_keys:
+            cols = self.tables.get(fq)
+            if cols is not None:
+                known = {c["name"] for c in cols}
+                issues += [(ERROR, f"foreign key references unknown column {fq}.{c}") for c in ref_columns if c not in known]
+        if st.insert and not st.dynamic:
+            issues += self._check_insert(st.insert)
+        return issues
+
+    def _check_insert(self, insert):
+        cols = self.tables.get(insert["target"])
+        if cols is None:
+            return []
+        by_name = {c["name"]: c for c in cols}
+        names = insert["columns"] or [c["name"] for c in cols]
+        unknown = [n for n in names if n not in by_name]
+        if unknown:
+            return [(ERROR, f"column(s) {', '.join(unknown)} do not exist in {insert['target']}")]
+        issues = []
+        for r, row in enumerate(insert["rows"], 1):
+            if len(row) != len(names):
+                issues.append((ERROR, f"VALUES row {r} has {len(row)} value(s) for {len(names)} column(s)"))
+                continue
+            for name, text in zip(names, row):
+                problem = _literal_problem(by_name[name], text)
+                if problem:
+                    issues.append((ERROR, f"VALUES row {r}, {name}: {problem}"))
+            if len(issues) >= 5:
+                break
+        return issues
+
+    def close(self):
+        pass
+
+
+def _literal_problem(col, text):
+    kind, value = _literal(text)
+    ctype = col["type"]
+    if kind == "null":
+        return "NULL in a NOT NULL column" if col["not_null"] else None
+    if kind != "string":
+        return None
+    if ctype in NUMERIC_TYPES and not NUMBER_RE.fullmatch(value.strip()):
+        return f"numeric value '{value}' is not recognized"
+    if ctype in STRING_TYPES and col["length"] is not None and len(value) > col["length"]:
+        return f"string of {len(value)} characters is too long for {ctype}({col['length']})"
+    if ctype == "BOOLEAN" and value.strip().upper() not in BOOLEAN_LITERALS:
+        return f"boolean value '{value}' is not recognized"
+    if ctype == "DATE" or ctype.startswith("TIMESTAMP") or ctype == "DATETIME":
+        m = ISO_DATE_RE.match(value.strip())
+        if m:
+            try:
+                datetime.date.fromisoformat(m.group(1))
+            except ValueError:
+                return f"date '{value}' is not recognized"
+    return None
+
+
+class CatalogEngine:
+    name = "catalog"
+
+    def session(self):
+        return CatalogSession()
+
+
+SQLITE_CLEANUP = [
+    (re.compile(r"\bAUTOINCREMENT\b|\bIDENTITY\s*(\(\s*\d+\s*,\s*\d+\s*\))?", re.I), ""),
+    (re.compile(r"\bCOMMENT\s*=?\s*'(?:[^']|'')*'", re.I), ""),
+    (re.compile(r"\bCOLLATE\s+'[^']*'", re.I), ""),
+]
+SQLITE_VERBS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class SqliteSession(CatalogSession):
+    """Catalog checks plus execution of the portable statements in an in-memory SQLite database."""
+
+    def __init__(self):
+        super().__init__()
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+
+    def execute(self, st):
+        issues = super().execute(st)
+        statements = None if st.dynamic else self._translate(st)
+        if not statements:
+            self.skipped += 1
+            return issues
+        for sql in statements:
+            try:
+                self.conn.execute(sql)
+            except sqlite3.Error as e:
+                msg = str(e)
+                if msg.startswith(("no such column", "ambiguous column")):
+                    issues.append((WARNING, f"{msg} (sqlite dry run)"))
+                elif msg.startswith("NOT NULL constraint failed") and not issues:
+                    issues.append((ERROR, msg))
+                else:
+                    self.skipped += 1  # dialect differences, or objects this engine never saw
+                return issues
+        return issues
+
+    def _rewrite(self, st, start, end):
+        out, pos = [], start
+        for a, b, fq in sorted(r for r in st.refs if start <= r[0] and r[1] <= end):
+            out.append(st.code[pos:a])
+            out.append('"' + fq.replace('"', '""') + '"')
+            pos = b
+        out.append(st.code[pos:end])
+        return "".join(out)
+
+    def _translate(self, st):
+        verb = st.verb
+        if verb in SQLITE_VERBS and "OVERWRITE" not in st.masked.upper()[:30]:
+            return [self._rewrite(st, 0, len(st.code))]
+        target = (st.creates or st.drops or [(None, None, None)])[0]
+        if target[0] != "relation":
+            return None
+        quoted = '"' + target[1].replace('"', '""') + '"'
+        kind = "VIEW" if verb.endswith("VIEW") else "TABLE"
+        if verb in ("DROP TABLE", "DROP VIEW"):
+            return [f"DROP {kind} IF EXISTS {quoted}"]
+        if verb not in ("CREATE TABLE", "CREATE TEMPORARY TABLE", "CREATE TEMP TABLE",
+                        "CREATE TRANSIENT TABLE", "CREATE VIEW", "CREATE SECURE VIEW"):
+            return None
+        ref = next(r for r in st.refs if r[2] == target[1])
+        rest = st.masked[ref[1]:]
+        head = [f"DROP {kind} IF EXISTS {quoted}"] if target[2] == "replace" else []
+        exists = "IF NOT EXISTS " if target[2] == "if_not_exists" else ""
+        m = re.search(r"\bAS\b", rest, re.I)
+        if st.columns is not None:
+            close = _close_paren(rest)
+            defs = st.code[ref[1]:ref[1] + close + 1]
+            for pattern, repl in SQLITE_CLEANUP:
+                defs = pattern.sub(repl, defs)
+            return head + [f"CREATE TABLE {exists}{quoted} {defs.strip()}"]
+        if m and not rest[:m.start()].strip().startswith("("):
+            query = self._rewrite(st, ref[1] + m.end(), len(st.code))
+            return head + [f"CREATE {kind} {exists}{quoted} AS {query}"]
+        return None
+
+    def close(self):
+        self.conn.close()
+
+
+def _close_paren(text):
+    depth = 0
+    for k, c in enumerate(text):
+        depth += (c == "(") - (c == ")")
+        if c == ")" and depth == 0:
+            return k
+    return len(text) - 1
+
+
+class SqliteEngine:
+    name = "sqlite"
+
+    def session(self):
+        return SqliteSession()
+
+
+ENGINES = {"catalog": CatalogEngine, "sqlite": SqliteEngine}
+
+
+def _run_group(engine, group):
+    session = engine.session()
+    issues = []
+    try:
+        for st in group:
+            issues += [_issue(st.location, level, "engine", msg, st.index) for level, msg in session.execute(st)]
+    finally:
+        session.close()
+    return issues, session.skipped
+
+
+def dry_run(path, engine="catalog", workers=4):
+    """Check one delivery; returns a report dict with the issues in script order."""
+    started = time.perf_counter()
+    statements, issues = parse_delivery(path)
+    issues += check_resolution(statements)
+    groups = group_statements(statements)
+    engine = ENGINES[engine]()
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for group_issues, group_skipped in pool.map(lambda g: _run_group(engine, g), groups):
+            issues += group_issues
+            skipped += group_skipped
+    issues.sort(key=lambda i: (i["index"], i["level"] != ERROR))
+    return {
+        "path": path,
+        "engine": engine.name,
+        "statements": len(statements),
+        "groups": len(groups),
+        "largest_group": max((len(g) for g in groups), default=0),
+        "engine_skipped": skipped,
+        "errors": sum(1 for i in issues if i["level"] == ERROR),
+        "warnings": sum(1 for i in issues if i["level"] == WARNING),
+        "issues": issues,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def _dry_run_args(args):
+    return dry_run(*args)
+
+
+def find_deliveries(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                found += [os.path.join(root, f) for f in sorted(files) if f.endswith(SQL_EXTS)]
+        else:
+            found.append(path)
+    return found
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Dry-run SQL deliveries offline before the live validation run.")
+    parser.add_argument("paths", nargs="+", help=".sql, .ipynb or .md files, or folders of them")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="catalog")
+    parser.add_argument("--workers", type=int, default=4, help="statement groups dry-run at the same time per file")
+    parser.add_argument("--warnings", action="store_true", help="also list warnings (objects the script expects to exist)")
+    parser.add_argument("--json", help="also write the reports to this file")
+    args = parser.parse_args()
+
+    paths = find_deliveries(args.paths)
+    if not paths:
+        parser.error("no .sql, .ipynb or .md files found")
+    jobs = [(p, args.engine, args.workers) for p in paths]
+    if len(jobs) > 1:
+        with ProcessPoolExecutor() as pool:
+            reports = list(pool.map(_dry_run_args, jobs))
+    else:
+        reports = [_dry_run_args(jobs[0])]
+
+    for r in reports:
+        status = "✅ passed" if not r["errors"] else f"{ERROR} {r['errors']} error(s)"
+        print(f"{r['path']}: {status}, {r['warnings']} warning(s); {r['statements']} statements in "
+              f"{r['groups']} independent group(s), {r['elapsed_s']}s")
+        for i in r["issues"]:
+            if i["level"] == ERROR or args.warnings:
+                print(f"  {i['level']} {i['location']} [{i['check']}] {i['message']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+    sys.exit(1 if any(r["errors"] for r in reports) else 0)
+
+
+if __name__ == "__main__":
+    main()
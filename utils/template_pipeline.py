@@ -0,0 +1,477 @@
+#!/usr/bin/env python
+"""
+Template Generation Pipeline
+Runs the new-template workflow (prompts/tasks/step1 ... step8) as a DAG of
+steps with explicit artifacts instead of one monolithic prompt. Every step's
+output files are cached under a key that hashes its prompt file, the user
+input (for the steps that read it) and the artifacts it consumes, so after a
+failure or an edit only the invalidated steps run again. A step whose output
+comes back unchanged does not invalidate the steps after it.
+
+Steps run as soon as their inputs are ready, so the Streamlit branch
+(assessment and generation, steps 4-5) works from the generated code while
+code validation and its sanity check (steps 3 and 3.5) run.
+
+Backends are pluggable: "claude" drives `sf ai claude` like `make <template-id>`
+does, one step at a time in its own work folder; "fake" produces deterministic
+artifacts locally for tests and dry runs.
+
+Usage:
+  python -m utils.template_pipeline <template-id> [--backend claude|fake] [--workers 4]
+                                    [--force step3,step7] [--out generated-templates/<id>]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUTS_DIR = "new-template-form-inputs"
+OUTPUT_DIR = "generated-templates"
+CACHE_DIR = ".pipeline-cache"
+TASKS_DIR = os.path.join("prompts", "tasks")
+
+
+class StepError(Exception):
+    """Raised by a backend when a step cannot produce its artifacts"""
+    pass
+
+
+@dataclass(frozen=True)
+class Step:
+    id: str
+    title: str
+    prompt: str               # task prompt under prompts/tasks/
+    deps: tuple = ()
+    outputs: tuple = ()       # artifact names; "code.*" is whichever extension the step wrote
+    edits: tuple = ()         # input artifacts the step checks and fixes in place; unchanged is a valid result
+    uses_input: bool = False  # reads the user inputs from new-template-form-inputs/
+    context: tuple = ()       # further prompt files the step reads (hashed into its key)
+    skip_if: object = None    # callable(artifacts) -> reason to skip, or None
+
+
+def _skip_streamlit(artifacts):
+    decision = artifacts.get("streamlit_decision.txt", "").strip().lower()
+    return None if decision.startswith("include") else "Step 4 decided against Streamlit"
+
+
+def _skip_sql_template(artifacts):
+    return "SQL templates need no notebook validation" if "template.sql" in artifacts else None
+
+
+PIPELINE = (
+    Step("step1", "Template planning", "step1-template-planning.md",
+         outputs=("plan.md",), uses_input=True,
+         context=("prompts/new-template-generation-workflow.md", "prompts/template-requirements.md")),
+    Step("step1.5", "Fail-fast constraint detection", "step1.5-fail-fast-constraint-detection.md",
+         deps=("step1",), outputs=("constraints.md",), uses_input=True),
+    Step("step2", "Core code generation", "step2-core-code-generation.md",
+         deps=("step1", "step1.5"), outputs=("code.*",), context=("prompts/notebook-limitations.md",)),
+    Step("step3", "Code validation", "step3-code-validation.md",
+         deps=("step2",), outputs=("validate_code.*",), edits=("code.*",)),
+    Step("step3.5", "Sanity check", "step3.5-sanity-check.md",
+         deps=("step3",), outputs=("sanity_check.md",)),
+    Step("step4", "Streamlit assessment", "step4-streamlit-assessment.md",
+         deps=("step1", "step2"), outputs=("streamlit_decision.txt",)),
+    Step("step5", "Streamlit generation", "step5-streamlit-generation.md",
+         deps=("step4",), outputs=("streamlit_code.py",), skip_if=_skip_streamlit),
+    Step("step6", "Streamlit validation", "step6-streamlit-validation.md",
+         deps=("step5", "step3"), outputs=("streamlit_validation.md",), edits=("streamlit_code.py",),
+         skip_if=_skip_streamlit),
+    Step("step7", "Template assembly", "step7-template-assembly.md",
+         deps=("step3.5", "step6"), outputs=("template.*",)),
+    Step("step8", "Assembled template validation", "step8-validate-assembled-template.md",
+         deps=("step7",), outputs=("template_validation.md",), edits=("template.*",), skip_if=_skip_sql_template),
+)
+
+
+def topological_order(steps):
+    """Steps sorted so that every step follows its dependencies (stable for ties)."""
+    by_id = {s.id: s for s in steps}
+    order, state = [], {}
+
+    def visit(step):
+        if state.get(step.id) == "done":
+            return
+        if state.get(step.id) == "visiting":
+            raise ValueError(f"dependency cycle at {step.id}")
+        state[step.id] = "visiting"
+        for dep in step.deps:
+            if dep not in by_id:
+                raise ValueError(f"{step.id} depends on unknown step {dep}")
+            visit(by_id[dep])
+        state[step.id] = "done"
+        order.append(step)
+
+    for step in steps:
+        visit(step)
+    return order
+
+
+def ancestors(steps):
+    """step id -> set of every step id it depends on, directly or not."""
+    result = {}
+    for step in topological_order(steps):
+        seen = set(step.deps)
+        for dep in step.deps:
+            seen |= result[dep]
+        result[step.id] = seen
+    return result
+
+
+def _output_re(patterns):
+    return re.compile("|".join(re.escape(p).replace(r"\*", r"[A-Za-z0-9]+") for p in patterns) + r"\Z")
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        return st.st_mtime_ns, st.st_size, hashlib.sha256(f.read()).hexdigest()
+
+
+def snapshot(workdir):
+    """Fingerprint of every file in a work folder, taken before the step runs."""
+    return {
+        f: _fingerprint(os.path.join(workdir, f))
+        for f in os.listdir(workdir) if os.path.isfile(os.path.join(workdir, f))
+    }
+
+
+def collect_outputs(step, workdir, before=None):
+    """
+    Read the files a step declares from its work folder; every pattern must match
+    at least once. With a snapshot() taken before the step ran, only outputs the
+    step created or rewrote count: the ancestor artifacts copied in as inputs
+    would otherwise pass for outputs the step never wrote. Files a step edits in
+    place count as they are, so a validation that finds nothing to fix passes
+    them through unchanged.
+    """
+    before = before or {}
+    files = {}
+    for pattern in step.outputs + step.edits:
+        matcher = _output_re([pattern])
+        found = [
+            f for f in sorted(os.listdir(workdir))
+            if matcher.match(f) and os.path.isfile(os.path.join(workdir, f))
+            and (pattern in step.edits or before.get(f) != _fingerprint(os.path.join(workdir, f)))
+        ]
+        if not found:
+            stale = " (only the unchanged input copy is there)" if any(matcher.match(f) for f in before) else ""
+            raise StepError(f"{step.id} did not write {pattern}{stale}")
+        for name in found:
+            with open(os.path.join(workdir, name), "r", encoding="utf-8") as f:
+                files[name] = f.read()
+    return files
+
+
+# Backends
+
+class ClaudeCliBackend:
+    """Runs each step as one `sf ai claude` call (the Makefile's invocation) inside the step's work folder."""
+
+    name = "claude"
+
+    def __init__(self, command=None, timeout=3600, max_output_tokens=16384):
+        self.command = command or ["sf", "ai", "claude", "--", "--dangerously-skip-permissions", "-p"]
+        self.timeout = timeout
+        self.max_output_tokens = max_output_tokens
+
+    def run_step(self, step, job):
+        workdir = job["workdir"]
+        have = ", ".join(sorted(job["inputs"])) or "none yet"
+        prompt = (
+            f"Follow the instructions in {TASKS_DIR}/{step.prompt} for template id {job['template_id']}. "
+            f"The user inputs are in {job['user_input_path']}. "
+            f"Use the folder {workdir} wherever the instructions say generated-templates/{job['template_id']}/; "
+            f"it already holds the artifacts of the earlier steps ({have}). "
+            f"Write these output files into that folder: {', '.join(step.outputs)}."
+        )
+        if step.edits:
+            prompt += (
+                f" Fix {', '.join(step.edits)} in place if needed and leave them as they are otherwise; "
+                "write what you checked and changed into the report."
+            )
+        if step.id == "step4":
+            prompt += " Write the decision as the single word include or skip."
+        env = dict(os.environ, CLAUDE_CODE_MAX_OUTPUT_TOKENS=str(self.max_output_tokens))
+        before = snapshot(workdir)
+        try:
+            proc = subprocess.run(
+                self.command + [prompt], cwd=REPO_ROOT, env=env,
+                capture_output=True, text=True, timeout=self.timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise StepError(f"{step.id}: {e}")
+        with open(os.path.join(workdir, f"{step.id}.log"), "w", encoding="utf-8") as f:
+            f.write(proc.stdout + proc.stderr)
+        if proc.returncode != 0:
+            raise StepError(f"{step.id}: exited with {proc.returncode}: {(proc.stderr or proc.stdout)[-500:]}")
+        return collect_outputs(step, workdir, before)
+
+
+class FakeBackend:
+    """Deterministic local stand-in: artifacts are derived from the inputs, with optional delay and failures."""
+
+    name = "fake"
+
+    def __init__(self, delay=0.0, fail=(), streamlit=True, template_format="ipynb"):
+        self.delay = delay
+        self.fail = set(fail)
+        self.streamlit = streamlit
+        self.template_format = template_format
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run_step(self, step, job):
+        with self._lock:
+            self.calls.append(step.id)
+        if self.delay:
+            time.sleep(self.delay)
+        if step.id in self.fail:
+            raise StepError(f"{step.id}: failed (fake backend)")
+        inputs = job["inputs"]
+        digest = hashlib.sha256(json.dumps([job["user_input"], inputs], sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        ext = "py" if self.template_format == "ipynb" else "sql"
+        comment = "#" if ext == "py" else "--"
+        tid = job["template_id"]
+        if step.id == "step1":
+            return {"plan.md": f"# Plan for {tid}\n\n{job['user_input'].strip()[:200]}\n"}
+        if step.id == "step1.5":
+            return {"constraints.md": f"No constraint violations ({digest})\n"}
+        if step.id == "step2":
+            return {f"code.{ext}": f"{comment} {tid} core code ({digest})\n"}
+        if step.id == "step3":
+            code = inputs[f"code.{ext}"] + f"{comment} validated\n"
+            return {f"code.{ext}": code, f"validate_code.{ext}": code}
+        if step.id == "step3.5":
+            return {"sanity_check.md": "Passed\n"}
+        if step.id == "step4":
+            return {"streamlit_decision.txt": "include\n" if self.streamlit else "skip\n"}
+        if step.id == "step5":
+            return {"streamlit_code.py": f"import streamlit as st  # {digest}\n"}
+        if step.id == "step6":
+            return {"streamlit_code.py": inputs["streamlit_code.py"] + "# validated\n",
+                    "streamlit_validation.md": "Streamlit snippets render\n"}
+        if step.id == "step7":
+            body = inputs[f"code.{ext}"] + inputs.get("streamlit_code.py", "")
+            if self.template_format == "ipynb":
+                nb = {"cells": [{"cell_type": "code", "metadata": {}, "source": body, "outputs": [], "execution_count": None}],
+                      "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+                return {"template.ipynb": json.dumps(nb, indent=1)}
+            return {"template.sql": body}
+        if step.id == "step8":
+            json.loads(inputs["template.ipynb"])
+            return {"template.ipynb": inputs["template.ipynb"], "template_validation.md": "Valid notebook, unchanged\n"}
+        raise StepError(f"{step.id}: unknown step")
+
+
+BACKENDS = {"claude": ClaudeCliBackend, "fake": FakeBackend}
+
+
+# Runner
+
+class PipelineRunner:
+    """Schedules steps concurrently in dependency order, serving unchanged steps from the artifact cache."""
+
+    def __init__(self, backend, steps=PIPELINE, cache_dir=CACHE_DIR, workers=4, repo_root=REPO_ROOT, out=sys.stdout):
+        self.backend = backend
+        self.steps = topological_order(steps)
+        self.ancestors = ancestors(self.steps)
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self.repo_root = repo_root
+        self.out = out
+
+    # Cache
+
+    def step_key(self, step, template_id, user_input, inputs):
+        h = hashlib.sha256()
+        for part in (step.id, self.backend.name, template_id):
+            h.update(part.encode("utf-8") + b"\0")
+        for rel in (os.path.join(TASKS_DIR, step.prompt),) + step.context:
+            with open(os.path.join(self.repo_root, rel), "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        if step.uses_input:
+            h.update(hashlib.sha256(user_input.encode("utf-8")).digest())
+        for name in sorted(inputs):
+            h.update(name.encode("utf-8") + b"\0" + hashlib.sha256(inputs[name].encode("utf-8")).digest())
+        return h.hexdigest()
+
+    def _cache_path(self, template_id, step, key):
+        return os.path.join(self.cache_dir, template_id, step.id, f"{key}.json")
+
+    def _cache_get(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["files"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _cache_put(self, path, files):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"files": files, "created": time.time()}, f)
+        os.replace(tmp, path)
+
+    # Execution
+
+    def _inputs_for(self, step, artifacts):
+        """Artifacts of every ancestor merged in pipeline order, so later versions of a file win."""
+        merged = {}
+        for s in self.steps:
+            if s.id in self.ancestors[step.id]:
+                merged.update(artifacts.get(s.id, {}))
+        return merged
+
+    def _execute(self, step, job, work_root):
+        workdir = tempfile.mkdtemp(prefix=f"{step.id}-", dir=work_root)
+        for name, text in job["inputs"].items():
+            with open(os.path.join(workdir, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        job = dict(job, workdir=workdir)
+        started = time.perf_counter()
+        files = self.backend.run_step(step, job)
+        shutil.rmtree(workdir, ignore_errors=True)  # kept for inspection when the step fails
+        return files, time.perf_counter() - started
+
+    def _log(self, step, result):
+        mark = {"ran": "✅", "cached": "♻️", "skipped": "⏭️", "failed": "❌", "blocked": "⛔"}[result["status"]]
+        detail = {
+            "ran": f"ran in {result.get('seconds', 0):.2f}s",
+            "cached": "cached",
+            "skipped": f"skipped: {result.get('reason', '')}",
+            "failed": f"failed: {result.get('error', '')}",
+            "blocked": "not run (an earlier step failed)",
+        }[result["status"]]
+        self.out.write(f"{mark} {step.id} {step.title}: {detail}\n")
+        self.out.flush()
+
+    def run(self, template_id, user_input_path, out_dir, force=()):
+        """Run the pipeline; returns {step id: {"status", ...}} and publishes artifacts to out_dir."""
+        with open(user_input_path, "r", encoding="utf-8") as f:
+            user_input = f.read()
+        force = set(force)
+        by_id = {s.id: s for s in self.steps}
+        artifacts, results = {}, {}
+        work_root = os.path.join(out_dir, ".steps")
+        os.makedirs(work_root, exist_ok=True)
+        running = {}
+        failed = False
+
+        def ready():
+            return [
+                s for s in self.steps
+                if s.id not in results and s.id not in {step_id for step_id, _ in running.values()}
+                and all(results.get(d, {}).get("status") in ("ran", "cached", "skipped") for d in s.deps)
+            ]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                progressed = True
+                while progressed and not failed:
+                    progressed = False
+                    for step in ready():
+                        inputs = self._inputs_for(step, artifacts)
+                        reason = step.skip_if(inputs) if step.skip_if else None
+                        if reason:
+                            artifacts[step.id] = {}
+                            results[step.id] = {"status": "skipped", "reason": reason}
+                            self._log(step, results[step.id])
+                            progressed = True
+                            continue
+                        key = self.step_key(step, template_id, user_input, inputs)
+                        path = self._cache_path(template_id, step, key)
+                        cached = None if step.id in force else self._cache_get(path)
+                        if cached is not None:
+                            artifacts[step.id] = cached
+                            results[step.id] = {"status": "cached", "key": key}
+                            self._log(step, results[step.id])
+                            progressed = True
+                            continue
+                        job = {
+                            "template_id": template_id,
+                            "user_input": user_input,
+                            "user_input_path": user_input_path,
+                            "inputs": inputs,
+                        }
+                        running[pool.submit(self._execute, step, job, work_root)] = (step.id, path)
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_id, path = running.pop(future)
+                    step = by_id[step_id]
+                    try:
+                        files, seconds = future.result()
+                    except Exception as e:
+                        failed = True
+                        results[step.id] = {"status": "failed", "error": str(e)}
+                    else:
+                        self._cache_put(path, files)
+                        artifacts[step.id] = files
+                        results[step.id] = {"status": "ran", "seconds": seconds}
+                    self._log(step, results[step.id])
+
+        for step in self.steps:
+            if step.id not in results:
+                results[step.id] = {"status": "blocked"}
+                self._log(step, results[step.id])
+        self.publish(out_dir, artifacts)
+        if not failed:
+            shutil.rmtree(work_root, ignore_errors=True)
+        return results
+
+    def publish(self, out_dir, artifacts):
+        """Write every artifact to out_dir; a later step's version of a file replaces an earlier one."""
+        os.makedirs(out_dir, exist_ok=True)
+        for step in self.steps:
+            for name, text in artifacts.get(step.id, {}).items():
+                with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+                    f.write(text)
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Generate a template with the cached step pipeline.")
+    parser.add_argument("template_id", help=f"name of the input in {INPUTS_DIR}/ (without .md)")
+    parser.add_argument("--input", help=f"user inputs file (default {INPUTS_DIR}/<template-id>.md)")
+    parser.add_argument("--out", help=f"output folder (default {OUTPUT_DIR}/<template-id>)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="claude")
+    parser.add_argument("--workers", type=int, default=4, help="steps that may run at the same time")
+    parser.add_argument("--force", default="", help="comma-separated step ids to rerun even when cached")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    user_input_path = args.input or os.path.join(INPUTS_DIR, f"{args.template_id}.md")
+    if not os.path.isfile(user_input_path):
+        parser.error(f"user inputs not found: {user_input_path}")
+    out_dir = args.out or os.path.join(OUTPUT_DIR, args.template_id)
+    force = [s.strip() for s in args.force.split(",") if s.strip()]
+    unknown = [s for s in force if s not in {step.id for step in PIPELINE}]
+    if unknown:
+        parser.error("unknown step(s): " + ", ".join(unknown))
+
+    runner = PipelineRunner(BACKENDS[args.backend](), cache_dir=args.cache_dir, workers=args.workers)
+    started = time.perf_counter()
+    results = runner.run(args.template_id, user_input_path, out_dir, force)
+    counts = {}
+    for r in results.values():
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print(f"{args.template_id}: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+          + f" in {time.perf_counter() - started:.2f}s; artifacts in {out_dir}")
+    sys.exit(1 if any(r["status"] == "failed" for r in results.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
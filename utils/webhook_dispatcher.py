@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+"""
+Staging Webhook Dispatcher
+Computes the changed quickstart set with a single git diff and sends the
+Workato webhook payloads concurrently over one pooled HTTP session, instead of
+one matrix job and one curl call per quickstart. Quickstarts can be batched
+into the existing quickstart_names array, failed calls are retried with
+jittered exponential backoff, and each payload carries an Idempotency-Key so a
+retried or re-run call is not processed twice.
+
+Usage:
+  python -m utils.webhook_dispatcher --base <sha> --head <sha> [--url URL] [--environment staging]
+                                     [--batch-size 1] [--concurrency 4] [--dry-run]
+  python -m utils.webhook_dispatcher --mock [--quickstarts a,b,c] ...   # dispatch against a local mock
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GUIDES_SRC = "site/sfguides/src/"
+
+# Markdown in the root of a quickstart folder, or an image in the root of its assets/
+RELEVANT_FILE_RE = re.compile(
+    r"^site/sfguides/src/(?P<name>[^/_][^/]*)/(?:[^/]+\.md|assets/[^/]+\.(?:jpg|jpeg|png|gif|svg|webp|bmp|ico))$"
+)
+LANGUAGE_RE = re.compile(r"^\s*language\s*:\s*(.*?)\s*$", re.I | re.M)
+
+
+def git_changed_files(base, head, repo_root="."):
+    """Added/modified/renamed paths between two commits, in one git call."""
+    out = subprocess.run(
+        ["git", "diff", "--name-only", "--diff-filter=d", base, head, "--", GUIDES_SRC],
+        cwd=repo_root, check=True, capture_output=True, text=True,
+    ).stdout
+    return [line for line in out.splitlines() if line]
+
+
+def _detect_language(repo_root, name):
+    folder = os.path.join(repo_root, GUIDES_SRC, name)
+    try:
+        md_files = sorted(f for f in os.listdir(folder) if f.endswith(".md"))
+    except OSError:
+        return ""
+    ordered = [f"{name}.md"] if f"{name}.md" in md_files else []
+    ordered += [f for f in md_files if f not in ordered]
+    for f in ordered:
+        with open(os.path.join(folder, f), "r", encoding="utf-8", errors="replace") as fh:
+            head = "".join(line for _, line in zip(range(50), fh))
+        m = LANGUAGE_RE.search(head)
+        if m:
+            return m.group(1).strip("'\"")
+    return ""
+
+
+def changed_quickstarts(files, repo_root="."):
+    """Quickstart names (with language) for the relevant files, in sorted order."""
+    names = sorted({m.group("name") for m in map(RELEVANT_FILE_RE.match, files) if m and "/_" not in m.group(0)})
+    return [{"name": n, "language": _detect_language(repo_root, n)} for n in names]
+
+
+def idempotency_key(environment, commit_sha, quickstarts):
+    names = ",".join(f'{q["name"]}:{q["language"]}' for q in quickstarts)
+    return hashlib.sha256(f"{environment}|{commit_sha}|{names}".encode("utf-8")).hexdigest()
+
+
+def build_payloads(quickstarts, environment, repo="", commit_sha="", ref="", pr_number="", batch_size=1):
+    """Payloads in the shape the workflows send today, batch_size quickstarts each."""
+    if str(pr_number).isdigit():
+        pr_number = int(pr_number)
+    batch_size = max(1, batch_size)
+    payloads = []
+    for i in range(0, len(quickstarts), batch_size):
+        batch = quickstarts[i:i + batch_size]
+        payloads.append({
+            "repo": repo,
+            "commit_sha": commit_sha,
+            "ref": ref,
+            "environment": environment,
+            "pr_number": pr_number,
+            "quickstart_name": batch[0]["name"],
+            "quickstart_names": batch,
+        })
+    return payloads
+
+
+def _is_retryable(response):
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
+    return "rate limit" in response.text.lower()
+
+
+def _backoff_delay(attempt, base_delay, max_delay, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than a server Retry-After."""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def new_session(concurrency):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def send_payload(session, url, payload, key, max_retries=3, base_delay=2.0, max_delay=60.0, timeout=10):
+    """POST one payload with retries; returns a result dict (never raises)."""
+    started = time.perf_counter()
+    result = {"quickstarts": [q["name"] for q in payload["quickstart_names"]], "idempotency_key": key}
+    headers = {"Content-Type": "application/json", "Idempotency-Key": key}
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        try:
+            r = session.post(url, data=json.dumps(payload), headers=headers, timeout=timeout)
+            result.update({"status": r.status_code, "response": r.text[:500]})
+            if 200 <= r.status_code < 300:
+                result["ok"] = True
+                break
+            if not _is_retryable(r):
+                result["ok"] = False
+                break
+            retry_after = r.headers.get("Retry-After")
+        except requests.RequestException as e:
+            result.update({"status": None, "response": str(e)})
+        result["ok"] = False
+        if attempt < max_retries:
+            time.sleep(_backoff_delay(attempt, base_delay, max_delay, retry_after))
+    result["attempts"] = attempt + 1
+    result["latency_s"] = time.perf_counter() - started
+    return result
+
+
+def dispatch(url, payloads, concurrency=4, max_retries=3, base_delay=2.0, max_delay=60.0, timeout=10):
+    """Send all payloads concurrently over one pooled session; returns (results, report)."""
+    started = time.perf_counter()
+    results = []
+    if payloads:
+        with new_session(concurrency) as session, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = [
+                pool.submit(
+                    send_payload, session, url, p,
+                    idempotency_key(p["environment"], p["commit_sha"], p["quickstart_names"]),
+                    max_retries, base_delay, max_delay, timeout,
+                )
+                for p in payloads
+            ]
+            results = [f.result() for f in futures]
+    return results, latency_report(results, time.perf_counter() - started)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def latency_report(results, elapsed):
+    latencies = sorted(r["latency_s"] for r in results)
+    return {
+        "payloads": len(results),
+        "delivered": sum(1 for r in results if r.get("ok")),
+        "failed": sum(1 for r in results if not r.get("ok")),
+        "retries": sum(r["attempts"] - 1 for r in results),
+        "end_to_end_s": round(elapsed, 4),
+        "latency_p50_s": round(_percentile(latencies, 50), 4),
+        "latency_p95_s": round(_percentile(latencies, 95), 4),
+        "latency_max_s": round(latencies[-1], 4) if latencies else 0.0,
+    }
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Dispatch staging/production webhooks for changed quickstarts.")
+    parser.add_argument("--base", help="base commit of the diff")
+    parser.add_argument("--head", default="HEAD", help="head commit of the diff (default HEAD)")
+    parser.add_argument("--repo-root", default=".")
+    parser.add_argument("--quickstarts", help="comma-separated quickstart names instead of a git diff")
+    parser.add_argument("--url", default=os.environ.get("WORKATO_STAGING_WEBHOOK_URL"), help="webhook URL")
+    parser.add_argument("--environment", default="staging")
+    parser.add_argument("--repository", default=os.environ.get("GITHUB_REPOSITORY", ""))
+    parser.add_argument("--commit-sha", default=os.environ.get("GITHUB_SHA", ""))
+    parser.add_argument("--ref", default=os.environ.get("GITHUB_REF", ""))
+    parser.add_argument("--pr-number", default="")
+    parser.add_argument("--batch-size", type=int, default=1, help="quickstarts per payload")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel webhook calls")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--base-delay", type=float, default=2.0, help="backoff base in seconds")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--dry-run", action="store_true", help="print payloads without sending")
+    parser.add_argument("--mock", action="store_true", help="send to a local mock webhook server")
+    parser.add_argument("--mock-fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.quickstarts:
+        names = sorted({n.strip() for n in args.quickstarts.split(",") if n.strip()})
+        quickstarts = [{"name": n, "language": _detect_language(args.repo_root, n)} for n in names]
+    elif args.base:
+        quickstarts = changed_quickstarts(git_changed_files(args.base, args.head, args.repo_root), args.repo_root)
+    else:
+        parser.error("pass --base <sha> or --quickstarts <names>")
+
+    commit_sha = args.commit_sha or args.head
+    payloads = build_payloads(
+        quickstarts, args.environment, args.repository, commit_sha, args.ref, args.pr_number, args.batch_size
+    )
+    print(f"Quickstarts to dispatch ({len(quickstarts)}): " + ", ".join(q["name"] for q in quickstarts))
+    if args.dry_run or not payloads:
+        print(json.dumps(payloads, indent=2))
+        return
+
+    if args.mock:
+        from utils.mock_webhook_server import MockWebhookServer
+        with MockWebhookServer(fail_rate=args.mock_fail_rate) as server:
+            results, report = dispatch(
+                server.url, payloads, args.concurrency, args.max_retries, args.base_delay, timeout=args.timeout
+            )
+    else:
+        if not args.url:
+            parser.error("webhook URL not set (--url or WORKATO_STAGING_WEBHOOK_URL)")
+        results, report = dispatch(
+            args.url, payloads, args.concurrency, args.max_retries, args.base_delay, timeout=args.timeout
+        )
+
+    for r in results:
+        mark = "✅" if r["ok"] else "❌"
+        print(f'{mark} {", ".join(r["quickstarts"])}: HTTP {r["status"]} after {r["attempts"]} attempt(s), {r["latency_s"]:.3f}s')
+    print(json.dumps(report, indent=2))
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()